@@ -0,0 +1,199 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+# Days of history kept in memory; bounds the largest window plus lag
+HISTORY_DAYS = 120
+MIN_WINDOW = 3
+MAX_WINDOW = 90
+MAX_LAG = 7
+
+
+class DailyHistory:
+    """Prices and sentiment of every coin aligned on one contiguous date axis.
+
+    Rows are coins, columns are days ending at as_of; days without a stored
+    value are NaN. Daily returns are derived once so every statistic below
+    is a handful of array operations over all coins at the same time.
+    """
+
+    def __init__(self, coins: List[Dict[str, Any]], dates: List[date], prices: np.ndarray, sentiment: np.ndarray):
+        self.coins = coins
+        self.dates = dates
+        self.prices = prices
+        self.sentiment = sentiment
+        self.returns = np.full_like(prices, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.returns[:, 1:] = prices[:, 1:] / prices[:, :-1] - 1.0
+        self.returns[~np.isfinite(self.returns)] = np.nan
+        self.row_of = {coin["id"]: i for i, coin in enumerate(coins)}
+
+    @property
+    def as_of(self) -> Optional[date]:
+        return self.dates[-1] if self.dates else None
+
+    @classmethod
+    def from_rows(cls, coins: List[Dict[str, Any]], price_rows: List[Dict[str, Any]], sentiment_rows: List[Dict[str, Any]], days: int = HISTORY_DAYS) -> "DailyHistory":
+        row_dates = [_as_date(r["date"]) for r in price_rows] + [_as_date(r["date"]) for r in sentiment_rows]
+        if not row_dates or not coins:
+            return cls(coins, [], np.empty((len(coins), 0)), np.empty((len(coins), 0)))
+
+        as_of = max(row_dates)
+        start = as_of - timedelta(days=days - 1)
+        dates = [start + timedelta(days=i) for i in range(days)]
+        row_of = {coin["id"]: i for i, coin in enumerate(coins)}
+        prices = np.full((len(coins), days), np.nan)
+        sentiment = np.full((len(coins), days), np.nan)
+        for rows, target, column in ((price_rows, prices, "price_usd"), (sentiment_rows, sentiment, "sentiment_score")):
+            for r in rows:
+                row = row_of.get(r["coin_id"])
+                day = (_as_date(r["date"]) - start).days
+                if row is None or day < 0 or r.get(column) is None:
+                    continue
+                target[row, day] = float(r[column])
+        return cls(coins, dates, prices, sentiment)
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of every length-window run along axis 1 via one cumulative sum"""
+    padded = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=padded[:, 1:])
+    return padded[:, window:] - padded[:, :-window]
+
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int, min_periods: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Pearson correlation of x and y over every trailing window, for all rows at once.
+
+    Pairs where either side is NaN are skipped. Returns (correlations,
+    observations), both shaped (rows, days - window + 1); windows with fewer
+    than min_periods pairs, or no variance, are NaN.
+    """
+    min_periods = min_periods if min_periods is not None else max(MIN_WINDOW, window // 2)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    xv = np.where(valid, x, 0.0)
+    yv = np.where(valid, y, 0.0)
+
+    n = _window_sums(valid.astype(float), window)
+    sx, sy = _window_sums(xv, window), _window_sums(yv, window)
+    sxx, syy, sxy = _window_sums(xv * xv, window), _window_sums(yv * yv, window), _window_sums(xv * yv, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 1e-18)] = np.nan
+    return np.clip(corr, -1.0, 1.0), n.astype(int)
+
+
+def lagged_correlations(history: DailyHistory, span: int, max_lag: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Correlation of sentiment on day t with the return on day t + lag, over the last span days.
+
+    Returns (correlations, observations) shaped (coins, max_lag + 1).
+    """
+    coins = len(history.coins)
+    corr = np.full((coins, max_lag + 1), np.nan)
+    obs = np.zeros((coins, max_lag + 1), dtype=int)
+    days = history.sentiment.shape[1]
+    for lag in range(max_lag + 1):
+        width = min(span, days - lag)
+        if width < MIN_WINDOW:
+            continue
+        x = history.sentiment[:, days - lag - width:days - lag]
+        y = history.returns[:, days - width:]
+        c, n = rolling_correlation(x, y, width, min_periods=MIN_WINDOW)
+        corr[:, lag], obs[:, lag] = c[:, 0], n[:, 0]
+    return corr, obs
+
+
+def _value(x) -> Optional[float]:
+    return None if np.isnan(x) else round(float(x), 4)
+
+
+def correlation_report(history: DailyHistory, windows: List[int], max_lag: int, coin_id: Optional[int] = None) -> Dict[str, Any]:
+    """Latest rolling sentiment/return correlation per window and lag profile for each coin.
+
+    With coin_id, the coin's full rolling series is included as well.
+    """
+    rows = list(range(len(history.coins)))
+    if coin_id is not None:
+        rows = [history.row_of[coin_id]] if coin_id in history.row_of else []
+
+    days = len(history.dates)
+    rolling = {w: rolling_correlation(history.sentiment, history.returns, w) for w in windows if w <= days}
+    lagged, lagged_obs = lagged_correlations(history, max(windows), max_lag) if days else (None, None)
+
+    coins = []
+    for row in rows:
+        coin = history.coins[row]
+        entry = {
+            "coin_id": coin["id"],
+            "symbol": coin["symbol"],
+            "name": coin["name"],
+            "correlation": {str(w): _value(c[row, -1]) for w, (c, _) in rolling.items()},
+            "observations": {str(w): int(n[row, -1]) for w, (_, n) in rolling.items()},
+            "lagged": {str(lag): _value(lagged[row, lag]) for lag in range(max_lag + 1)} if days else {},
+            "lagged_observations": {str(lag): int(lagged_obs[row, lag]) for lag in range(max_lag + 1)} if days else {},
+        }
+        if coin_id is not None:
+            entry["series"] = [
+                {"date": history.dates[i].isoformat(), **{str(w): _value(c[row, i - w + 1]) for w, (c, _) in rolling.items() if i >= w - 1}}
+                for i in range(days)
+            ]
+        coins.append(entry)
+
+    return {
+        "as_of": history.as_of.isoformat() if history.as_of else None,
+        "windows": windows,
+        "lags": list(range(max_lag + 1)),
+        "coins": coins,
+    }
+
+
+async def _read_all(fetch_page, page_size: int = 1000) -> List[Dict[str, Any]]:
+    rows, after_id = [], 0
+    while True:
+        page = await fetch_page(after_id, page_size)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        after_id = page[-1]["id"]
+
+
+async def load_history(db, days: int = HISTORY_DAYS, today: Optional[date] = None) -> DailyHistory:
+    since = (today or datetime.now(timezone.utc).date()) - timedelta(days=days)
+    coins = await db.get_all_coins()
+    prices = await _read_all(lambda after_id, limit: db.get_daily_rows_since("coin_prices", since, after_id, limit))
+    sentiment = await _read_all(lambda after_id, limit: db.get_daily_rows_since("coin_sentiment", since, after_id, limit))
+    return DailyHistory.from_rows(coins, prices, sentiment, days)
+
+
+class CorrelationService:
+    """Caches the aligned history and computed reports.
+
+    The history is reloaded at most once per ttl seconds (prices and
+    sentiment only change when the pipeline runs); reports are memoized per
+    (as_of, windows, max_lag, coin_id) on top of it.
+    """
+
+    def __init__(self, db, ttl: float = 900.0):
+        self.db = db
+        self.ttl = ttl
+        self.history: Optional[DailyHistory] = None
+        self.loaded_at = 0.0
+        self.reports: Dict[tuple, Dict[str, Any]] = {}
+
+    async def report(self, windows: List[int], max_lag: int, coin_id: Optional[int] = None) -> Dict[str, Any]:
+        if self.history is None or time.monotonic() - self.loaded_at > self.ttl:
+            self.history = await load_history(self.db)
+            self.loaded_at = time.monotonic()
+            self.reports = {}
+        key = (self.history.as_of, tuple(windows), max_lag, coin_id)
+        if key not in self.reports:
+            self.reports[key] = correlation_report(self.history, windows, max_lag, coin_id)
+        return self.reports[key]
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from movers import refresh_deltas_after
+from sentiment_analyzer import SentimentAnalyzer
+from text_cleaner import article_text
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backfill_checkpoint.json")
+
+# Per-process analyzer used by pool workers, created once by _init_worker
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer()
+
+
+def score_articles(articles: List[Dict[str, Any]], coins: List[Dict[str, Any]], analyzer: Optional[SentimentAnalyzer] = None) -> Dict[int, List[float]]:
+    """Score a chunk of articles and return {coin_id: [score_sum, mentions]} for mentioned coins.
+
+    Partial results from separate chunks can be merged by adding the pairs,
+    which is what makes the scoring both parallel and resumable.
+    """
+    analyzer = analyzer or _worker_analyzer or SentimentAnalyzer()
+    totals: Dict[int, List[float]] = {}
+    matched = []
+    for article in articles:
+        full_text = article_text(article)
+        mentioned_coins = analyzer.find_coin_mentions(full_text, coins)
+        if mentioned_coins:
+            matched.append((full_text, mentioned_coins))
+    sentiment_scores = analyzer.analyze_texts([full_text for full_text, _ in matched])
+    for (_, mentioned_coins), sentiment_score in zip(matched, sentiment_scores):
+        for mentioned_coin in mentioned_coins:
+            entry = totals.setdefault(mentioned_coin['coin_id'], [0.0, 0])
+            entry[0] += sentiment_score * mentioned_coin['mentions']
+            entry[1] += mentioned_coin['mentions']
+    return totals
+
+
+def merge_totals(target: Dict[int, List[float]], partial: Dict[int, List[float]]):
+    for coin_id, (score_sum, mentions) in partial.items():
+        entry = target.setdefault(coin_id, [0.0, 0])
+        entry[0] += score_sum
+        entry[1] += mentions
+
+
+def build_sentiment_rows(totals: Dict[int, List[float]], coins: List[Dict[str, Any]], sentiment_date: date) -> List[Dict[str, Any]]:
+    """Turn accumulated totals into coin_sentiment rows, one per known coin"""
+    rows = []
+    for coin in coins:
+        score_sum, mentions = totals.get(coin['id'], (0.0, 0))
+        rows.append({
+            "coin_id": coin['id'],
+            "date": sentiment_date,
+            "sentiment_score": score_sum / mentions if mentions else None,
+            "mentions_count": int(mentions),
+            "no_mentions": mentions == 0,
+        })
+    return rows
+
+
+async def score_stored_day(db, day: date, coins: List[Dict[str, Any]], analyzer: Optional[SentimentAnalyzer] = None,
+                           skip_links: Optional[Set[str]] = None, page_size: int = 1000) -> Tuple[Dict[int, List[float]], Set[str]]:
+    """Totals over the stored articles published on day (UTC), and the links of those articles.
+
+    This is what a day's coin_sentiment row counts wherever it is written
+    (daily run, ingest daemon, replay, backfill), so whichever writes the
+    row last writes the same numbers. Articles whose link is in skip_links
+    were already scored by the caller and are left out of the totals.
+    """
+    day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    day_end = day_start + timedelta(days=1)
+    skip_links = skip_links or set()
+    totals: Dict[int, List[float]] = {}
+    links: Set[str] = set()
+    after_id = 0
+    while True:
+        page = await db.get_articles_page(day_start, day_end, after_id=after_id, limit=page_size)
+        if not page:
+            break
+        merge_totals(totals, score_articles([a for a in page if a["link"] not in skip_links], coins, analyzer))
+        links.update(a["link"] for a in page)
+        after_id = page[-1]["id"]
+    return totals, links
+
+
+class BackfillCheckpoint:
+    """JSON checkpoint recording finished dates and the position inside the current one.
+
+    The file is rewritten atomically after every page so a crash loses at most
+    the page that was being scored.
+    """
+
+    def __init__(self, path: str, start: date, end: date):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.completed_dates: List[str] = []
+        self.current: Optional[Dict[str, Any]] = None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            state = json.load(f)
+        # A checkpoint for a different range is stale, start over
+        if state.get("start") != self.start.isoformat() or state.get("end") != self.end.isoformat():
+            print(f"Ignoring checkpoint for a different range: {state.get('start')}..{state.get('end')}")
+            return
+        self.completed_dates = state.get("completed_dates", [])
+        self.current = state.get("current")
+
+    def save(self):
+        state = {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "completed_dates": self.completed_dates,
+            "current": self.current,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, day: date) -> bool:
+        return day.isoformat() in self.completed_dates
+
+    def resume_position(self, day: date):
+        """Return (last_id, totals) for day, or a fresh start if it was not in progress"""
+        if self.current and self.current.get("date") == day.isoformat():
+            totals = {int(k): list(v) for k, v in self.current.get("totals", {}).items()}
+            return self.current.get("last_id", 0), totals
+        return 0, {}
+
+    def record_progress(self, day: date, last_id: int, totals: Dict[int, List[float]]):
+        self.current = {
+            "date": day.isoformat(),
+            "last_id": last_id,
+            "totals": {str(k): v for k, v in totals.items()},
+        }
+        self.save()
+
+    def mark_done(self, day: date):
+        self.completed_dates.append(day.isoformat())
+        self.current = None
+        self.save()
+
+
+async def _score_page(pool: Optional[ProcessPoolExecutor], analyzer: SentimentAnalyzer, articles, coins, workers: int) -> Dict[int, List[float]]:
+    if pool is None or workers <= 1:
+        return score_articles(articles, coins, analyzer)
+
+    loop = asyncio.get_event_loop()
+    chunk_size = max(1, -(-len(articles) // workers))
+    futures = [
+        loop.run_in_executor(pool, score_articles, articles[i:i + chunk_size], coins)
+        for i in range(0, len(articles), chunk_size)
+    ]
+    totals: Dict[int, List[float]] = {}
+    for partial in await asyncio.gather(*futures):
+        merge_totals(totals, partial)
+    return totals
+
+
+async def backfill_day(db, day: date, coins, checkpoint: BackfillCheckpoint, pool, analyzer, workers: int, page_size: int) -> int:
+    """Rescore every stored article published on day and write its coin_sentiment rows"""
+    day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    day_end = day_start + timedelta(days=1)
+    last_id, totals = checkpoint.resume_position(day)
+    if last_id:
+        print(f"Resuming {day} after article id {last_id}")
+
+    processed = 0
+    page = await db.get_articles_page(day_start, day_end, after_id=last_id, limit=page_size)
+    while page:
+        # Fetch the next page while the current one is being scored
+        next_after = page[-1]["id"]
+        next_page_task = asyncio.ensure_future(db.get_articles_page(day_start, day_end, after_id=next_after, limit=page_size))
+        try:
+            merge_totals(totals, await _score_page(pool, analyzer, page, coins, workers))
+        except BaseException:
+            next_page_task.cancel()
+            raise
+        processed += len(page)
+        checkpoint.record_progress(day, next_after, totals)
+        page = await next_page_task
+
+    await db.upsert_coin_sentiments(build_sentiment_rows(totals, coins, day))
+    await refresh_deltas_after(db, day)
+    checkpoint.mark_done(day)
+    return processed
+
+
+async def run_backfill(start: date, end: date, db=None, checkpoint_path: str = DEFAULT_CHECKPOINT_PATH, workers: Optional[int] = None, page_size: int = 1000):
+    """Reprocess stored articles for every date in [start, end] into coin_sentiment.
+
+    Progress is checkpointed to checkpoint_path; rerunning the same range
+    after an interruption skips finished dates and resumes mid-date.
+    """
+    if end < start:
+        raise ValueError("Backfill end date must not be before start date")
+
+    if db is None:
+        from database import create_database
+        db = create_database()
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    checkpoint = BackfillCheckpoint(checkpoint_path, start, end)
+    checkpoint.load()
+
+    coins = await db.get_all_coins()
+    if not coins:
+        print("No coins in database, nothing to backfill")
+        return
+
+    print(f"Backfilling {start} to {end} for {len(coins)} coins with {workers} worker(s)")
+    analyzer = SentimentAnalyzer()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+    total_articles = 0
+    try:
+        day = start
+        while day <= end:
+            if checkpoint.is_done(day):
+                print(f"Skipping {day}, already backfilled")
+            else:
+                processed = await backfill_day(db, day, coins, checkpoint, pool, analyzer, workers, page_size)
+                total_articles += processed
+                print(f"Backfilled {day}: {processed} articles")
+            day += timedelta(days=1)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print(f"Backfill complete: {total_articles} articles rescored")
+    # Whole range done, the checkpoint is no longer needed
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
@@ -0,0 +1,95 @@
+"""Offline benchmark of replaying the raw feed archive.
+
+Builds a one-day archive from the recorded payloads in fixtures/sources
+(each source fetched --polls times, with --variants distinct bodies per
+source so there is something to decompress), then times replay_archive:
+reading, decompressing and parsing every distinct body, with no network.
+Pass --archive DIR --day YYYY-MM-DD to time a real archive instead.
+
+    python benchmarks/archive_replay.py --variants 50 --polls 4
+    python benchmarks/archive_replay.py --archive .cache/feed_archive --day 2025-09-24
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURE_DIR = os.path.join(BACKEND_ROOT, "fixtures", "sources")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from feed_archive import FeedArchive  # noqa: E402
+from source_registry import read_registry  # noqa: E402
+from sources import FixtureTransport, replay_archive  # noqa: E402
+
+BENCH_DAY = date(2025, 9, 24)
+
+
+def build_archive(root: str, fixture_dir: str = DEFAULT_FIXTURE_DIR, variants: int = 50, polls: int = 4) -> FeedArchive:
+    """Archive every registry source of fixture_dir variants * polls times on BENCH_DAY"""
+    archive = FeedArchive(root)
+    transport = FixtureTransport(fixture_dir)
+    started = datetime(BENCH_DAY.year, BENCH_DAY.month, BENCH_DAY.day, tzinfo=timezone.utc)
+    fetches = 0
+    for row in read_registry(os.path.join(fixture_dir, "registry.csv")):
+        body = transport.get(row["url"])
+        for variant in range(variants):
+            # Trailing whitespace keeps the payload valid XML / JSON but changes its hash
+            variant_body = body + b"\n" * variant
+            for _ in range(polls):
+                archive.put(row["url"], variant_body, fetched_at=started + timedelta(seconds=fetches))
+                fetches += 1
+    return archive
+
+
+def run_replay(archive: FeedArchive, day: date = BENCH_DAY, registry: Optional[str] = None) -> Dict[str, Any]:
+    """Time one replay of day; returns the measurements"""
+    stats = archive.stats(day)
+    started = time.perf_counter()
+    articles = replay_archive(archive, day, registry)
+    seconds = time.perf_counter() - started
+    distinct_bytes = sum(e["size"] for e in {e["sha256"]: e for e in archive.entries(day)}.values())
+    return {
+        **stats,
+        "articles": len(articles),
+        "seconds": round(seconds, 3),
+        "compression_ratio": round(stats["raw_bytes"] / stats["stored_bytes"], 1) if stats["stored_bytes"] else None,
+        "mb_per_second": round(distinct_bytes / 1e6 / seconds, 1) if seconds else None,
+        "bodies_per_second": round(stats["bodies"] / seconds, 1) if seconds else None,
+    }
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="directory of recorded payloads")
+    parser.add_argument("--variants", type=int, default=50, help="distinct bodies per source")
+    parser.add_argument("--polls", type=int, default=4, help="fetches of each distinct body")
+    parser.add_argument("--archive", default=None, help="replay this archive instead of building one")
+    parser.add_argument("--day", default=None, help="day of --archive to replay (default: its latest)")
+    args = parser.parse_args(argv)
+
+    if args.archive:
+        archive = FeedArchive(args.archive)
+        days = archive.days()
+        if not days:
+            print(f"No archived days in {args.archive}")
+            return 1
+        result = run_replay(archive, date.fromisoformat(args.day) if args.day else days[-1])
+    else:
+        with tempfile.TemporaryDirectory() as root:
+            archive = build_archive(root, args.fixtures, args.variants, args.polls)
+            result = run_replay(archive, registry=os.path.join(args.fixtures, "registry.csv"))
+
+    print(f"{result['fetches']} fetches, {result['bodies']} distinct bodies, {result['raw_bytes'] / 1e6:.1f} MB raw "
+          f"stored in {result['stored_bytes'] / 1e6:.2f} MB ({result['compression_ratio']}x)")
+    print(f"replayed {result['articles']} articles in {result['seconds']:.2f}s "
+          f"({result['bodies_per_second']} bodies/s, {result['mb_per_second']} MB/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,105 @@
+"""Startup benchmark for the API process.
+
+Runs `python -X importtime -c "import main"` a few times in fresh
+interpreters and fails if the median cumulative import time of main goes
+over the budget, or if the API pulls in modules it should only load lazily
+(the Supabase SDK) or never (ingestion and VADER).
+
+    python benchmarks/import_budget.py --budget-ms 800
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the read-only API must not import at startup
+FORBIDDEN_MODULES = [
+    "supabase",
+    "vaderSentiment",
+    "feedparser",
+    "requests",
+    "sentiment_analyzer",
+    "rss_parser",
+    "sources",
+    "cron_job",
+    "ingest_daemon",
+    "backfill",
+    "coingecko_client",
+    "numpy",
+    "analytics",
+]
+
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Database() validates its settings at import time of main; values are never used
+    env.setdefault("SUPABASE_URL", "http://localhost")
+    env.setdefault("SUPABASE_ANON_KEY", "benchmark")
+    return env
+
+
+def measure_once(module: str = "main") -> Tuple[int, List[Tuple[int, str]]]:
+    """Return (cumulative microseconds for module, [(cumulative us, name)] of top-level imports)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    # importtime prints children before their parent, one extra indent level each
+    children: List[Tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 1:
+            if name == module:
+                return cumulative, sorted(children, reverse=True)
+            children = []
+        elif indent == 3:
+            children.append((cumulative, name))
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def loaded_forbidden_modules(module: str = "main") -> List[str]:
+    code = (
+        f"import sys, {module}\n"
+        f"print('\\n'.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_ROOT, env=_env(),
+                            capture_output=True, text=True, check=True)
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("API_IMPORT_BUDGET_MS", 800)))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(args.runs)]
+    median_ms = statistics.median(total for total, _ in runs) / 1000
+    print(f"import main: median {median_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("Heaviest direct imports (last run):")
+    for cumulative, name in runs[-1][1][:8]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    forbidden = loaded_forbidden_modules()
+    if forbidden:
+        print(f"FAIL: API startup imports {', '.join(forbidden)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import time {median_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
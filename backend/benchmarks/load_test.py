@@ -0,0 +1,230 @@
+"""HTTP load test for the read endpoints.
+
+Seeds a throwaway SQLite database (DATABASE_BACKEND=sqlite) with synthetic
+coins, prices, sentiment and articles, boots main.app in-process and drives
+it with concurrent httpx clients. Reports p50/p95/p99 latency and
+throughput per endpoint, once per article table size, so it shows how the
+endpoints scale with the articles table.
+
+    python benchmarks/load_test.py --articles 1000,10000 --requests 500 --concurrency 20
+    python benchmarks/load_test.py --save-baseline      # record benchmarks/baselines/load_test.json
+    python benchmarks/load_test.py --compare            # diff against the saved baseline
+
+Pass --base-url to load an already running server instead (no seeding).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+
+import httpx
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE_PATH = os.path.join(BACKEND_ROOT, "benchmarks", "baselines", "load_test.json")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+WORDS = (
+    "rally slump surge crash adoption regulators approve reject upgrade network "
+    "exchange inflows outflows whales traders analysts expect record volume market "
+    "liquidity staking fees layer bridge hack recovery bullish bearish steady"
+).split()
+
+
+def synthetic_coins(count: int) -> List[Dict[str, Any]]:
+    return [
+        {"coingecko_id": f"coin-{i}", "symbol": f"C{i}", "name": f"Coin {i}"}
+        for i in range(count)
+    ]
+
+
+async def seed(db, coins: int, articles: int, days: int, rng: random.Random) -> List[int]:
+    """Fill db with synthetic data and return the coin ids"""
+    rows = await db.insert_coins(synthetic_coins(coins))
+    coin_ids = [row["id"] for row in rows]
+    today = date.today()
+
+    prices, sentiment = [], []
+    for coin_id in coin_ids:
+        for d in range(days):
+            day = today - timedelta(days=d)
+            prices.append({"coin_id": coin_id, "date": day, "price_usd": rng.uniform(0.01, 50000), "market_cap": rng.uniform(1e6, 1e12)})
+            sentiment.append({"coin_id": coin_id, "date": day, "sentiment_score": rng.uniform(-1, 1), "mentions_count": rng.randint(1, 50), "no_mentions": False})
+    await db.upsert_coin_prices(prices)
+    await db.upsert_coin_sentiments(sentiment)
+
+    # Articles go in as one bulk insert; inserting them one by one through
+    # insert_article would dominate the run time without measuring anything
+    now = datetime.now(timezone.utc)
+    article_rows = []
+    for i in range(articles):
+        coin = rng.randrange(coins)
+        article_rows.append({
+            "title": f"Coin {coin} {' '.join(rng.choices(WORDS, k=6))}",
+            "summary": f"C{coin} " + " ".join(rng.choices(WORDS, k=40)),
+            "link": f"https://example.com/{i}",
+            "published_date": now - timedelta(minutes=rng.randrange(days * 24 * 60)),
+        })
+    await db.insert_articles(article_rows)
+    return coin_ids
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+async def drive(client: httpx.AsyncClient, paths: List[str], total: int, concurrency: int) -> Dict[str, Any]:
+    """Send total requests cycling through paths from concurrency parallel clients"""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            path = paths[next_index % len(paths)]
+            next_index += 1
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def endpoint_paths(coin_ids: List[int]) -> Dict[str, List[str]]:
+    return {
+        "/api/coins": ["/api/coins"],
+        "/api/coins/{coin_id}": [f"/api/coins/{coin_id}" for coin_id in coin_ids],
+        "/api/coins/{coin_id}/articles": [f"/api/coins/{coin_id}/articles?limit=10" for coin_id in coin_ids],
+    }
+
+
+async def run_round(client: httpx.AsyncClient, coin_ids: List[int], requests: int, concurrency: int) -> Dict[str, Any]:
+    results = {}
+    for endpoint, paths in endpoint_paths(coin_ids).items():
+        # A short warm-up so the first requests do not pay for cold caches
+        await drive(client, paths, min(len(paths), concurrency), concurrency)
+        results[endpoint] = await drive(client, paths, requests, concurrency)
+    return results
+
+
+async def run_load_test(article_counts: List[int], coins: int = 100, days: int = 30, requests: int = 500,
+                        concurrency: int = 20, seed_value: int = 7, base_url: Optional[str] = None) -> Dict[str, Any]:
+    """Return {"<articles>": {endpoint: stats}} for every article table size"""
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            coin_ids = [row["coin_id"] for row in (await client.get("/api/coins")).json()]
+            return {"external": await run_round(client, coin_ids, requests, concurrency)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # main opens a database at import; point it at the scratch directory too
+        saved_env = {key: os.environ.get(key) for key in ("DATABASE_BACKEND", "SQLITE_PATH")}
+        os.environ["DATABASE_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(tmp, "startup.db")
+        try:
+            import main
+            from local_database import LocalDatabase
+        finally:
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+        # Each round swaps in its own database; the app gets its own back afterwards
+        app_db = main.db
+        results = {}
+        for count in article_counts:
+            db = LocalDatabase(os.path.join(tmp, f"articles_{count}.db"))
+            try:
+                coin_ids = await seed(db, coins, count, days, random.Random(seed_value))
+                main.db = db
+                main.reset_caches()
+                transport = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                    results[str(count)] = await run_round(client, coin_ids, requests, concurrency)
+            finally:
+                main.db = app_db
+                main.reset_caches()
+                db.close()
+        return results
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    header = f"{'articles':>9} {'endpoint':<31} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>4}"
+    print(header)
+    print("-" * len(header))
+    for size, endpoints in results.items():
+        for endpoint, stats in endpoints.items():
+            line = (f"{size:>9} {endpoint:<31} {stats['rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+                    f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>4}")
+            base = (baseline or {}).get(size, {}).get(endpoint)
+            if base and base["p95_ms"]:
+                line += f"   p95 {100 * (stats['p95_ms'] - base['p95_ms']) / base['p95_ms']:+.0f}% vs baseline"
+            print(line)
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", default="1000,10000,50000", help="comma separated article table sizes")
+    parser.add_argument("--coins", type=int, default=100)
+    parser.add_argument("--days", type=int, default=30, help="days of price and sentiment history per coin")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint and size")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base-url", default=None, help="load an already running server instead")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE_PATH, default=None)
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE_PATH, default=None)
+    args = parser.parse_args(argv)
+
+    article_counts = [int(n) for n in args.articles.split(",") if n]
+    results = asyncio.run(run_load_test(article_counts, args.coins, args.days, args.requests, args.concurrency, base_url=args.base_url))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline), exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "config": {"coins": args.coins, "days": args.days, "requests": args.requests, "concurrency": args.concurrency},
+                "environment": {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()},
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.save_baseline}")
+    return 1 if any(s["errors"] for r in results.values() for s in r.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,104 @@
+"""Throughput and parity benchmark of VaderEngine against vaderSentiment.
+
+Scores a corpus built from the recorded source fixtures plus seeded
+synthetic headlines (lexicon words mixed with boosters, negations, "but",
+capitals, punctuation and emoji) with the reference polarity_scores and
+with VaderEngine, cold (empty caches) and warm (the same texts again, as
+when one article is carried by several feeds), and counts compound scores
+that differ.
+
+    python benchmarks/sentiment_engine.py --size 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Dict, Any
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURE_DIR = os.path.join(BACKEND_ROOT, "fixtures", "sources")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer  # noqa: E402
+
+from sources import FixtureTransport, load_sources  # noqa: E402
+from text_cleaner import article_text  # noqa: E402
+from vader_engine import BOOSTER_DICT, NEGATE, SPECIAL_CASES, VaderEngine  # noqa: E402
+
+RULE_WORDS = ["but", "no", "least", "at", "very", "kind", "of", "so", "this", "never", "without", "doubt", "or", "nor"]
+MARKET_WORDS = ["bitcoin", "BTC", "ethereum", "ETF", "SEC", "price", "rally", "crash", "whales", "the", "a", "to", "on"]
+EXTRAS = [":)", ":(", "😁", "💘", "🚀", "!!", "??"]
+
+
+def fixture_texts(fixture_dir: str = DEFAULT_FIXTURE_DIR) -> List[str]:
+    transport = FixtureTransport(fixture_dir)
+    sources = load_sources(os.path.join(fixture_dir, "registry.csv"), max_age=None)
+    return [article_text(article) for source in sources for article in source.fetch(transport)]
+
+
+def build_corpus(size: int = 20000, seed: int = 7, fixture_dir: str = DEFAULT_FIXTURE_DIR) -> List[str]:
+    """Fixture article texts followed by seeded synthetic sentences, size texts in total"""
+    rnd = random.Random(seed)
+    lexicon = sorted(VaderEngine().lexicon)
+    vocab = (lexicon[::25] + list(BOOSTER_DICT) + sorted(NEGATE) + RULE_WORDS + MARKET_WORDS + EXTRAS
+             + [word for phrase in SPECIAL_CASES for word in phrase.split()])
+    texts = fixture_texts(fixture_dir)[:size]
+    while len(texts) < size:
+        words = []
+        for _ in range(rnd.randint(0, 30)):
+            word = rnd.choice(vocab)
+            roll = rnd.random()
+            if roll < 0.1:
+                word = word.upper()
+            elif roll < 0.3:
+                word += rnd.choice([".", ",", "!", "?", "'"])
+            words.append(word)
+        texts.append(" ".join(words))
+    return texts
+
+
+def run_benchmark(texts: List[str]) -> Dict[str, Any]:
+    """Time the reference and the engine over texts; returns the measurements"""
+    reference = SentimentIntensityAnalyzer()
+    started = time.perf_counter()
+    expected = [reference.polarity_scores(text)["compound"] for text in texts]
+    reference_seconds = time.perf_counter() - started
+
+    engine = VaderEngine()
+    started = time.perf_counter()
+    cold = engine.compound_many(texts)
+    cold_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    warm = engine.compound_many(texts)
+    warm_seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(expected, cold) if abs(a - b) > 1e-4) + sum(1 for a, b in zip(cold, warm) if a != b)
+    return {
+        "texts": len(texts),
+        "mismatches": mismatches,
+        "reference_seconds": round(reference_seconds, 3),
+        "cold_seconds": round(cold_seconds, 3),
+        "warm_seconds": round(warm_seconds, 3),
+        "cold_speedup": round(reference_seconds / cold_seconds, 2) if cold_seconds else None,
+        "warm_speedup": round(reference_seconds / warm_seconds, 2) if warm_seconds else None,
+    }
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="directory of recorded payloads")
+    parser.add_argument("--size", type=int, default=20000, help="texts in the corpus")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(build_corpus(args.size, args.seed, args.fixtures))
+    print(f"{result['texts']} texts, {result['mismatches']} mismatched compound scores")
+    print(f"reference {result['reference_seconds']:.2f}s, engine cold {result['cold_seconds']:.2f}s "
+          f"({result['cold_speedup']}x), warm {result['warm_seconds']:.3f}s ({result['warm_speedup']}x)")
+    return 0 if result["mismatches"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
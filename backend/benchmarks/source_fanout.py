@@ -0,0 +1,94 @@
+"""Offline benchmark of the multi-source fetch fan-out.
+
+Replays the recorded payloads in fixtures/sources through the real source
+parsers, with a fixed simulated latency per request, and times a sequential
+pass (one source after another, as parse_all_feeds did) against
+SourceScheduler.fetch_all. Each recorded source is repeated --copies times
+to model a registry of realistic size.
+
+    python benchmarks/source_fanout.py --copies 6 --latency-ms 200
+    python benchmarks/source_fanout.py --record       # refresh the fixtures from the live registry
+
+Rate-limit spacing is switched off by default so the numbers show the
+concurrency gain; pass --respect-limits to keep the production limits.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, Any, Optional
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURE_DIR = os.path.join(BACKEND_ROOT, "fixtures", "sources")
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sources import (  # noqa: E402
+    DEFAULT_LIMITS, FixtureTransport, HttpTransport, RecordingTransport,
+    SourceLimit, SourceScheduler, load_sources,
+)
+
+
+def run_fanout(fixture_dir: str = DEFAULT_FIXTURE_DIR, copies: int = 6, latency: float = 0.2,
+               max_concurrency: int = 16, respect_limits: bool = False, registry: Optional[str] = None) -> Dict[str, Any]:
+    """Time sequential and scheduled fetches of the recorded sources; returns the measurements"""
+    registry = registry or os.path.join(fixture_dir, "registry.csv")
+    sources = load_sources(registry, max_age=None) * copies
+    transport = FixtureTransport(fixture_dir, latency=latency)
+
+    started = time.perf_counter()
+    sequential = sum(len(source.fetch(transport)) for source in sources)
+    sequential_seconds = time.perf_counter() - started
+
+    limits = None if respect_limits else {kind: SourceLimit(concurrency=max_concurrency) for kind in DEFAULT_LIMITS}
+    scheduler = SourceScheduler(transport, limits=limits, max_concurrency=max_concurrency)
+    started = time.perf_counter()
+    try:
+        concurrent = len(asyncio.run(scheduler.fetch_all(sources)))
+    finally:
+        scheduler.close()
+    concurrent_seconds = time.perf_counter() - started
+
+    return {
+        "sources": len(sources),
+        "articles": concurrent,
+        "sequential_articles": sequential,
+        "sequential_seconds": round(sequential_seconds, 3),
+        "concurrent_seconds": round(concurrent_seconds, 3),
+        "speedup": round(sequential_seconds / concurrent_seconds, 2) if concurrent_seconds else None,
+    }
+
+
+def record_fixtures(fixture_dir: str = DEFAULT_FIXTURE_DIR, registry: Optional[str] = None) -> int:
+    """Fetch every source in the registry once and save the payloads as fixtures"""
+    scheduler = SourceScheduler(RecordingTransport(HttpTransport(), fixture_dir))
+    try:
+        return len(asyncio.run(scheduler.fetch_all(load_sources(registry or os.path.join(fixture_dir, "registry.csv")))))
+    finally:
+        scheduler.close()
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="directory of recorded payloads")
+    parser.add_argument("--registry", default=None, help="source registry CSV (default: <fixtures>/registry.csv)")
+    parser.add_argument("--copies", type=int, default=6, help="times each recorded source is repeated")
+    parser.add_argument("--latency-ms", type=float, default=200, help="simulated latency per request")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--respect-limits", action="store_true", help="keep the per-kind rate limits")
+    parser.add_argument("--record", action="store_true", help="re-record the fixtures from the live sources and exit")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        print(f"Recorded {record_fixtures(args.fixtures, args.registry)} articles into {args.fixtures}")
+        return 0
+
+    result = run_fanout(args.fixtures, args.copies, args.latency_ms / 1000, args.concurrency, args.respect_limits, args.registry)
+    print(f"{result['sources']} sources, {result['articles']} articles")
+    print(f"sequential {result['sequential_seconds']:.2f}s, scheduled {result['concurrent_seconds']:.2f}s ({result['speedup']}x)")
+    return 0 if result["articles"] == result["sequential_articles"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
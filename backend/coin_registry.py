@@ -0,0 +1,78 @@
+import hashlib
+from typing import List, Dict, Any, Tuple
+
+
+def coin_hash(symbol: str, name: str) -> str:
+    """Content hash of the coin metadata we mirror from CoinGecko"""
+    return hashlib.sha1(f"{symbol}\x1f{name}".encode("utf-8")).hexdigest()
+
+
+class CoinRegistry:
+    """In-memory mirror of the coins table keyed by coingecko_id.
+
+    Loaded with a single get_all_coins query, it lets the pipeline diff the
+    CoinGecko response against what is stored and only write coins that are
+    new or whose symbol/name actually changed.
+    """
+
+    def __init__(self):
+        self.coins: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self):
+        return len(self.coins)
+
+    def _remember(self, row: Dict[str, Any]):
+        self.coins[row["coingecko_id"]] = {
+            "id": row["id"],
+            "coingecko_id": row["coingecko_id"],
+            "symbol": row["symbol"],
+            "name": row["name"],
+            "hash": coin_hash(row["symbol"], row["name"]),
+        }
+
+    async def load(self, db):
+        self.coins = {}
+        for row in await db.get_all_coins():
+            self._remember(row)
+
+    def diff(self, coins_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split incoming CoinGecko coins into (new, changed); unchanged coins are dropped"""
+        new, changed = [], []
+        seen = set()
+        for coin in coins_data:
+            coingecko_id = coin["coingecko_id"]
+            if coingecko_id in seen:
+                continue
+            seen.add(coingecko_id)
+
+            known = self.coins.get(coingecko_id)
+            if known is None:
+                new.append(coin)
+            elif known["hash"] != coin_hash(coin["symbol"], coin["name"]):
+                changed.append({**coin, "id": known["id"]})
+        return new, changed
+
+    async def sync(self, db, coins_data: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Write new and changed coins and return {coingecko_id: coin} for every incoming coin"""
+        new, changed = self.diff(coins_data)
+
+        for row in await db.insert_coins(new):
+            self._remember(row)
+        for coin in changed:
+            await db.update_coin(coin["id"], coin["symbol"], coin["name"])
+            self._remember(coin)
+
+        if new or changed:
+            print(f"Coin registry: {len(new)} new, {len(changed)} changed")
+
+        coin_ids_map = {}
+        for coin in coins_data:
+            known = self.coins.get(coin["coingecko_id"])
+            if known is not None:
+                coin_ids_map[coin["coingecko_id"]] = {
+                    "id": known["id"],
+                    "coingecko_id": known["coingecko_id"],
+                    "symbol": known["symbol"],
+                    "name": known["name"],
+                }
+        return coin_ids_map
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import mmap
+import os
+import struct
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
+
+# Layout (little endian):
+#   header  <4sHHQdII  magic, format, reserved, version, generated_at, coin_count, list_length
+#   index   coin_count x <qQI  coin_id, offset, length of that coin's details body
+#   bodies  /api/coins JSON, then one /api/coins/{coin_id} JSON per coin
+# Bodies are stored pre-serialized: a request copies one slice out of the map,
+# with no JSON encoding and no database round trip.
+MAGIC = b"CSNP"
+FORMAT = 1
+HEADER = struct.Struct("<4sHHQdII")
+INDEX_ENTRY = struct.Struct("<qQI")
+
+
+def format_coin_row(coin: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape one latest_coin_data row the way /api/coins returns it"""
+    return {
+        "coin_id": coin["coin_id"],
+        "coingecko_id": coin["coingecko_id"],
+        "symbol": coin["symbol"],
+        "name": coin["name"],
+        "price_usd": float(coin["price_usd"]) if coin["price_usd"] else None,
+        "market_cap": float(coin["market_cap"]) if coin["market_cap"] else None,
+        "sentiment_score": float(coin["sentiment_score"]) if coin["sentiment_score"] is not None else None,
+        "mentions_count": coin["mentions_count"] if coin["mentions_count"] else 0,
+        "no_mentions": coin["no_mentions"] if coin["no_mentions"] is not None else True
+    }
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def write_snapshot(path: str, coins: List[Dict[str, Any]], details: Dict[int, Dict[str, Any]], version: Optional[int] = None) -> int:
+    """Write a snapshot file and atomically swap it into place; returns its version"""
+    version = version if version is not None else time.time_ns()
+    list_body = _encode(coins)
+    detail_bodies = [(coin_id, _encode(details[coin_id])) for coin_id in sorted(details)]
+
+    offset = HEADER.size + INDEX_ENTRY.size * len(detail_bodies) + len(list_body)
+    index = []
+    for coin_id, body in detail_bodies:
+        index.append(INDEX_ENTRY.pack(coin_id, offset, len(body)))
+        offset += len(body)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # The daemon and the daily run may publish at the same time; each writes its own temp file
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT, 0, version, time.time(), len(detail_bodies), len(list_body)))
+            f.writelines(index)
+            f.write(list_body)
+            f.writelines(body for _, body in detail_bodies)
+            f.flush()
+            os.fsync(f.fileno())
+        # Readers that already mapped the old file keep it until they reopen
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return version
+
+
+class MappedSnapshot:
+    """One opened snapshot file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        magic, fmt, _, self.version, self.generated_at, coin_count, list_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            self.map.close()
+            raise ValueError(f"Not a coin snapshot (format {FORMAT}): {path}")
+
+        self.index: Dict[int, Tuple[int, int]] = {}
+        for i in range(coin_count):
+            coin_id, offset, length = INDEX_ENTRY.unpack_from(self.map, HEADER.size + i * INDEX_ENTRY.size)
+            self.index[coin_id] = (offset, length)
+        self.list_start = HEADER.size + coin_count * INDEX_ENTRY.size
+        self.list_length = list_length
+
+    def coins_json(self) -> bytes:
+        """The /api/coins body (a copy of its slice of the map)"""
+        return self.map[self.list_start:self.list_start + self.list_length]
+
+    def coin_json(self, coin_id: int) -> Optional[bytes]:
+        """The /api/coins/{coin_id} body (a copy of its slice of the map), or None if unknown"""
+        entry = self.index.get(coin_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self.map[offset:offset + length]
+
+
+class CoinSnapshotReader:
+    """Serves coin reads from the published snapshot, following atomic swaps.
+
+    Every API worker maps the same file, so the page cache holds one copy
+    for all of them. The file is re-stat'ed at most once per check_interval
+    and remapped when the publisher has replaced it. Methods return None when
+    there is no usable snapshot (missing, unreadable or older than max_age),
+    and the caller falls back to the database.
+    """
+
+    def __init__(self, path: Optional[str], max_age: float = 36 * 3600, check_interval: float = 1.0):
+        self.path = path
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.current: Optional[MappedSnapshot] = None
+        self._checked_at = 0.0
+
+    def snapshot(self) -> Optional[MappedSnapshot]:
+        if not self.path:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._refresh()
+        if self.current is not None and time.time() - self.current.generated_at > self.max_age:
+            return None
+        return self.current
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.current = None
+            return
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self.current is not None and self.current.identity == identity:
+            return
+        try:
+            self.current = MappedSnapshot(self.path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error loading coin snapshot {self.path}: {e}")
+            self.current = None
+
+    def coins_json(self) -> Optional[bytes]:
+        snapshot = self.snapshot()
+        return snapshot.coins_json() if snapshot else None
+
+    def coin_json(self, coin_id: int) -> Optional[bytes]:
+        snapshot = self.snapshot()
+        return snapshot.coin_json(coin_id) if snapshot else None
+
+    def has_snapshot(self) -> bool:
+        return self.snapshot() is not None
+
+
+async def publish_snapshot(db, path: str, concurrency: int = 8) -> int:
+    """Read the ranked coin table and each coin's recent history and publish them to path"""
+    coins = [format_coin_row(row) for row in await db.get_latest_coin_data()]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def details_for(coin_id: int):
+        async with semaphore:
+            return coin_id, await db.get_coin_details(coin_id)
+
+    details = {
+        coin_id: detail
+        for coin_id, detail in await asyncio.gather(*(details_for(c["coin_id"]) for c in coins))
+        if detail is not None
+    }
+    version = write_snapshot(path, coins, details)
+    print(f"Published coin snapshot {version} with {len(coins)} coins to {path}")
+    return version
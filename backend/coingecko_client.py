@@ -1,57 +1,217 @@
 import requests
+import httpx
 import asyncio
-from typing import List, Dict, Any
+import hashlib
+import json
+import os
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import time
 
+# CoinGecko rejects per_page values above this
+MAX_PER_PAGE = 250
+
+
+def process_coin(coin: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a raw /coins/markets entry into the shape the pipeline stores"""
+    return {
+        "coingecko_id": coin["id"],
+        "symbol": coin["symbol"].upper(),
+        "name": coin["name"],
+        "price_usd": float(coin["current_price"]) if coin["current_price"] else 0.0,
+        "market_cap": float(coin["market_cap"]) if coin["market_cap"] else 0.0,
+        "last_updated": datetime.fromisoformat(coin["last_updated"].replace("Z", "+00:00"))
+    }
+
+
+def _page_plan(limit: int):
+    """Return (per_page, pages) needed to cover the top `limit` coins; (0, 0) when limit is not positive"""
+    if limit <= 0:
+        return 0, 0
+    per_page = min(limit, MAX_PER_PAGE)
+    pages = -(-limit // per_page)
+    return per_page, pages
+
+
 class CoinGeckoClient:
     def __init__(self, api_key: str = None):
         self.base_url = "https://api.coingecko.com/api/v3"
         self.api_key = api_key
         self.session = requests.Session()
-        
+
         if self.api_key:
             self.session.headers.update({"X-CG-API-Key": self.api_key})
-    
+
     def get_top_coins(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Fetch top coins by market cap from CoinGecko"""
         url = f"{self.base_url}/coins/markets"
+        per_page, pages = _page_plan(limit)
+
+        try:
+            coins = []
+            for page in range(1, pages + 1):
+                if page > 1:
+                    self.rate_limit_delay()
+                params = {
+                    "vs_currency": "usd",
+                    "order": "market_cap_desc",
+                    "per_page": per_page,
+                    "page": page,
+                    "sparkline": False,
+                    "price_change_percentage": "24h"
+                }
+                response = self.session.get(url, params=params)
+                response.raise_for_status()
+                coins.extend(response.json())
+
+            return [process_coin(coin) for coin in coins[:limit]]
+
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching coins from CoinGecko: {e}")
+            return []
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return []
+
+    def rate_limit_delay(self):
+        """Add delay to respect rate limits (CoinGecko free tier: ~10-50 calls/minute)"""
+        time.sleep(1.2)  # Conservative delay
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ResponseCache:
+    """Short-lived on-disk JSON cache so separate processes can share one market snapshot"""
+
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = None):
+        self.directory = directory or os.getenv(
+            "COINGECKO_CACHE_DIR",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "coingecko")
+        )
+        self.ttl = ttl if ttl is not None else float(os.getenv("COINGECKO_CACHE_TTL", 300))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.ttl <= 0:
+            return None
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry.get("data")
+
+    def set(self, key: str, data: Any):
+        if self.ttl <= 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": time.time(), "data": data}, f)
+        os.replace(tmp_path, path)
+
+
+class AsyncCoinGeckoClient:
+    """Async CoinGecko client that fetches /coins/markets pages concurrently.
+
+    Requests share a token bucket sized for the free tier, 429 responses are
+    retried with Retry-After or exponential backoff, and raw pages go through
+    a ResponseCache so repeated runs within the TTL make no network calls.
+    """
+
+    def __init__(self, api_key: str = None, requests_per_minute: float = 30, burst: int = 5,
+                 max_retries: int = 5, cache: Optional[ResponseCache] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        self.base_url = "https://api.coingecko.com/api/v3"
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.cache = cache if cache is not None else ResponseCache()
+
+        headers = {"X-CG-API-Key": self.api_key} if self.api_key else {}
+        self.client = http_client or httpx.AsyncClient(headers=headers, timeout=httpx.Timeout(10.0, connect=5.0))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def _get_page(self, page: int, per_page: int) -> List[Dict[str, Any]]:
         params = {
             "vs_currency": "usd",
             "order": "market_cap_desc",
-            "per_page": limit,
-            "page": 1,
-            "sparkline": False,
+            "per_page": per_page,
+            "page": page,
+            "sparkline": "false",
             "price_change_percentage": "24h"
         }
-        
-        try:
-            response = self.session.get(url, params=params)
+        cache_key = f"coins/markets?per_page={per_page}&page={page}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            response = await self.client.get(f"{self.base_url}/coins/markets", params=params)
+            if response.status_code == 429 and attempt < self.max_retries:
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                print(f"CoinGecko rate limited page {page}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                continue
             response.raise_for_status()
-            
-            coins = response.json()
-            
+            data = response.json()
+            self.cache.set(cache_key, data)
+            return data
+
+    async def get_top_coins(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Fetch the top `limit` coins by market cap, paging past the 250-per-page cap"""
+        per_page, pages = _page_plan(limit)
+        try:
+            results = await asyncio.gather(*(self._get_page(page, per_page) for page in range(1, pages + 1)))
+
+            # Ranks can shift between page requests, so drop repeats
+            seen = set()
             processed_coins = []
-            for coin in coins:
-                processed_coin = {
-                    "coingecko_id": coin["id"],
-                    "symbol": coin["symbol"].upper(),
-                    "name": coin["name"],
-                    "price_usd": float(coin["current_price"]) if coin["current_price"] else 0.0,
-                    "market_cap": float(coin["market_cap"]) if coin["market_cap"] else 0.0,
-                    "last_updated": datetime.fromisoformat(coin["last_updated"].replace("Z", "+00:00"))
-                }
-                processed_coins.append(processed_coin)
-            
-            return processed_coins
-            
-        except requests.exceptions.RequestException as e:
+            for coin in (c for page in results for c in page):
+                if coin["id"] in seen:
+                    continue
+                seen.add(coin["id"])
+                processed_coins.append(process_coin(coin))
+            return processed_coins[:limit]
+
+        except httpx.HTTPError as e:
             print(f"Error fetching coins from CoinGecko: {e}")
             return []
         except Exception as e:
             print(f"Unexpected error: {e}")
             return []
-    
-    def rate_limit_delay(self):
-        """Add delay to respect rate limits (CoinGecko free tier: ~10-50 calls/minute)"""
-        time.sleep(1.2)  # Conservative delay
\ No newline at end of file
@@ -1,16 +1,25 @@
+import argparse
 import asyncio
 import os
-import sys
-from datetime import date, datetime
-from database import Database
-from coingecko_client import CoinGeckoClient
-from rss_parser import RSSParser
+from datetime import date, datetime, timedelta, timezone
+from database import Database, create_database
+from coingecko_client import AsyncCoinGeckoClient
+from sources import SourceScheduler, load_sources, replay_archive
+from feed_archive import DEFAULT_ARCHIVE_PATH, FeedArchive
 from sentiment_analyzer import SentimentAnalyzer
-
-
-def fetch_top_coins(coingecko: CoinGeckoClient, limit: int = 100):
-    print("Fetching top 100 coins from CoinGecko...")
-    coins_data = coingecko.get_top_coins(limit=limit)
+from retention import enabled as retention_enabled, run_retention
+from coin_registry import CoinRegistry
+from dedup import NearDuplicateIndex
+from feed_health import FeedHealth
+from profiling import Profiler
+from coin_snapshot import publish_snapshot
+from movers import refresh_deltas_after
+from backfill import build_sentiment_rows, score_stored_day
+
+
+async def fetch_top_coins(coingecko: AsyncCoinGeckoClient, limit: int = 100):
+    print(f"Fetching top {limit} coins from CoinGecko...")
+    coins_data = await coingecko.get_top_coins(limit=limit)
     if not coins_data:
         print("Failed to fetch coin data from CoinGecko")
         return []
@@ -18,48 +27,49 @@ def fetch_top_coins(coingecko: CoinGeckoClient, limit: int = 100):
     return coins_data
 
 
-async def upsert_coins_and_prices(db: Database, coins_data, today: date):
+async def upsert_coins_and_prices(db: Database, registry: CoinRegistry, coins_data, today: date):
     print("Updating coin data in database...")
-    coin_ids_map = {}
-    for coin_data in coins_data:
-        try:
-            coin_id = await db.insert_or_update_coin(
-                coingecko_id=coin_data["coingecko_id"],
-                symbol=coin_data["symbol"],
-                name=coin_data["name"],
-            )
-
-            await db.insert_coin_price(
-                coin_id=coin_id,
-                price_date=today,
-                price_usd=coin_data["price_usd"],
-                market_cap=coin_data["market_cap"],
-            )
-
-            coin_ids_map[coin_data["coingecko_id"]] = {
-                "id": coin_id,
-                "coingecko_id": coin_data["coingecko_id"],
-                "symbol": coin_data["symbol"],
-                "name": coin_data["name"],
-            }
+    coin_ids_map = await registry.sync(db, coins_data)
 
-        except Exception as e:
-            print(f"Error processing coin {coin_data.get('coingecko_id', 'unknown')}: {e}")
+    price_rows = []
+    for coin_data in coins_data:
+        coin = coin_ids_map.get(coin_data["coingecko_id"])
+        if coin is None:
+            print(f"Error processing coin {coin_data.get('coingecko_id', 'unknown')}: not registered")
             continue
+        price_rows.append({
+            "coin_id": coin["id"],
+            "date": today,
+            "price_usd": coin_data["price_usd"],
+            "market_cap": coin_data["market_cap"],
+        })
+    await db.upsert_coin_prices(price_rows)
 
     print(f"Updated {len(coin_ids_map)} coins in database")
     return coin_ids_map
 
 
-def fetch_rss_articles(rss_parser: RSSParser, max_feeds: int = None):
-    print("Fetching RSS feeds...")
-    articles = rss_parser.parse_all_feeds(max_feeds)
+async def fetch_source_articles(scheduler: SourceScheduler, sources, max_feeds: int = None):
+    print("Fetching articles from sources...")
+    if max_feeds:
+        sources = sources[:max_feeds]
+        print(f"Processing only first {max_feeds} sources for testing")
+    articles = await scheduler.fetch_all(sources)
     if not articles:
-        print("No articles found from RSS feeds")
+        print("No articles found from sources")
         return []
     return articles
 
 
+def collapse_near_duplicates(index: NearDuplicateIndex, articles):
+    print("Collapsing near-duplicate articles...")
+    index.load()
+    unique_articles, collapsed = index.filter_articles(articles)
+    index.save()
+    print(f"Collapsed {collapsed} near-duplicate articles, {len(unique_articles)} remain")
+    return unique_articles
+
+
 async def store_articles(db: Database, articles):
     print(f"Storing {len(articles)} articles in database...")
     for article in articles:
@@ -75,30 +85,27 @@ async def store_articles(db: Database, articles):
             continue
 
 
-def analyze_sentiment(sentiment_analyzer: SentimentAnalyzer, articles, coins_list, today: date):
-    print("Analyzing sentiment...")
-    return sentiment_analyzer.analyze_articles_for_coins(articles, coins_list, today)
+async def store_day_sentiment(db: Database, sentiment_analyzer: SentimentAnalyzer, coins_list, day: date):
+    """Rewrite day's coin_sentiment rows from the stored articles published on day (UTC)"""
+    print(f"Analyzing sentiment of articles published on {day}...")
+    totals, links = await score_stored_day(db, day, coins_list, sentiment_analyzer)
+    rows = build_sentiment_rows(totals, coins_list, day)
+    await db.upsert_coin_sentiments(rows)
+    print(f"Stored sentiment of {len(links)} articles for {len(rows)} coins")
+    return rows
 
 
-async def store_sentiment_data(db: Database, sentiment_data, today: date):
-    print("Storing sentiment data...")
-    for coin_id, sentiment_info in sentiment_data.items():
-        try:
-            await db.insert_coin_sentiment(
-                coin_id=coin_id,
-                sentiment_date=today,
-                sentiment_score=sentiment_info["sentiment_score"],
-                mentions_count=sentiment_info["total_mentions"],
-                no_mentions=sentiment_info["no_mentions"],
-            )
-        except Exception as e:
-            print(f"Error storing sentiment for coin {coin_id}: {e}")
-            continue
+def print_feed_health(feed_health: FeedHealth):
+    feed_health.load()
+    for row in feed_health.report():
+        print(f"{row['state']:<9} err {row['error_rate']:>5.0%} bozo {row['bozo_rate']:>5.0%} "
+              f"items {row['avg_items']:>6.1f} {row['avg_latency_ms']:>8.0f}ms  {row['url']}"
+              + (f"  ({row['last_error']})" if row['state'] != "closed" else ""))
 
 
-def print_summary(articles, sentiment_data, coins_data):
-    total_mentions = sum(data["total_mentions"] for data in sentiment_data.values())
-    coins_with_mentions = sum(1 for data in sentiment_data.values() if not data["no_mentions"])
+def print_summary(articles, sentiment_rows, coins_data):
+    total_mentions = sum(row["mentions_count"] for row in sentiment_rows)
+    coins_with_mentions = sum(1 for row in sentiment_rows if not row["no_mentions"])
 
     print("Summary:")
     print(f"- Processed {len(articles)} articles")
@@ -107,49 +114,164 @@ def print_summary(articles, sentiment_data, coins_data):
     print(f"- Updated data for {len(coins_data)} coins")
 
 
-async def run_daily_update(max_feeds: int = None):
+async def run_daily_update(max_feeds: int = None, profiler: Profiler = None):
     """Main function that runs the daily data collection and analysis"""
     print(f"Starting daily update at {datetime.now()}")
+    # Each stage is profiled into its own files when profiling is switched on
+    profiler = profiler or Profiler.from_env()
+    run_dir = f"cron_{datetime.now():%Y%m%dT%H%M%S}"
 
     try:
         # Initialize components
-        db = Database()
-        coingecko = CoinGeckoClient(api_key=os.getenv("COINGECKO_API_KEY"))
-        rss_parser = RSSParser()
+        db = create_database()
+        coingecko = AsyncCoinGeckoClient(api_key=os.getenv("COINGECKO_API_KEY"))
+        # RSS, Reddit and Trends sources from the registry (feeds.csv)
+        sources = load_sources()
+        # Per-feed health from earlier runs; failing feeds are skipped until their backoff expires
+        feed_health = FeedHealth()
+        feed_health.load()
+        scheduler = SourceScheduler(health=feed_health)
         sentiment_analyzer = SentimentAnalyzer()
+        registry = CoinRegistry()
+        await registry.load(db)
 
-        today = date.today()
+        # UTC, like the ingest daemon, so both write the same day's row
+        today = datetime.now(timezone.utc).date()
 
         # Step 1: Fetch top coins
-        coins_data = fetch_top_coins(coingecko, limit=100)
+        async with coingecko:
+            with profiler.stage("fetch_top_coins", run_dir):
+                coins_data = await fetch_top_coins(coingecko, limit=int(os.getenv("COINGECKO_TOP_N", 100)))
         if not coins_data:
             return
 
-        articles = fetch_rss_articles(rss_parser, max_feeds)
+        with profiler.stage("fetch_source_articles", run_dir):
+            try:
+                articles = await fetch_source_articles(scheduler, sources, max_feeds)
+            finally:
+                scheduler.close()
+                feed_health.save()
         if not articles:
             return
+        # Syndicated copies are dropped before they are stored or scored
+        with profiler.stage("collapse_near_duplicates", run_dir):
+            articles = collapse_near_duplicates(NearDuplicateIndex(), articles)
+
+        with profiler.stage("upsert_coins_and_prices", run_dir):
+            await upsert_coins_and_prices(db, registry, coins_data, today)
+
+        with profiler.stage("store_articles", run_dir):
+            await store_articles(db, articles)
+
+        # A day's row counts the stored articles published that day (score_stored_day).
+        # Only completed days are written: a row for today would cover the hours since
+        # midnight UTC, yet as the latest row it is what the dashboard shows until the
+        # next run. Yesterday is complete once what was published after the last run is stored
+        yesterday = today - timedelta(days=1)
+        coins_list = list(registry.coins.values())
+        with profiler.stage("analyze_sentiment", run_dir):
+            sentiment_rows = await store_day_sentiment(db, sentiment_analyzer, coins_list, yesterday)
+
+        # Day-over-day / week-over-week changes behind /api/movers
+        try:
+            await refresh_deltas_after(db, yesterday)
+        except Exception as e:
+            print(f"Error updating sentiment deltas: {e}")
 
-        coin_ids_map = await upsert_coins_and_prices(db, coins_data, today)
-        
-        await store_articles(db, articles)
-
-        coins_list = list(coin_ids_map.values())
-        sentiment_data = analyze_sentiment(sentiment_analyzer, articles, coins_list, today)
-
-        await store_sentiment_data(db, sentiment_data, today)
+        # API workers serve reads from this file when COIN_SNAPSHOT_PATH is set
+        if os.getenv("COIN_SNAPSHOT_PATH"):
+            try:
+                await publish_snapshot(db, os.getenv("COIN_SNAPSHOT_PATH"))
+            except Exception as e:
+                print(f"Error publishing coin snapshot: {e}")
 
         print(f"Daily update completed successfully at {datetime.now()}")
 
         # Print summary
-        print_summary(articles, sentiment_data, coins_data)
+        print_summary(articles, sentiment_rows, coins_data)
+
+        # Old data is pruned after the new day is safely written, only when switched on
+        if retention_enabled():
+            try:
+                await run_retention(db)
+            except Exception as e:
+                print(f"Error during retention: {e}")
 
     except Exception as e:
         print(f"Error during daily update: {e}")
         raise
 
+async def run_replay(day: date, archive: FeedArchive = None, db=None):
+    """Re-run parsing and analysis of day from the raw feed archive, with no network.
+
+    Articles are stored (existing links are kept) and day's coin_sentiment
+    is rewritten from the stored articles published that day, with the
+    current analyzer and coin list.
+    """
+    archive = archive or FeedArchive(os.getenv("FEED_ARCHIVE_DIR", DEFAULT_ARCHIVE_PATH))
+    db = db or create_database()
+    stats = archive.stats(day)
+    print(f"Replaying {stats['fetches']} fetches ({stats['bodies']} distinct bodies) archived on {day}")
+    articles = replay_archive(archive, day)
+    if not articles:
+        print("No archived articles for that day")
+        return []
+    # A fresh in-memory index, so the result does not depend on earlier runs
+    articles = NearDuplicateIndex().filter_articles(articles)[0]
+    await store_articles(db, articles)
+    await store_day_sentiment(db, SentimentAnalyzer(), await db.get_all_coins(), day)
+    try:
+        await refresh_deltas_after(db, day)
+    except Exception as e:
+        print(f"Error updating sentiment deltas: {e}")
+    print(f"Replayed {len(articles)} articles for {day}")
+    return articles
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crypto sentiment data collection")
+    parser.add_argument("--test", action="store_true", help="process only the first 3 sources")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                        help="rescore stored articles for an inclusive YYYY-MM-DD date range")
+    parser.add_argument("--checkpoint", default=None, help="backfill checkpoint file")
+    parser.add_argument("--retention", action="store_true", help="only apply the retention policies, downsampling the whole history")
+    parser.add_argument("--workers", type=int, default=None, help="backfill scoring processes (default: CPU count)")
+    parser.add_argument("--profile", metavar="DIR", default=None,
+                        help="write cProfile, flamegraph stacks and tracemalloc snapshots for each stage to DIR")
+    parser.add_argument("--distributed", action="store_true",
+                        help="work through today's feeds (or the --backfill dates) as leased work items shared with other workers")
+    parser.add_argument("--worker-id", default=None, help="name of this worker in the lease table (default: host-pid-random)")
+    parser.add_argument("--feed-health", action="store_true", help="print the recorded health of every feed and exit")
+    parser.add_argument("--daemon", action="store_true", help="keep running and poll each feed on its own adaptive interval")
+    parser.add_argument("--replay", metavar="DATE", default=None,
+                        help="reprocess the feeds archived on YYYY-MM-DD (FEED_ARCHIVE_DIR) without fetching")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    # if run with --test, process only 1 feed
-    if "--test" in sys.argv:
-        asyncio.run(run_daily_update(3))
+    args = parse_args()
+    if args.backfill and args.distributed:
+        from distributed import run_backfill_worker
+        start, end = (date.fromisoformat(d) for d in args.backfill)
+        asyncio.run(run_backfill_worker(start, end, worker_id=args.worker_id, workers=args.workers))
+    elif args.backfill:
+        from backfill import run_backfill, DEFAULT_CHECKPOINT_PATH
+        start, end = (date.fromisoformat(d) for d in args.backfill)
+        asyncio.run(run_backfill(start, end, checkpoint_path=args.checkpoint or DEFAULT_CHECKPOINT_PATH, workers=args.workers))
+    elif args.distributed:
+        from distributed import run_ingest_worker
+        asyncio.run(run_ingest_worker(worker_id=args.worker_id, max_feeds=3 if args.test else None))
+    elif args.feed_health:
+        print_feed_health(FeedHealth())
+    elif args.replay:
+        asyncio.run(run_replay(date.fromisoformat(args.replay)))
+    elif args.daemon:
+        from ingest_daemon import run_daemon
+        asyncio.run(run_daemon())
+    elif args.retention:
+        asyncio.run(run_retention(create_database(), full=True))
+    # if run with --test, process only the first 3 feeds
+    elif args.test:
+        asyncio.run(run_daily_update(3, Profiler.from_env(args.profile)))
     else:
-        asyncio.run(run_daily_update(None))
\ No newline at end of file
+        asyncio.run(run_daily_update(None, Profiler.from_env(args.profile)))
\ No newline at end of file
@@ -1,12 +1,134 @@
 import os
 import asyncio
-from typing import Optional, List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Protocol, TYPE_CHECKING
 from datetime import date, datetime, timezone, timedelta
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 load_dotenv()
 
+
+def build_http_client():
+    """Pooled keep-alive HTTP/2 client shared by every PostgREST call.
+
+    Concurrent queries become multiplexed streams on a few long-lived
+    connections instead of each paying for its own TCP and TLS handshake.
+    The timeout applies to every call; connecting gets a shorter budget.
+    """
+    import httpx
+    max_connections = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 10))
+    return httpx.Client(
+        http2=os.getenv("SUPABASE_HTTP2", "1") != "0",
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=60.0),
+        timeout=httpx.Timeout(float(os.getenv("SUPABASE_TIMEOUT", 10)), connect=float(os.getenv("SUPABASE_CONNECT_TIMEOUT", 5))),
+    )
+
+
+def create_client(url: str, key: str) -> "Client":
+    """Build the Supabase client on top of build_http_client().
+
+    The SDK pulls in auth, realtime, storage and functions clients (about a
+    third of the API's import time), so it is imported here on first use
+    rather than when this module loads.
+    """
+    from supabase import ClientOptions, create_client as supabase_create_client
+    return supabase_create_client(url, key, options=ClientOptions(httpx_client=build_http_client()))
+
+
+def encode_search_cursor(rank: float, article_id: int) -> str:
+    """Opaque keyset cursor pointing just past the given search result"""
+    return f"{float(rank)!r}:{int(article_id)}"
+
+
+def decode_search_cursor(cursor: str):
+    """Inverse of encode_search_cursor; raises ValueError on malformed input"""
+    rank, article_id = cursor.split(":")
+    return float(rank), int(article_id)
+
+
+def search_page(rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """Trim a limit+1 result set to one page and compute its next cursor"""
+    results = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and results:
+        last = results[-1]
+        next_cursor = encode_search_cursor(last["rank"], last["id"])
+    return {"results": results, "next_cursor": next_cursor}
+
+
+def group_articles_by_coin(rows: List[Dict[str, Any]], coin_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Split recent_articles_for_coins rows into {coin_id: [article, ...]}, with every requested coin present"""
+    grouped: Dict[int, List[Dict[str, Any]]] = {coin_id: [] for coin_id in coin_ids}
+    for row in rows:
+        article = dict(row)
+        coin_id = article.pop("coin_id")
+        grouped.setdefault(coin_id, []).append(article)
+    return grouped
+
+
+def recent_articles_since(since: Optional[datetime] = None) -> datetime:
+    """Oldest published_date get_recent_articles_for_coins looks at (RECENT_ARTICLES_DAYS back by default)"""
+    if since is not None:
+        return since
+    return datetime.now(timezone.utc) - timedelta(days=int(os.getenv("RECENT_ARTICLES_DAYS", 30)))
+
+
+class StorageBackend(Protocol):
+    """Operations the pipeline and API need from a storage backend.
+
+    Database (Supabase) and local_database.LocalDatabase (SQLite) both
+    implement it; use create_database() to get the configured one.
+    """
+
+    async def ping(self) -> bool: ...
+    async def insert_or_update_coin(self, coingecko_id: str, symbol: str, name: str) -> int: ...
+    async def insert_coins(self, coins: List[Dict[str, Any]]) -> List[Dict[str, Any]]: ...
+    async def update_coin(self, coin_id: int, symbol: str, name: str): ...
+    async def insert_coin_price(self, coin_id: int, price_date: date, price_usd: float, market_cap: Optional[float]): ...
+    async def upsert_coin_prices(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int: ...
+    async def insert_article(self, title: str, summary: Optional[str], link: Optional[str], published_date: datetime) -> int: ...
+    async def insert_articles(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int: ...
+    async def insert_coin_sentiment(self, coin_id: int, sentiment_date: date, sentiment_score: Optional[float], mentions_count: int, no_mentions: bool = False): ...
+    async def upsert_coin_sentiments(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int: ...
+    async def delete_articles_batch(self, published_before: datetime, limit: int = 1000) -> int: ...
+    async def upsert_sentiment_deltas(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int: ...
+    async def delete_sentiment_deltas(self, delta_date: date) -> int: ...
+    async def get_top_movers(self, metric: str, window_days: int, direction: str = "up", limit: int = 10) -> List[Dict[str, Any]]: ...
+    async def get_daily_rows_before(self, table: str, before: date, after_id: int = 0, limit: int = 1000, since: Optional[date] = None) -> List[Dict[str, Any]]: ...
+    async def get_daily_rows_since(self, table: str, since: date, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]: ...
+    async def get_sentiment_rows(self, dates: List[date], after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]: ...
+    async def delete_rows_by_ids(self, table: str, ids: List[int]): ...
+    async def get_articles_page(self, start: datetime, end: datetime, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]: ...
+    async def get_all_coins(self) -> List[Dict[str, Any]]: ...
+    async def enqueue_work(self, batch: str, kind: str, items: List[str]) -> int: ...
+    async def claim_work(self, batch: str, owner: str, lease_seconds: int = 300, limit: int = 1, max_attempts: int = 3) -> List[Dict[str, Any]]: ...
+    async def heartbeat_work(self, ids: List[int], owner: str, lease_seconds: int = 300) -> List[int]: ...
+    async def finish_work(self, item_id: int, owner: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool: ...
+    async def release_work(self, item_id: int, owner: str, attempts: int) -> bool: ...
+    async def get_work_items(self, batch: str, kind: Optional[str] = None) -> List[Dict[str, Any]]: ...
+    async def get_latest_coin_data(self) -> List[Dict[str, Any]]: ...
+    async def get_coin_details(self, coin_id: int) -> Optional[Dict[str, Any]]: ...
+    async def get_recent_articles_for_coin(self, coin_id: int, limit: int = 10) -> List[Dict[str, Any]]: ...
+    async def get_recent_articles_for_coins(self, coin_ids: List[int], limit: int = 10, since: Optional[datetime] = None) -> Dict[int, List[Dict[str, Any]]]: ...
+    async def search_articles(self, query: str, coin_id: Optional[int] = None, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None, cursor: Optional[str] = None, limit: int = 20) -> Dict[str, Any]: ...
+    def close(self): ...
+
+
+def create_database() -> StorageBackend:
+    """Build the storage backend selected by DATABASE_BACKEND (supabase or sqlite)"""
+    backend = os.getenv("DATABASE_BACKEND", "supabase").lower()
+    if backend == "sqlite":
+        from local_database import LocalDatabase
+        return LocalDatabase()
+    if backend == "supabase":
+        return Database()
+    raise ValueError(f"Unknown DATABASE_BACKEND: {backend}")
+
+
 class Database:
     def __init__(self):
         self.supabase_url = os.getenv("SUPABASE_URL")
@@ -14,20 +136,50 @@ class Database:
         
         if not self.supabase_url or not self.supabase_key:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY environment variables are required")
-        
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+
+        self._client: Optional["Client"] = None
+        self._client_lock = threading.Lock()
+        # supabase-py is synchronous: queries run here, at most this many at once
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("SUPABASE_MAX_CONCURRENCY", 16)),
+            thread_name_prefix="supabase",
+        )
+
+    @property
+    def supabase(self) -> "Client":
+        """Supabase client, created by the first query rather than at startup"""
+        # Queries run on executor threads, so the first ones can race here
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = create_client(self.supabase_url, self.supabase_key)
+        return self._client
+
+    def close(self):
+        """Wait for in-flight queries, then close the pooled connections"""
+        self._executor.shutdown(wait=True)
+        http_client = getattr(getattr(self._client, "options", None), "httpx_client", None)
+        if http_client is not None:
+            http_client.close()
+
+    async def ping(self) -> bool:
+        await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("coins").select("id").limit(1).execute()
+        )
+        return True
     
     async def insert_or_update_coin(self, coingecko_id: str, symbol: str, name: str) -> int:
         # Check if coin exists
         existing = await asyncio.get_event_loop().run_in_executor(
-            None, 
+            self._executor, 
             lambda: self.supabase.table("coins").select("id").eq("coingecko_id", coingecko_id).execute()
         )
         
         if existing.data:
             # Update existing coin
             result = await asyncio.get_event_loop().run_in_executor(
-                None,
+                self._executor,
                 lambda: self.supabase.table("coins").update({
                     "symbol": symbol,
                     "name": name
@@ -37,7 +189,7 @@ class Database:
         else:
             # Insert new coin
             result = await asyncio.get_event_loop().run_in_executor(
-                None,
+                self._executor,
                 lambda: self.supabase.table("coins").insert({
                     "coingecko_id": coingecko_id,
                     "symbol": symbol,
@@ -46,10 +198,34 @@ class Database:
             )
             return result.data[0]['id']
     
+    async def insert_coins(self, coins: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert many coins in one request and return the stored rows with their ids.
+
+        Upserts on coingecko_id so a coin inserted concurrently by another run
+        is returned instead of failing the whole batch.
+        """
+        if not coins:
+            return []
+        payload = [{"coingecko_id": c["coingecko_id"], "symbol": c["symbol"], "name": c["name"]} for c in coins]
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("coins").upsert(payload, on_conflict="coingecko_id").execute()
+        )
+        return result.data
+
+    async def update_coin(self, coin_id: int, symbol: str, name: str):
+        await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("coins").update({
+                "symbol": symbol,
+                "name": name
+            }).eq("id", coin_id).execute()
+        )
+
     async def insert_coin_price(self, coin_id: int, price_date: date, price_usd: float, market_cap: Optional[float]):
         # Check if price entry exists for this coin and date
         existing = await asyncio.get_event_loop().run_in_executor(
-            None,
+            self._executor,
             lambda: self.supabase.table("coin_prices").select("id").eq("coin_id", coin_id).eq("date", price_date.isoformat()).execute()
         )
         
@@ -63,7 +239,7 @@ class Database:
         if existing.data:
             # Update existing price
             await asyncio.get_event_loop().run_in_executor(
-                None,
+                self._executor,
                 lambda: self.supabase.table("coin_prices").update({
                     "price_usd": price_usd,
                     "market_cap": market_cap
@@ -72,7 +248,7 @@ class Database:
         else:
             # Insert new price
             await asyncio.get_event_loop().run_in_executor(
-                None,
+                self._executor,
                 lambda: self.supabase.table("coin_prices").insert(price_data).execute()
             )
     
@@ -87,7 +263,7 @@ class Database:
         # Use upsert with on_conflict to handle duplicate links
         # In Supabase, this will insert if link doesn't exist, or return existing row if it does
         result = await asyncio.get_event_loop().run_in_executor(
-            None,
+            self._executor,
             lambda: self.supabase.table("articles").insert(article_data).on_conflict("link").execute()
         )
         return result.data[0]['id']
@@ -95,7 +271,7 @@ class Database:
     async def insert_coin_sentiment(self, coin_id: int, sentiment_date: date, sentiment_score: Optional[float], mentions_count: int, no_mentions: bool = False):
         # Check if sentiment entry exists for this coin and date
         existing = await asyncio.get_event_loop().run_in_executor(
-            None,
+            self._executor,
             lambda: self.supabase.table("coin_sentiment").select("id").eq("coin_id", coin_id).eq("date", sentiment_date.isoformat()).execute()
         )
         
@@ -110,7 +286,7 @@ class Database:
         if existing.data:
             # Update existing sentiment
             await asyncio.get_event_loop().run_in_executor(
-                None,
+                self._executor,
                 lambda: self.supabase.table("coin_sentiment").update({
                     "sentiment_score": sentiment_score,
                     "mentions_count": mentions_count,
@@ -120,25 +296,267 @@ class Database:
         else:
             # Insert new sentiment
             await asyncio.get_event_loop().run_in_executor(
-                None,
+                self._executor,
                 lambda: self.supabase.table("coin_sentiment").insert(sentiment_data).execute()
             )
     
+    async def upsert_coin_sentiments(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Bulk upsert coin_sentiment rows keyed on (coin_id, date).
+
+        Each row needs coin_id, date (date or ISO string), sentiment_score,
+        mentions_count and no_mentions. Returns the number of rows written.
+        """
+        payload = []
+        for row in rows:
+            row_date = row["date"]
+            payload.append({
+                "coin_id": row["coin_id"],
+                "date": row_date.isoformat() if isinstance(row_date, date) else row_date,
+                "sentiment_score": row.get("sentiment_score"),
+                "mentions_count": row.get("mentions_count", 0),
+                "no_mentions": row.get("no_mentions", False)
+            })
+
+        written = 0
+        for start in range(0, len(payload), batch_size):
+            batch = payload[start:start + batch_size]
+            await asyncio.get_event_loop().run_in_executor(
+                self._executor,
+                lambda: self.supabase.table("coin_sentiment").upsert(batch, on_conflict="coin_id,date").execute()
+            )
+            written += len(batch)
+        return written
+
+    async def upsert_sentiment_deltas(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Bulk upsert coin_sentiment_deltas rows keyed on (coin_id, date, window_days, metric)"""
+        payload = []
+        for row in rows:
+            row_date = row["date"]
+            payload.append({
+                "coin_id": row["coin_id"],
+                "date": row_date.isoformat() if isinstance(row_date, date) else row_date,
+                "window_days": row["window_days"],
+                "metric": row["metric"],
+                "value": row["value"],
+                "previous": row["previous"],
+                "delta": row["delta"]
+            })
+
+        written = 0
+        for start in range(0, len(payload), batch_size):
+            batch = payload[start:start + batch_size]
+            await asyncio.get_event_loop().run_in_executor(
+                self._executor,
+                lambda: self.supabase.table("coin_sentiment_deltas").upsert(batch, on_conflict="coin_id,date,window_days,metric").execute()
+            )
+            written += len(batch)
+        return written
+
+    async def delete_sentiment_deltas(self, delta_date: date) -> int:
+        """Delete every coin_sentiment_deltas row of delta_date (all windows and metrics)"""
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("coin_sentiment_deltas").delete().eq("date", delta_date.isoformat()).execute()
+        )
+        return len(result.data or [])
+
+    async def upsert_coin_prices(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Bulk upsert coin_prices rows keyed on (coin_id, date). Returns the number of rows written."""
+        payload = []
+        for row in rows:
+            row_date = row["date"]
+            payload.append({
+                "coin_id": row["coin_id"],
+                "date": row_date.isoformat() if isinstance(row_date, date) else row_date,
+                "price_usd": row["price_usd"],
+                "market_cap": row.get("market_cap")
+            })
+
+        written = 0
+        for start in range(0, len(payload), batch_size):
+            batch = payload[start:start + batch_size]
+            await asyncio.get_event_loop().run_in_executor(
+                self._executor,
+                lambda: self.supabase.table("coin_prices").upsert(batch, on_conflict="coin_id,date").execute()
+            )
+            written += len(batch)
+        return written
+
+    async def insert_articles(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Bulk insert articles, skipping links that are already stored. Returns the number of rows sent."""
+        payload = [{
+            "title": row["title"],
+            "summary": row.get("summary"),
+            "link": row["link"],
+            "published_date": row["published_date"].isoformat(),
+        } for row in rows]
+
+        written = 0
+        for start in range(0, len(payload), batch_size):
+            batch = payload[start:start + batch_size]
+            await asyncio.get_event_loop().run_in_executor(
+                self._executor,
+                lambda: self.supabase.table("articles").upsert(batch, on_conflict="link", ignore_duplicates=True).execute()
+            )
+            written += len(batch)
+        return written
+
+    async def delete_articles_batch(self, published_before: datetime, limit: int = 1000) -> int:
+        """Delete at most `limit` articles published before the cutoff and return how many went.
+
+        Deleting by a bounded id list keeps each statement (and its locks) short;
+        callers loop until it returns 0.
+        """
+        old = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("articles").select("id").lt("published_date", published_before.isoformat()).order("id").limit(limit).execute()
+        )
+        ids = [row["id"] for row in old.data]
+        if not ids:
+            return 0
+        await self.delete_rows_by_ids("articles", ids)
+        return len(ids)
+
+    async def get_daily_rows_before(self, table: str, before: date, after_id: int = 0, limit: int = 1000, since: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Keyset page of coin_prices / coin_sentiment rows dated before `before` (and on or after `since`), ordered by id"""
+        def query():
+            q = self.supabase.table(table).select("*").lt("date", before.isoformat())
+            if since is not None:
+                q = q.gte("date", since.isoformat())
+            return q.gt("id", after_id).order("id").limit(limit).execute()
+        result = await asyncio.get_event_loop().run_in_executor(self._executor, query)
+        return result.data
+
+    async def get_daily_rows_since(self, table: str, since: date, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Keyset page of coin_prices / coin_sentiment rows dated on or after `since`, ordered by id"""
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table(table).select("*").gte("date", since.isoformat()).gt("id", after_id).order("id").limit(limit).execute()
+        )
+        return result.data
+
+    async def get_sentiment_rows(self, dates: List[date], after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Keyset page of coin_sentiment rows for the given dates, ordered by id"""
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("coin_sentiment").select("*").in_("date", [d.isoformat() for d in dates]).gt("id", after_id).order("id").limit(limit).execute()
+        )
+        return result.data
+
+    async def delete_rows_by_ids(self, table: str, ids: List[int]):
+        await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table(table).delete().in_("id", ids).execute()
+        )
+
+    async def get_articles_page(self, start: datetime, end: datetime, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Return one keyset page of articles published in [start, end), ordered by id.
+
+        Pass the last id of the previous page as after_id to continue; an empty
+        list means the range is exhausted.
+        """
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("articles")
+                .select("id, title, summary, link, published_date")
+                .gte("published_date", start.isoformat())
+                .lt("published_date", end.isoformat())
+                .gt("id", after_id)
+                .order("id")
+                .limit(limit)
+                .execute()
+        )
+        return result.data
+
+    async def get_top_movers(self, metric: str, window_days: int, direction: str = "up", limit: int = 10) -> List[Dict[str, Any]]:
+        """Largest (direction up) or smallest (down) deltas of the latest day, via the top_movers function"""
+        params = {"p_metric": metric, "p_window_days": window_days, "p_direction": direction, "p_limit": limit}
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.rpc("top_movers", params).execute()
+        )
+        return result.data
+
+    async def enqueue_work(self, batch: str, kind: str, items: List[str]) -> int:
+        """Add work items to a batch; items already in it keep their state. Returns rows inserted."""
+        payload = [{"batch": batch, "kind": kind, "item": item} for item in items]
+        if not payload:
+            return 0
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("work_leases").upsert(payload, on_conflict="batch,kind,item", ignore_duplicates=True).execute()
+        )
+        return len(result.data)
+
+    async def claim_work(self, batch: str, owner: str, lease_seconds: int = 300, limit: int = 1, max_attempts: int = 3) -> List[Dict[str, Any]]:
+        """Lease up to limit pending or expired items of batch (claim_work uses FOR UPDATE SKIP LOCKED)"""
+        params = {"p_batch": batch, "p_owner": owner, "p_lease_seconds": lease_seconds, "p_limit": limit, "p_max_attempts": max_attempts}
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.rpc("claim_work", params).execute()
+        )
+        return result.data
+
+    async def heartbeat_work(self, ids: List[int], owner: str, lease_seconds: int = 300) -> List[int]:
+        """Extend the leases owner still holds among ids; returns those ids"""
+        params = {"p_ids": ids, "p_owner": owner, "p_lease_seconds": lease_seconds}
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.rpc("heartbeat_work", params).execute()
+        )
+        return [row["id"] for row in result.data]
+
+    async def finish_work(self, item_id: int, owner: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool:
+        """Move a leased item to status (done, failed or back to pending); False if the lease was lost"""
+        payload = {
+            "status": status,
+            "result": result,
+            "error": error,
+            "lease_expires_at": None,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        updated = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("work_leases").update(payload).eq("id", item_id).eq("owner", owner).eq("status", "leased").execute()
+        )
+        return bool(updated.data)
+
+    async def release_work(self, item_id: int, owner: str, attempts: int) -> bool:
+        """Put a leased item back to pending with its attempt count reset to attempts; False if the lease was lost"""
+        payload = {
+            "status": "pending",
+            "attempts": attempts,
+            "lease_expires_at": None,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        updated = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("work_leases").update(payload).eq("id", item_id).eq("owner", owner).eq("status", "leased").execute()
+        )
+        return bool(updated.data)
+
+    async def get_work_items(self, batch: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        def query():
+            q = self.supabase.table("work_leases").select("*").eq("batch", batch)
+            if kind is not None:
+                q = q.eq("kind", kind)
+            return q.order("id").execute()
+        result = await asyncio.get_event_loop().run_in_executor(self._executor, query)
+        return result.data
+
     async def get_all_coins(self) -> List[Dict[str, Any]]:
         result = await asyncio.get_event_loop().run_in_executor(
-            None,
+            self._executor,
             lambda: self.supabase.table("coins").select("id, coingecko_id, symbol, name").execute()
         )
         return result.data
     
     async def get_latest_coin_data(self) -> List[Dict[str, Any]]:
         # Use the view we created in the schema
-        #result = await asyncio.get_event_loop().run_in_executor(
-            #None,
-            #lambda: self.supabase.table("latest_coin_data").select("*").not_("price_usd", "is", None).order("sentiment_score", desc=True).order("market_cap", desc=True).execute()
-        #)
-        query = self.supabase.table("latest_coin_data").select("*").order("sentiment_score", desc=True).order("market_cap", desc=True)
-        result = query.execute()
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("latest_coin_data").select("*").order("sentiment_score", desc=True).order("market_cap", desc=True).execute()
+        )
         
         # Process the results to handle null sentiment scores properly
         processed_data = []
@@ -160,6 +578,31 @@ class Database:
         
         return processed_data
 
+    async def get_coin_details(self, coin_id: int) -> Optional[Dict[str, Any]]:
+        """Coin row plus its last 30 days of prices and sentiment, or None if unknown"""
+        coin_rows = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.table("coins").select("id, coingecko_id, symbol, name, created_at").eq("id", coin_id).execute()
+        )
+        if not coin_rows.data:
+            return None
+
+        prices, sentiment = await asyncio.gather(
+            asyncio.get_event_loop().run_in_executor(
+                self._executor,
+                lambda: self.supabase.table("coin_prices").select("date, price_usd, market_cap").eq("coin_id", coin_id).order("date", desc=True).limit(30).execute()
+            ),
+            asyncio.get_event_loop().run_in_executor(
+                self._executor,
+                lambda: self.supabase.table("coin_sentiment").select("date, sentiment_score, mentions_count, no_mentions").eq("coin_id", coin_id).order("date", desc=True).limit(30).execute()
+            ),
+        )
+        return {
+            "coin": coin_rows.data[0],
+            "recent_prices": prices.data,
+            "recent_sentiment": sentiment.data
+        }
+
     async def get_recent_articles_for_coin(self, coin_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Return the most recent N articles that mention the specified coin.
 
@@ -172,7 +615,7 @@ class Database:
         """
         # Fetch coin to get its name and symbol
         coin_rows = await asyncio.get_event_loop().run_in_executor(
-            None,
+            self._executor,
             lambda: self.supabase.table("coins").select("id, name, symbol").eq("id", coin_id).execute()
         )
         if not coin_rows.data:
@@ -184,7 +627,7 @@ class Database:
 
         # Fetch recent articles ordered by published_date desc
         articles_result = await asyncio.get_event_loop().run_in_executor(
-            None,
+            self._executor,
             lambda: self.supabase.table("articles").select("id, title, summary, link, published_date").order("published_date", desc=True).execute()
         )
 
@@ -198,4 +641,43 @@ class Database:
         matching = [a for a in articles_result.data if mentions_coin(a)]
         # Sort again for safety and slice to limit
         matching.sort(key=lambda a: a.get("published_date", ""), reverse=True)
-        return matching[: max(0, int(limit))]
\ No newline at end of file
+        return matching[: max(0, int(limit))]
+
+    async def get_recent_articles_for_coins(self, coin_ids: List[int], limit: int = 10, since: Optional[datetime] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """Latest limit articles published after since for each coin, from one windowed query (recent_articles_for_coins function)"""
+        if not coin_ids:
+            return {}
+        params = {
+            "p_coin_ids": list(coin_ids),
+            "p_limit": max(0, int(limit)),
+            "p_since": recent_articles_since(since).isoformat(),
+        }
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.rpc("recent_articles_for_coins", params).execute()
+        )
+        return group_articles_by_coin(result.data, coin_ids)
+
+    async def search_articles(self, query: str, coin_id: Optional[int] = None, date_from: Optional[datetime] = None,
+                              date_to: Optional[datetime] = None, cursor: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """Ranked full-text search over article title and summary.
+
+        Runs the search_articles SQL function (GIN index on articles.search_vector)
+        and returns {"results": [...], "next_cursor": str or None}; pass
+        next_cursor back to get the following page.
+        """
+        after_rank, after_id = decode_search_cursor(cursor) if cursor else (None, None)
+        params = {
+            "q": query,
+            "p_coin_id": coin_id,
+            "p_from": date_from.isoformat() if date_from else None,
+            "p_to": date_to.isoformat() if date_to else None,
+            "p_after_rank": after_rank,
+            "p_after_id": after_id,
+            "p_limit": limit + 1,
+        }
+        result = await asyncio.get_event_loop().run_in_executor(
+            self._executor,
+            lambda: self.supabase.rpc("search_articles", params).execute()
+        )
+        return search_page(result.data, limit)
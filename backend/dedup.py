@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from text_cleaner import article_text
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "near_duplicates.json")
+
+# 64 MinHash values split into 16 bands of 4 rows. Two articles land in a
+# shared bucket with probability 1 - (1 - J^4)^16: ~99.8% at Jaccard 0.75,
+# ~2% at Jaccard 0.3. Candidates are then confirmed against SIMILARITY_THRESHOLD.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SIMILARITY_THRESHOLD = 0.7
+
+# Fixed seed so signatures stay comparable across runs and processes
+_MASKS = [random.Random(0x5EED + i).getrandbits(64) for i in range(NUM_PERMUTATIONS)]
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop markup and punctuation, and collapse whitespace"""
+    text = _TAG_RE.sub(" ", text or "")
+    text = _NON_WORD_RE.sub(" ", text.lower())
+    return _WS_RE.sub(" ", text).strip()
+
+
+def shingles(text: str, size: int = 3) -> set:
+    words = text.split()
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text: str) -> List[int]:
+    """MinHash signature of the word 3-shingles of already normalized text.
+
+    Each shingle is hashed once; the permutations are XOR masks applied with
+    map(), which keeps the inner loop in C.
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles(text)
+    ]
+    if not hashes:
+        return []
+    return [min(map(mask.__xor__, hashes)) for mask in _MASKS]
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    if not a or not b:
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERMUTATIONS
+
+
+def article_signature(article: Dict[str, Any]) -> List[int]:
+    return minhash(normalize(article_text(article)))
+
+
+class NearDuplicateIndex:
+    """Persistent banded MinHash (LSH) index of recently seen articles.
+
+    Each signature is filed under its 16 band hashes, so a lookup costs 16
+    dict probes plus a comparison per candidate regardless of index size.
+    Entries remember the link they were first seen with: seeing the same link
+    again (feeds repeat items for days) is not a duplicate, seeing the same
+    story under another link is.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_days: int = 7, threshold: float = SIMILARITY_THRESHOLD):
+        self.path = path or os.getenv("NEAR_DUP_INDEX_PATH", DEFAULT_INDEX_PATH)
+        self.max_age = timedelta(days=max_age_days)
+        self.threshold = threshold
+        self.entries: List[Dict[str, Any]] = []
+        self.bands: Dict[Tuple[int, int], List[int]] = {}
+
+    @staticmethod
+    def _band_keys(signature: List[int]):
+        return [
+            (band, hash(tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])))
+            for band in range(BANDS)
+        ]
+
+    def add(self, signature: List[int], link: str, seen_at: Optional[datetime] = None):
+        if not signature:
+            return
+        entry_id = len(self.entries)
+        self.entries.append({
+            "signature": signature,
+            "link": link or "",
+            "seen_at": (seen_at or datetime.now(timezone.utc)).isoformat(),
+        })
+        for key in self._band_keys(signature):
+            self.bands.setdefault(key, []).append(entry_id)
+
+    def find(self, signature: List[int]) -> Optional[Dict[str, Any]]:
+        """Return the most similar indexed entry at or above the threshold, if any"""
+        if not signature:
+            return None
+        best, best_score = None, self.threshold
+        checked = set()
+        for key in self._band_keys(signature):
+            for entry_id in self.bands.get(key, ()):
+                if entry_id in checked:
+                    continue
+                checked.add(entry_id)
+                score = similarity(self.entries[entry_id]["signature"], signature)
+                if score >= best_score:
+                    best, best_score = self.entries[entry_id], score
+        return best
+
+    def filter_articles(self, articles: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Drop near-duplicates of already indexed articles (including earlier ones in this batch).
+
+        Returns (kept_articles, collapsed_count) and indexes the kept ones.
+        """
+        kept = []
+        collapsed = 0
+        for article in articles:
+            signature = article_signature(article)
+            match = self.find(signature)
+            if match is not None:
+                if match["link"] != (article.get("link") or ""):
+                    collapsed += 1
+                    continue
+            else:
+                self.add(signature, article.get("link"))
+            kept.append(article)
+        return kept, collapsed
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            state = json.load(f)
+        cutoff = datetime.now(timezone.utc) - self.max_age
+        for entry in state.get("entries", []):
+            seen_at = datetime.fromisoformat(entry["seen_at"])
+            if seen_at >= cutoff:
+                self.add(entry["signature"], entry["link"], seen_at)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
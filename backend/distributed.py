@@ -0,0 +1,313 @@
+import asyncio
+import os
+import socket
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+from backfill import backfill_day, build_sentiment_rows, merge_totals, score_articles, score_stored_day, _init_worker
+from coin_registry import CoinRegistry
+from coin_snapshot import publish_snapshot
+from coingecko_client import AsyncCoinGeckoClient
+from cron_job import fetch_top_coins, store_articles, upsert_coins_and_prices
+from feed_health import FeedHealth
+from movers import refresh_deltas_after
+from sentiment_analyzer import SentimentAnalyzer
+from sources import SourceScheduler, load_sources
+
+LEASE_SECONDS = int(os.getenv("WORK_LEASE_SECONDS", 300))
+MAX_ATTEMPTS = int(os.getenv("WORK_MAX_ATTEMPTS", 3))
+POLL_SECONDS = float(os.getenv("WORK_POLL_SECONDS", 5))
+
+Handler = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class NotReady(Exception):
+    """Raised by a handler whose item depends on unfinished work; the item is put back without using an attempt"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def ingest_batch(day: date) -> str:
+    return f"ingest:{day.isoformat()}"
+
+
+def backfill_batch(start: date, end: date) -> str:
+    return f"backfill:{start.isoformat()}:{end.isoformat()}"
+
+
+class WorkQueue:
+    """One worker's view of a batch of work items in the work_leases table.
+
+    Items are leased one at a time; while a handler runs, the lease is
+    renewed every lease_seconds / 3 so a slow item is not handed out twice,
+    and a crashed worker's item becomes claimable again once its lease
+    expires. A failing item goes back to pending until it has been tried
+    max_attempts times. A handler that raises NotReady gives its item back
+    straight away, so no worker ever blocks on other items while holding a
+    lease. Handlers must be idempotent: an item whose lease was lost can
+    run twice.
+    """
+
+    def __init__(self, db, batch: str, owner: Optional[str] = None, lease_seconds: int = LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS, poll_interval: float = POLL_SECONDS):
+        self.db = db
+        self.batch = batch
+        self.owner = owner or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+    async def enqueue(self, kind: str, items: List[str]) -> int:
+        return await self.db.enqueue_work(self.batch, kind, items)
+
+    def _unfinished(self, item: Dict[str, Any], now: datetime) -> bool:
+        """Whether item may still run: claimable now, or leased by a worker that is alive"""
+        retryable = item["attempts"] < self.max_attempts
+        if item["status"] == "pending":
+            return retryable
+        if item["status"] == "leased":
+            expires = item.get("lease_expires_at")
+            return retryable or (expires is not None and datetime.fromisoformat(str(expires)) > now)
+        return False
+
+    async def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for item in await self.db.get_work_items(self.batch):
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return counts
+
+    async def has_unfinished(self, kind: str) -> bool:
+        """Whether an item of kind can still run (not all done or out of attempts)"""
+        now = datetime.now(timezone.utc)
+        return any(self._unfinished(item, now) for item in await self.db.get_work_items(self.batch, kind=kind))
+
+    async def _heartbeat(self, item_id: int):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if item_id not in await self.db.heartbeat_work([item_id], self.owner, self.lease_seconds):
+                print(f"Lost the lease on work item {item_id}")
+                return
+
+    async def _process(self, item: Dict[str, Any], handler: Handler) -> bool:
+        heartbeat = asyncio.ensure_future(self._heartbeat(item["id"]))
+        try:
+            result = await handler(item["item"])
+        except NotReady:
+            raise
+        except Exception as e:
+            status = "failed" if item["attempts"] >= self.max_attempts else "pending"
+            print(f"Work item {item['kind']} {item['item']} failed (attempt {item['attempts']}, now {status}): {e}")
+            await self.db.finish_work(item["id"], self.owner, status, error=str(e)[:500])
+            return False
+        finally:
+            heartbeat.cancel()
+        if not await self.db.finish_work(item["id"], self.owner, "done", result=result):
+            print(f"Work item {item['kind']} {item['item']} finished after its lease was taken over")
+        return True
+
+    async def run(self, handlers: Dict[str, Handler]) -> int:
+        """Process claimable items until none are left unfinished; returns how many this worker completed"""
+        completed = 0
+        while True:
+            claimed = await self.db.claim_work(self.batch, self.owner, self.lease_seconds, 1, self.max_attempts)
+            if not claimed:
+                now = datetime.now(timezone.utc)
+                if not any(self._unfinished(item, now) for item in await self.db.get_work_items(self.batch)):
+                    return completed
+                # Other workers hold the rest; wait for them to finish or for their leases to expire
+                await asyncio.sleep(self.poll_interval)
+                continue
+            item = claimed[0]
+            handler = handlers.get(item["kind"])
+            if handler is None:
+                await self.db.finish_work(item["id"], self.owner, "failed", error=f"No handler for {item['kind']}")
+                continue
+            try:
+                if await self._process(item, handler):
+                    completed += 1
+            except NotReady as e:
+                await self.db.release_work(item["id"], self.owner, item["attempts"] - 1)
+                # Whatever it waits for is held elsewhere or claimable next; poll rather than spin on this item
+                print(f"Work item {item['kind']} {item['item']} not ready: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+
+def score_by_link(articles: List[Dict[str, Any]], coins: List[Dict[str, Any]], analyzer: SentimentAnalyzer,
+                  day: Optional[date] = None) -> Dict[str, Dict[str, List[float]]]:
+    """Per-article {link: {coin_id: [score_sum, mentions]}} so shards can be merged without double counting.
+
+    With day, only articles published on day (UTC) are scored, since only
+    they count towards day's coin_sentiment row.
+    """
+    scores = {}
+    for article in articles:
+        if day is not None and article["published_date"].astimezone(timezone.utc).date() != day:
+            continue
+        totals = score_articles([article], coins, analyzer)
+        if totals and article.get("link"):
+            scores[article["link"]] = {str(coin_id): pair for coin_id, pair in totals.items()}
+    return scores
+
+
+async def aggregate_ingest(db, batch: str, day: date, analyzer: Optional[SentimentAnalyzer] = None) -> Dict[str, Any]:
+    """Merge the scored feed shards of batch into day's coin_sentiment rows.
+
+    An article that several feeds carried counts once. Articles published on
+    day that were stored earlier (by the daemon or another run) are scored
+    from storage, so the row counts exactly what score_stored_day counts.
+    Rows are upserted, so running the aggregation twice writes the same
+    result.
+    """
+    totals: Dict[int, List[float]] = {}
+    seen_links = set()
+    for item in await db.get_work_items(batch, kind="feed"):
+        if item["status"] != "done" or not item.get("result"):
+            continue
+        for link, coin_totals in item["result"].get("scores", {}).items():
+            if link in seen_links:
+                continue
+            seen_links.add(link)
+            merge_totals(totals, {int(coin_id): pair for coin_id, pair in coin_totals.items()})
+
+    coins = await db.get_all_coins()
+    stored_totals, stored_links = await score_stored_day(db, day, coins, analyzer, skip_links=seen_links)
+    merge_totals(totals, stored_totals)
+    written = await db.upsert_coin_sentiments(build_sentiment_rows(totals, coins, day))
+    articles = len(seen_links | stored_links)
+    print(f"Aggregated {articles} articles into {written} coin_sentiment rows for {day}")
+    return {"articles": articles, "rows": written}
+
+
+async def run_ingest_worker(db=None, day: Optional[date] = None, worker_id: Optional[str] = None,
+                            sources=None, max_feeds: Optional[int] = None, transport=None,
+                            poll_interval: float = POLL_SECONDS) -> int:
+    """Join the distributed ingest of day: every feed is a work item, followed by one aggregation step.
+
+    Start the same command on any number of machines; each one enqueues the
+    batch (a no-op once it exists), works through unclaimed feeds and, when
+    all feeds are finished, one of them aggregates coin_sentiment. Like the
+    daily run, the aggregation writes the last completed day (day before
+    day), never the partial current one.
+    """
+    if db is None:
+        from database import create_database
+        db = create_database()
+    day = day or datetime.now(timezone.utc).date()
+    sentiment_day = day - timedelta(days=1)
+    sources = sources if sources is not None else load_sources()
+    if max_feeds:
+        sources = sources[:max_feeds]
+    by_url = {source.url: source for source in sources}
+    batch = ingest_batch(day)
+    queue = WorkQueue(db, batch, worker_id, poll_interval=poll_interval)
+    # Claimed first; feed shards are given back until it has finished
+    await queue.enqueue("prices", ["coingecko"])
+    await queue.enqueue("feed", list(by_url))
+
+    analyzer = SentimentAnalyzer()
+    feed_health = FeedHealth()
+    feed_health.load()
+    scheduler = SourceScheduler(transport, health=feed_health)
+    coins: List[Dict[str, Any]] = []
+
+    async def prices(_item: str):
+        registry = CoinRegistry()
+        await registry.load(db)
+        async with AsyncCoinGeckoClient(api_key=os.getenv("COINGECKO_API_KEY")) as coingecko:
+            coins_data = await fetch_top_coins(coingecko, limit=int(os.getenv("COINGECKO_TOP_N", 100)))
+        if not coins_data:
+            raise RuntimeError("No coin data from CoinGecko")
+        await upsert_coins_and_prices(db, registry, coins_data, day)
+        coins[:] = await db.get_all_coins()
+        return {"coins": len(coins_data)}
+
+    async def feed(url: str):
+        source = by_url.get(url)
+        if source is None:
+            raise ValueError(f"Feed not in this worker's registry: {url}")
+        # Score against the coin list the prices step writes, once it has finished
+        if not coins:
+            if await queue.has_unfinished("prices"):
+                raise NotReady("prices step has not finished")
+            coins[:] = await db.get_all_coins()
+        # A failed download raises so the feed is retried rather than recorded as empty
+        articles = await scheduler.fetch_source(source, raise_errors=True)
+        await store_articles(db, articles)
+        return {"articles": len(articles), "scores": score_by_link(articles, coins, analyzer, sentiment_day)}
+
+    async def aggregate(_item: str):
+        result = await aggregate_ingest(db, batch, sentiment_day, analyzer)
+        try:
+            await refresh_deltas_after(db, sentiment_day)
+        except Exception as e:
+            print(f"Error updating sentiment deltas: {e}")
+        if os.getenv("COIN_SNAPSHOT_PATH"):
+            try:
+                await publish_snapshot(db, os.getenv("COIN_SNAPSHOT_PATH"))
+            except Exception as e:
+                print(f"Error publishing coin snapshot: {e}")
+        return result
+
+    print(f"Worker {queue.owner} joining {batch} ({len(by_url)} feeds)")
+    handlers = {"prices": prices, "feed": feed, "aggregate": aggregate}
+    try:
+        completed = await queue.run(handlers)
+        # Only reached once no feed can still finish; exactly one worker claims the aggregation
+        await queue.enqueue("aggregate", ["coin_sentiment"])
+        completed += await queue.run(handlers)
+    finally:
+        scheduler.close()
+        feed_health.save()
+    print(f"Worker {queue.owner} completed {completed} items of {batch}: {await queue.counts()}")
+    return completed
+
+
+class _LeaseCheckpoint:
+    """Backfill checkpoint for leased days: a day that is re-leased starts over"""
+
+    def resume_position(self, day: date):
+        return 0, {}
+
+    def record_progress(self, day: date, last_id: int, totals: Dict[int, List[float]]):
+        pass
+
+    def mark_done(self, day: date):
+        pass
+
+
+async def run_backfill_worker(start: date, end: date, db=None, worker_id: Optional[str] = None,
+                              workers: Optional[int] = None, page_size: int = 1000) -> int:
+    """Join the distributed backfill of [start, end]: each date is a work item scored and written by one worker"""
+    if end < start:
+        raise ValueError("Backfill end date must not be before start date")
+    if db is None:
+        from database import create_database
+        db = create_database()
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    batch = backfill_batch(start, end)
+    queue = WorkQueue(db, batch, worker_id)
+    await queue.enqueue("day", [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)])
+
+    coins = await db.get_all_coins()
+    analyzer = SentimentAnalyzer()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+
+    async def backfill(item: str):
+        day = date.fromisoformat(item)
+        processed = await backfill_day(db, day, coins, _LeaseCheckpoint(), pool, analyzer, workers, page_size)
+        print(f"Backfilled {day}: {processed} articles")
+        return {"articles": processed}
+
+    print(f"Worker {queue.owner} joining {batch} with {workers} scoring process(es)")
+    try:
+        completed = await queue.run({"day": backfill})
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print(f"Worker {queue.owner} completed {completed} items of {batch}: {await queue.counts()}")
+    return completed
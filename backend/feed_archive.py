@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+from datetime import date, datetime, timezone
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+DEFAULT_ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "feed_archive")
+
+# A writer starts a new segment file once its current one passes this size
+SEGMENT_MAX_BYTES = int(os.getenv("FEED_ARCHIVE_SEGMENT_BYTES", 64 * 1024 * 1024))
+INDEX_NAME = "index.jsonl"
+
+
+class FeedArchive:
+    """Raw feed bodies in compressed, content-addressed, date-partitioned segments.
+
+    Each UTC day is a directory of segment files plus index.jsonl. Every
+    fetch appends one index line (url, fetched_at, sha256, segment, offset,
+    length, size); the body itself is zlib-compressed and appended to a
+    segment only if that day does not already hold the same sha256, so a
+    feed polled many times without changes is stored once. Each writer
+    process appends to segments of its own, and the index line is written
+    after the bytes it points to, so readers never see an entry whose body
+    is missing.
+    """
+
+    def __init__(self, root: str, segment_max_bytes: int = SEGMENT_MAX_BYTES, level: int = 6):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.level = level
+        self._lock = threading.Lock()
+        # sha256 -> (segment, offset, length) of the bodies stored on _blobs_day, and the
+        # segment this writer appends to that day; only one day is kept in memory
+        self._blobs_day: Optional[str] = None
+        self._blobs: Dict[str, Tuple[str, int, int]] = {}
+        self._segment: Tuple[Optional[str], int] = (None, 0)
+        self._writer = f"{int(time.time())}-{os.getpid()}"
+
+    @classmethod
+    def from_env(cls) -> Optional["FeedArchive"]:
+        """The archive configured by FEED_ARCHIVE_DIR when FEED_ARCHIVE=1, otherwise None.
+
+        Archiving is opt-in: every fetch adds to the archive, and only the
+        retention run (FEED_ARCHIVE_DAYS) removes old days again.
+        """
+        if os.getenv("FEED_ARCHIVE", "0") != "1":
+            return None
+        return cls(os.getenv("FEED_ARCHIVE_DIR", DEFAULT_ARCHIVE_PATH))
+
+    def _day_dir(self, day: date) -> str:
+        return os.path.join(self.root, day.isoformat())
+
+    def _known_blobs(self, day: date) -> Dict[str, Tuple[str, int, int]]:
+        if self._blobs_day != day.isoformat():
+            # A new day (or a put for an earlier one): forget the previous day's bodies
+            self._blobs_day = day.isoformat()
+            self._blobs = {e["sha256"]: (e["segment"], e["offset"], e["length"]) for e in self.entries(day)}
+            self._segment = (None, 0)
+        return self._blobs
+
+    def _append_blob(self, day: date, blob: bytes) -> Tuple[str, int, int]:
+        name, count = self._segment
+        path = os.path.join(self._day_dir(day), name) if name else None
+        if path is None or os.path.getsize(path) >= self.segment_max_bytes:
+            count += 1
+            name = f"segment-{self._writer}-{count:04d}.z"
+            path = os.path.join(self._day_dir(day), name)
+            # Segments this writer filled on day before switching days are not appended to again
+            while os.path.exists(path):
+                count += 1
+                name = f"segment-{self._writer}-{count:04d}.z"
+                path = os.path.join(self._day_dir(day), name)
+            self._segment = (name, count)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(blob)
+        return name, offset, len(blob)
+
+    def put(self, url: str, body: bytes, fetched_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Archive one fetched body; returns its index entry"""
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        day = fetched_at.astimezone(timezone.utc).date()
+        sha256 = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            os.makedirs(self._day_dir(day), exist_ok=True)
+            blobs = self._known_blobs(day)
+            if sha256 not in blobs:
+                blobs[sha256] = self._append_blob(day, zlib.compress(body, self.level))
+            segment, offset, length = blobs[sha256]
+            entry = {
+                "url": url,
+                "fetched_at": fetched_at.isoformat(),
+                "sha256": sha256,
+                "segment": segment,
+                "offset": offset,
+                "length": length,
+                "size": len(body),
+            }
+            line = (json.dumps(entry) + "\n").encode("utf-8")
+            with open(os.path.join(self._day_dir(day), INDEX_NAME), "a+b") as f:
+                # Finish a line torn by a crashed writer so this entry is not glued onto it
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+        return entry
+
+    def days(self) -> List[date]:
+        if not os.path.isdir(self.root):
+            return []
+        days = []
+        for name in os.listdir(self.root):
+            try:
+                days.append(date.fromisoformat(name))
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def prune(self, before: date) -> int:
+        """Delete every day directory older than before; returns how many were removed"""
+        removed = 0
+        for day in self.days():
+            if day >= before:
+                break
+            shutil.rmtree(self._day_dir(day), ignore_errors=True)
+            removed += 1
+        with self._lock:
+            if self._blobs_day is not None and date.fromisoformat(self._blobs_day) < before:
+                self._blobs_day, self._blobs, self._segment = None, {}, (None, 0)
+        return removed
+
+    def entries(self, day: date) -> List[Dict[str, Any]]:
+        """Index entries of day in fetch order; a torn last line is skipped"""
+        path = os.path.join(self._day_dir(day), INDEX_NAME)
+        if not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def read(self, day: date, entry: Dict[str, Any]) -> bytes:
+        with open(os.path.join(self._day_dir(day), entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            return zlib.decompress(f.read(entry["length"]))
+
+    def iter_day(self, day: date, unique: bool = True) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+        """(entry, body) for each fetch of day, reading every segment front to back once.
+
+        With unique, a body fetched several times is yielded only for its
+        first fetch. Entries come out in segment order, not fetch order.
+        """
+        by_segment: Dict[str, List[Dict[str, Any]]] = {}
+        seen = set()
+        for entry in self.entries(day):
+            if unique:
+                if entry["sha256"] in seen:
+                    continue
+                seen.add(entry["sha256"])
+            by_segment.setdefault(entry["segment"], []).append(entry)
+        for segment in sorted(by_segment):
+            with open(os.path.join(self._day_dir(day), segment), "rb") as f:
+                for entry in sorted(by_segment[segment], key=lambda e: e["offset"]):
+                    f.seek(entry["offset"])
+                    yield entry, zlib.decompress(f.read(entry["length"]))
+
+    def stats(self, day: date) -> Dict[str, Any]:
+        entries = self.entries(day)
+        day_dir = self._day_dir(day)
+        stored = sum(os.path.getsize(os.path.join(day_dir, name)) for name in os.listdir(day_dir) if name.endswith(".z")) \
+            if os.path.isdir(day_dir) else 0
+        return {
+            "fetches": len(entries),
+            "bodies": len({e["sha256"] for e in entries}),
+            "raw_bytes": sum(e["size"] for e in entries),
+            "stored_bytes": stored,
+        }
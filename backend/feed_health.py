@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from typing import List, Dict, Any, Optional
+
+DEFAULT_HEALTH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "feed_health.json")
+
+# Outcomes kept per feed for the rates below
+HISTORY_SIZE = 20
+
+
+class FeedHealth:
+    """Per-feed fetch history persisted between runs, driving a circuit breaker.
+
+    Every fetch records (ok, bozo, items, latency_ms). After failure_threshold
+    consecutive failures a feed's breaker opens and the feed is skipped until
+    the backoff expires; the next run then lets a single probe through
+    (half-open). A failed probe reopens the breaker with twice the backoff, up
+    to max_backoff; any success closes it. A malformed feed that yields no
+    items counts as a failure.
+    """
+
+    def __init__(self, path: Optional[str] = None, failure_threshold: int = 3,
+                 base_backoff: float = 3600.0, max_backoff: float = 86400.0):
+        self.path = path or os.getenv("FEED_HEALTH_PATH", DEFAULT_HEALTH_PATH)
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.feeds: Dict[str, Dict[str, Any]] = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self.feeds = json.load(f).get("feeds", {})
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable feed health file {self.path}: {e}")
+            self.feeds = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"feeds": self.feeds}, f)
+        os.replace(tmp_path, self.path)
+
+    def _feed(self, url: str) -> Dict[str, Any]:
+        return self.feeds.setdefault(url, {
+            "recent": [],
+            "consecutive_failures": 0,
+            "trips": 0,
+            "open_until": None,
+            "last_error": None,
+            "last_success": None,
+        })
+
+    def allow(self, url: str, now: Optional[float] = None) -> bool:
+        """False while the feed's breaker is open"""
+        open_until = self.feeds.get(url, {}).get("open_until")
+        return open_until is None or (now if now is not None else time.time()) >= open_until
+
+    def _remember(self, feed: Dict[str, Any], ok: bool, bozo: bool, items: int, latency: float):
+        feed["recent"] = (feed["recent"] + [[int(ok), int(bozo), items, round(latency * 1000, 1)]])[-HISTORY_SIZE:]
+
+    def record_success(self, url: str, latency: float, items: int, bozo: bool = False, now: Optional[float] = None):
+        if bozo and not items:
+            self.record_failure(url, latency, "malformed feed with no items", bozo=True, now=now)
+            return
+        feed = self._feed(url)
+        self._remember(feed, True, bozo, items, latency)
+        feed.update(consecutive_failures=0, trips=0, open_until=None, last_success=now if now is not None else time.time())
+
+    def record_failure(self, url: str, latency: float, error: str, bozo: bool = False, now: Optional[float] = None):
+        now = now if now is not None else time.time()
+        feed = self._feed(url)
+        self._remember(feed, False, bozo, 0, latency)
+        feed["consecutive_failures"] += 1
+        feed["last_error"] = error[:200]
+        # A failed half-open probe reopens at once, otherwise wait for the threshold
+        if feed["open_until"] is not None or feed["consecutive_failures"] >= self.failure_threshold:
+            feed["trips"] += 1
+            backoff = min(self.base_backoff * 2 ** (feed["trips"] - 1), self.max_backoff)
+            feed["open_until"] = now + backoff
+            print(f"Circuit open for {url} for {backoff / 3600:.1f}h after {feed['consecutive_failures']} failures: {error}")
+
+    def summary(self, url: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Latency, error rate, bozo rate and item yield over the recent history"""
+        feed = self.feeds.get(url) or self._feed(url)
+        recent = feed["recent"]
+        count = len(recent) or 1
+        successes = [r for r in recent if r[0]]
+        if feed["open_until"] is None:
+            state = "closed"
+        else:
+            state = "open" if not self.allow(url, now) else "half_open"
+        return {
+            "url": url,
+            "state": state,
+            "fetches": len(recent),
+            "error_rate": round(1 - len(successes) / count, 3) if recent else 0.0,
+            "bozo_rate": round(sum(r[1] for r in recent) / count, 3),
+            "avg_items": round(sum(r[2] for r in successes) / len(successes), 1) if successes else 0.0,
+            "avg_latency_ms": round(sum(r[3] for r in recent) / count, 1),
+            "consecutive_failures": feed["consecutive_failures"],
+            "last_error": feed["last_error"],
+        }
+
+    def report(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        return [self.summary(url, now) for url in sorted(self.feeds)]
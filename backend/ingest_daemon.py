@@ -0,0 +1,272 @@
+import asyncio
+import os
+import time as clock
+from datetime import date, datetime, timezone
+from typing import List, Dict, Any, Optional, Set
+
+from backfill import score_articles, score_stored_day, merge_totals, build_sentiment_rows
+from coin_registry import CoinRegistry
+from coin_snapshot import publish_snapshot
+from dedup import NearDuplicateIndex
+from feed_health import FeedHealth
+from movers import update_sentiment_deltas
+from sentiment_analyzer import SentimentAnalyzer
+from sources import Source, SourceScheduler, load_sources
+
+# Seconds between polls of one feed; each feed moves inside [MIN, MAX]
+DEFAULT_MIN_INTERVAL = 120
+DEFAULT_MAX_INTERVAL = 3600
+DEFAULT_INITIAL_INTERVAL = 600
+QUIET_BACKOFF = 1.5
+# Links remembered per feed to tell new items from repeats
+SEEN_LINKS_LIMIT = 500
+# Publishing reads every coin's details, so the daemon republishes at most this often
+DEFAULT_SNAPSHOT_INTERVAL = 300
+
+
+def next_interval(current: float, new_items: int, min_interval: float, max_interval: float) -> float:
+    """Aim for roughly one new item per poll.
+
+    A quiet poll backs the feed off by QUIET_BACKOFF; a poll that found n new
+    items divides the interval by n (at most halving it per poll so one burst
+    does not pin the feed to the minimum).
+    """
+    if new_items <= 0:
+        interval = current * QUIET_BACKOFF
+    else:
+        interval = current / min(new_items, 2)
+    return max(min_interval, min(max_interval, interval))
+
+
+class FeedSchedule:
+    """Polling state for one source"""
+
+    def __init__(self, source: Source, interval: float, next_due: float):
+        self.source = source
+        self.url = source.url
+        self.interval = interval
+        self.next_due = next_due
+        self.seen_links: Dict[str, None] = {}
+        self.polls = 0
+
+    def record(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Remember the links from a poll and return the articles not seen before"""
+        new = []
+        for article in articles:
+            if article["link"] in self.seen_links:
+                continue
+            self.seen_links[article["link"]] = None
+            new.append(article)
+        # dicts keep insertion order, so the oldest links are dropped first
+        while len(self.seen_links) > SEEN_LINKS_LIMIT:
+            del self.seen_links[next(iter(self.seen_links))]
+        return new
+
+
+class IngestDaemon:
+    """Long-running ingestion loop over the same sources as the daily run.
+
+    Every source in the registry (RSS, Reddit, Trends) is polled on its own
+    adaptive interval through a SourceScheduler, so the per-kind limits and
+    the FeedHealth circuit breakers apply as they do in cron_job. New articles are
+    deduplicated and stored as they arrive, and today's coin_sentiment rows
+    are rewritten from running per-coin totals. The analyzer, coin registry,
+    near-duplicate index and database client stay warm across cycles, so
+    there is no per-run startup cost.
+
+    Today's row counts the stored articles published today (UTC), the same
+    definition as the daily cron job and the backfill (score_stored_day).
+    The totals are seeded from storage at the start of each day, so a
+    restart or a cron run alongside the daemon neither double counts nor
+    writes different numbers. New articles published on earlier days are
+    stored but not counted here; the daily run rewrites yesterday's row.
+    """
+
+    def __init__(self, db, sources: Optional[List[Source]] = None, scheduler: Optional[SourceScheduler] = None,
+                 analyzer: Optional[SentimentAnalyzer] = None,
+                 registry: Optional[CoinRegistry] = None, dedup_index: Optional[NearDuplicateIndex] = None,
+                 min_interval: float = DEFAULT_MIN_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL,
+                 initial_interval: float = DEFAULT_INITIAL_INTERVAL, page_size: int = 1000,
+                 snapshot_path: Optional[str] = None, snapshot_interval: float = DEFAULT_SNAPSHOT_INTERVAL):
+        self.db = db
+        self.sources = sources if sources is not None else load_sources()
+        if scheduler is None:
+            health = FeedHealth()
+            health.load()
+            scheduler = SourceScheduler(health=health)
+        self.scheduler = scheduler
+        self.analyzer = analyzer or SentimentAnalyzer()
+        self.registry = registry or CoinRegistry()
+        self.dedup_index = dedup_index or NearDuplicateIndex()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.page_size = page_size
+        self.schedules: List[FeedSchedule] = []
+        self.day: Optional[date] = None
+        self.totals: Dict[int, List[float]] = {}
+        self.scored_links: Set[str] = set()
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_dirty = False
+        self.snapshot_published_at: Optional[float] = None
+
+    async def start(self, now: Optional[float] = None):
+        now = clock.monotonic() if now is None else now
+        await self.registry.load(self.db)
+        self.dedup_index.load()
+        # Stagger the first polls so the sources are not all hit at once
+        step = self.min_interval / max(1, len(self.sources))
+        self.schedules = [
+            FeedSchedule(source, self.initial_interval, now + i * step)
+            for i, source in enumerate(self.sources)
+        ]
+        print(f"Ingest daemon started with {len(self.schedules)} sources and {len(self.registry)} coins")
+
+    def coins(self) -> List[Dict[str, Any]]:
+        return list(self.registry.coins.values())
+
+    async def poll_feed(self, schedule: FeedSchedule, now: float) -> List[Dict[str, Any]]:
+        """Fetch one source, adapt its interval and return the articles it has not shown before.
+
+        A failed fetch raises (and is recorded in the feed health); a source
+        whose circuit is open yields nothing, so it backs off like a quiet one.
+        """
+        articles = await self.scheduler.fetch_source(schedule.source, raise_errors=True)
+        new = schedule.record(articles)
+        # The first poll only learns what the feed already holds
+        if schedule.polls:
+            schedule.interval = next_interval(schedule.interval, len(new), self.min_interval, self.max_interval)
+        schedule.polls += 1
+        schedule.next_due = now + schedule.interval
+        return new
+
+    async def roll_day(self, today: date):
+        """Start a new day: refresh the coin list and seed totals from the articles stored for today"""
+        self.day = today
+        await self.registry.load(self.db)
+        self.totals, self.scored_links = await score_stored_day(self.db, today, self.coins(), self.analyzer, page_size=self.page_size)
+
+    async def store_articles(self, articles: List[Dict[str, Any]]):
+        for article in articles:
+            try:
+                await self.db.insert_article(
+                    title=article["title"],
+                    summary=article["summary"],
+                    link=article["link"],
+                    published_date=article["published_date"],
+                )
+            except Exception as e:
+                print(f"Error storing article: {e}")
+
+    async def publish_snapshot_if_due(self, now: float):
+        """Publish the coin snapshot if sentiment changed and the last publish is snapshot_interval old"""
+        if not self.snapshot_path or not self.snapshot_dirty:
+            return
+        if self.snapshot_published_at is not None and now - self.snapshot_published_at < self.snapshot_interval:
+            return
+        self.snapshot_dirty = False
+        self.snapshot_published_at = now
+        try:
+            await publish_snapshot(self.db, self.snapshot_path)
+        except Exception as e:
+            print(f"Error publishing coin snapshot: {e}")
+
+    async def run_cycle(self, now: Optional[float] = None, today: Optional[date] = None) -> int:
+        """Poll every feed that is due, store what is new and update today's sentiment.
+
+        Returns the number of new articles stored, whatever their publication
+        date; only those published today (UTC) change today's totals.
+        """
+        now = clock.monotonic() if now is None else now
+        today = today or datetime.now(timezone.utc).date()
+        if self.day != today:
+            await self.roll_day(today)
+        # Changes held back by the publish interval go out once it has passed
+        await self.publish_snapshot_if_due(now)
+
+        due = [s for s in self.schedules if s.next_due <= now]
+        if not due:
+            return 0
+
+        polled = await asyncio.gather(*(self.poll_feed(s, now) for s in due), return_exceptions=True)
+        articles = []
+        for schedule, result in zip(due, polled):
+            if isinstance(result, Exception):
+                print(f"Error polling feed {schedule.url}: {result}")
+                schedule.interval = next_interval(schedule.interval, 0, self.min_interval, self.max_interval)
+                schedule.next_due = now + schedule.interval
+                continue
+            articles.extend(result)
+        self.save_health()
+
+        fresh, collapsed = self.dedup_index.filter_articles(articles)
+        if not fresh:
+            return 0
+        self.dedup_index.save()
+        await self.store_articles(fresh)
+
+        # Only articles published today count towards today's row; those that
+        # roll_day already found in storage are not scored twice
+        todays = [
+            a for a in fresh
+            if a["link"] not in self.scored_links and a["published_date"].astimezone(timezone.utc).date() == today
+        ]
+        self.scored_links.update(a["link"] for a in fresh)
+        if todays:
+            coins = self.coins()
+            merge_totals(self.totals, score_articles(todays, coins, self.analyzer))
+            await self.db.upsert_coin_sentiments(build_sentiment_rows(self.totals, coins, today))
+            try:
+                await update_sentiment_deltas(self.db, today)
+            except Exception as e:
+                print(f"Error updating sentiment deltas: {e}")
+            self.snapshot_dirty = True
+            await self.publish_snapshot_if_due(now)
+
+        print(f"Ingested {len(fresh)} new articles from {len(due)} feeds ({collapsed} near-duplicates collapsed)")
+        return len(fresh)
+
+    def save_health(self):
+        if self.scheduler.health is None:
+            return
+        try:
+            self.scheduler.health.save()
+        except OSError as e:
+            print(f"Error saving feed health: {e}")
+
+    def seconds_until_next_poll(self, now: Optional[float] = None) -> float:
+        now = clock.monotonic() if now is None else now
+        if not self.schedules:
+            return self.max_interval
+        return max(0.0, min(s.next_due for s in self.schedules) - now)
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        stop = stop or asyncio.Event()
+        await self.start()
+        try:
+            while not stop.is_set():
+                try:
+                    await self.run_cycle()
+                except Exception as e:
+                    print(f"Error during ingest cycle: {e}")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=max(1.0, self.seconds_until_next_poll()))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.scheduler.close()
+
+
+async def run_daemon():
+    from database import create_database
+    # Sources come from feeds.csv and fetches are archived (FEED_ARCHIVE) as in the daily run
+    daemon = IngestDaemon(
+        create_database(),
+        min_interval=float(os.getenv("INGEST_MIN_INTERVAL", DEFAULT_MIN_INTERVAL)),
+        max_interval=float(os.getenv("INGEST_MAX_INTERVAL", DEFAULT_MAX_INTERVAL)),
+        initial_interval=float(os.getenv("INGEST_INITIAL_INTERVAL", DEFAULT_INITIAL_INTERVAL)),
+        snapshot_path=os.getenv("COIN_SNAPSHOT_PATH"),
+        snapshot_interval=float(os.getenv("COIN_SNAPSHOT_INTERVAL", DEFAULT_SNAPSHOT_INTERVAL)),
+    )
+    await daemon.run()
@@ -0,0 +1,100 @@
+import asyncio
+import json
+from typing import List, Dict, Any, Optional, Set, Callable, Awaitable
+
+
+def sse_message(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Encode one Server-Sent Events message"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class CoinUpdateBroker:
+    """In-process fan-out of coin table changes to streaming clients.
+
+    publish() diffs the new coin rows against the last snapshot (keyed by
+    coin_id), encodes the diff once and hands the same string to every
+    subscriber queue, so each update costs one diff plus one put per client.
+    A client whose queue is full is resynchronised with a full snapshot
+    instead of blocking the broadcast.
+    """
+
+    def __init__(self, queue_size: int = 16):
+        self.queue_size = queue_size
+        self.snapshot: Dict[int, Dict[str, Any]] = {}
+        self.version = 0
+        # Set by the first publish, even one with no rows (version stays 0 then)
+        self.initialized = False
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def snapshot_message(self) -> str:
+        return sse_message("snapshot", {"version": self.version, "coins": list(self.snapshot.values())}, self.version)
+
+    def publish(self, rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Broadcast the rows that changed since the last publish; returns the diff or None"""
+        self.initialized = True
+        latest = {row["coin_id"]: row for row in rows}
+        changed = [row for coin_id, row in latest.items() if self.snapshot.get(coin_id) != row]
+        removed = [coin_id for coin_id in self.snapshot if coin_id not in latest]
+        if not changed and not removed:
+            return None
+
+        self.snapshot = latest
+        self.version += 1
+        diff = {"version": self.version, "changed": changed, "removed": removed}
+        message = sse_message("update", diff, self.version)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and let it start over from a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot_message())
+        return diff
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        queue.put_nowait(self.snapshot_message())
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+
+class CoinChangePoller:
+    """Refreshes the broker from the database while anyone is subscribed.
+
+    The pipeline writes from another process, so the API notices new prices
+    and sentiment by re-reading latest_coin_data once per interval; that single
+    query serves every open stream.
+    """
+
+    def __init__(self, broker: CoinUpdateBroker, fetch_rows: Callable[[], Awaitable[List[Dict[str, Any]]]], interval: float = 30.0):
+        self.broker = broker
+        self.fetch_rows = fetch_rows
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        self.broker.publish(await self.fetch_rows())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while self.broker.subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing live coin data: {e}")
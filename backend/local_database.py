@@ -0,0 +1,470 @@
+import json
+import os
+import re
+import asyncio
+import sqlite3
+import threading
+from typing import Optional, List, Dict, Any
+from datetime import date, datetime, timedelta, timezone
+
+from database import decode_search_cursor, group_articles_by_coin, recent_articles_since, search_page
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_schema.sql")
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local.db")
+
+# Tables the generic row helpers are allowed to touch
+TIME_SERIES_TABLES = {"coin_prices", "coin_sentiment"}
+DELETABLE_TABLES = {"articles", "coin_prices", "coin_sentiment"}
+
+
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _iso(value) -> str:
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote free text as an FTS5 phrase so user input can't inject query syntax"""
+    tokens = _FTS_TOKEN_RE.findall(text or "")
+    return '"' + " ".join(tokens) + '"' if tokens else ""
+
+
+def fts_query(text: str) -> str:
+    """AND together the words of a free-text query, FTS5 style"""
+    return " ".join(f'"{token}"' for token in _FTS_TOKEN_RE.findall(text or ""))
+
+
+class LocalDatabase:
+    """Embedded SQLite implementation of the Database interface.
+
+    Mirrors init_schema.sql (including the latest_coin_data view) so the cron
+    pipeline and the API can run against a local file instead of Supabase.
+    The connection runs in WAL mode; statements are serialised through one
+    lock and executed off the event loop like the Supabase calls.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        had_fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'"
+        ).fetchone() is not None
+        with open(SCHEMA_PATH) as f:
+            self.conn.executescript(f.read())
+        # Databases created before the FTS table existed need a one-off index build
+        if not had_fts:
+            with self.conn:
+                self.conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+    def close(self):
+        self.conn.close()
+
+    async def _run(self, fn):
+        def locked():
+            with self._lock:
+                return fn(self.conn)
+        return await asyncio.get_event_loop().run_in_executor(None, locked)
+
+    @staticmethod
+    def _rows(cursor) -> List[Dict[str, Any]]:
+        rows = []
+        for row in cursor.fetchall():
+            row = dict(row)
+            if row.get("no_mentions") is not None:
+                row["no_mentions"] = bool(row["no_mentions"])
+            rows.append(row)
+        return rows
+
+    async def ping(self) -> bool:
+        await self._run(lambda conn: conn.execute("SELECT 1").fetchone())
+        return True
+
+    async def insert_or_update_coin(self, coingecko_id: str, symbol: str, name: str) -> int:
+        def write(conn):
+            with conn:
+                conn.execute(
+                    "INSERT INTO coins (coingecko_id, symbol, name) VALUES (?, ?, ?) "
+                    "ON CONFLICT(coingecko_id) DO UPDATE SET symbol = excluded.symbol, name = excluded.name",
+                    (coingecko_id, symbol, name),
+                )
+            return conn.execute("SELECT id FROM coins WHERE coingecko_id = ?", (coingecko_id,)).fetchone()["id"]
+        return await self._run(write)
+
+    async def insert_coins(self, coins: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not coins:
+            return []
+
+        def write(conn):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO coins (coingecko_id, symbol, name) VALUES (?, ?, ?) "
+                    "ON CONFLICT(coingecko_id) DO UPDATE SET symbol = excluded.symbol, name = excluded.name",
+                    [(c["coingecko_id"], c["symbol"], c["name"]) for c in coins],
+                )
+            placeholders = ",".join("?" for _ in coins)
+            cursor = conn.execute(
+                f"SELECT id, coingecko_id, symbol, name FROM coins WHERE coingecko_id IN ({placeholders})",
+                [c["coingecko_id"] for c in coins],
+            )
+            return self._rows(cursor)
+        return await self._run(write)
+
+    async def update_coin(self, coin_id: int, symbol: str, name: str):
+        def write(conn):
+            with conn:
+                conn.execute("UPDATE coins SET symbol = ?, name = ? WHERE id = ?", (symbol, name, coin_id))
+        await self._run(write)
+
+    async def insert_coin_price(self, coin_id: int, price_date: date, price_usd: float, market_cap: Optional[float]):
+        await self.upsert_coin_prices([{
+            "coin_id": coin_id,
+            "date": price_date,
+            "price_usd": price_usd,
+            "market_cap": market_cap,
+        }])
+
+    async def upsert_coin_prices(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        params = [(r["coin_id"], _iso(r["date"]), r["price_usd"], r.get("market_cap")) for r in rows]
+
+        def write(conn):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO coin_prices (coin_id, date, price_usd, market_cap) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(coin_id, date) DO UPDATE SET price_usd = excluded.price_usd, market_cap = excluded.market_cap",
+                    params,
+                )
+        await self._run(write)
+        return len(params)
+
+    async def insert_article(self, title: str, summary: Optional[str], link: Optional[str], published_date: datetime) -> int:
+        def write(conn):
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO articles (title, summary, link, published_date) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(link) DO NOTHING",
+                    (title, summary, link, published_date.isoformat()),
+                )
+            if cursor.rowcount:
+                return cursor.lastrowid
+            return conn.execute("SELECT id FROM articles WHERE link = ?", (link,)).fetchone()["id"]
+        return await self._run(write)
+
+    async def insert_articles(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        params = [(r["title"], r.get("summary"), r["link"], r["published_date"].isoformat()) for r in rows]
+
+        def write(conn):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO articles (title, summary, link, published_date) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(link) DO NOTHING",
+                    params,
+                )
+        await self._run(write)
+        return len(params)
+
+    async def insert_coin_sentiment(self, coin_id: int, sentiment_date: date, sentiment_score: Optional[float], mentions_count: int, no_mentions: bool = False):
+        await self.upsert_coin_sentiments([{
+            "coin_id": coin_id,
+            "date": sentiment_date,
+            "sentiment_score": sentiment_score,
+            "mentions_count": mentions_count,
+            "no_mentions": no_mentions,
+        }])
+
+    async def upsert_coin_sentiments(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        params = [
+            (r["coin_id"], _iso(r["date"]), r.get("sentiment_score"), r.get("mentions_count", 0), bool(r.get("no_mentions", False)))
+            for r in rows
+        ]
+
+        def write(conn):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO coin_sentiment (coin_id, date, sentiment_score, mentions_count, no_mentions) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(coin_id, date) DO UPDATE SET sentiment_score = excluded.sentiment_score, "
+                    "mentions_count = excluded.mentions_count, no_mentions = excluded.no_mentions",
+                    params,
+                )
+        await self._run(write)
+        return len(params)
+
+    async def upsert_sentiment_deltas(self, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        params = [
+            (r["coin_id"], _iso(r["date"]), r["window_days"], r["metric"], r["value"], r["previous"], r["delta"])
+            for r in rows
+        ]
+
+        def write(conn):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO coin_sentiment_deltas (coin_id, date, window_days, metric, value, previous, delta) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(coin_id, date, window_days, metric) DO UPDATE SET value = excluded.value, "
+                    "previous = excluded.previous, delta = excluded.delta",
+                    params,
+                )
+        await self._run(write)
+        return len(params)
+
+    async def delete_sentiment_deltas(self, delta_date: date) -> int:
+        def write(conn):
+            with conn:
+                return conn.execute("DELETE FROM coin_sentiment_deltas WHERE date = ?", (_iso(delta_date),)).rowcount
+        return await self._run(write)
+
+    async def get_top_movers(self, metric: str, window_days: int, direction: str = "up", limit: int = 10) -> List[Dict[str, Any]]:
+        order = "ASC" if direction == "down" else "DESC"
+        return await self._run(lambda conn: self._rows(conn.execute(
+            "SELECT d.coin_id, c.coingecko_id, c.symbol, c.name, d.date, d.value, d.previous, d.delta "
+            "FROM coin_sentiment_deltas d JOIN coins c ON c.id = d.coin_id "
+            "WHERE d.metric = ? AND d.window_days = ? AND d.date = ("
+            "SELECT MAX(date) FROM coin_sentiment_deltas WHERE metric = ? AND window_days = ?) "
+            f"ORDER BY d.delta {order} LIMIT ?",
+            (metric, window_days, metric, window_days, limit),
+        )))
+
+    async def delete_articles_batch(self, published_before: datetime, limit: int = 1000) -> int:
+        def write(conn):
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM articles WHERE id IN ("
+                    "SELECT id FROM articles WHERE published_date < ? ORDER BY id LIMIT ?)",
+                    (published_before.isoformat(), limit),
+                )
+            return cursor.rowcount
+        return await self._run(write)
+
+    async def get_daily_rows_before(self, table: str, before: date, after_id: int = 0, limit: int = 1000, since: Optional[date] = None) -> List[Dict[str, Any]]:
+        if table not in TIME_SERIES_TABLES:
+            raise ValueError(f"Unsupported table: {table}")
+        if since is None:
+            return await self._run(lambda conn: self._rows(conn.execute(
+                f"SELECT * FROM {table} WHERE date < ? AND id > ? ORDER BY id LIMIT ?",
+                (before.isoformat(), after_id, limit),
+            )))
+        return await self._run(lambda conn: self._rows(conn.execute(
+            f"SELECT * FROM {table} WHERE date < ? AND date >= ? AND id > ? ORDER BY id LIMIT ?",
+            (before.isoformat(), since.isoformat(), after_id, limit),
+        )))
+
+    async def get_daily_rows_since(self, table: str, since: date, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        if table not in TIME_SERIES_TABLES:
+            raise ValueError(f"Unsupported table: {table}")
+        return await self._run(lambda conn: self._rows(conn.execute(
+            f"SELECT * FROM {table} WHERE date >= ? AND id > ? ORDER BY id LIMIT ?",
+            (since.isoformat(), after_id, limit),
+        )))
+
+    async def get_sentiment_rows(self, dates: List[date], after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        placeholders = ", ".join("?" for _ in dates)
+        return await self._run(lambda conn: self._rows(conn.execute(
+            f"SELECT * FROM coin_sentiment WHERE date IN ({placeholders}) AND id > ? ORDER BY id LIMIT ?",
+            (*[d.isoformat() for d in dates], after_id, limit),
+        )))
+
+    async def delete_rows_by_ids(self, table: str, ids: List[int]):
+        if table not in DELETABLE_TABLES:
+            raise ValueError(f"Unsupported table: {table}")
+
+        def write(conn):
+            with conn:
+                conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(i,) for i in ids])
+        await self._run(write)
+
+    async def get_articles_page(self, start: datetime, end: datetime, after_id: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        return await self._run(lambda conn: self._rows(conn.execute(
+            "SELECT id, title, summary, link, published_date FROM articles "
+            "WHERE published_date >= ? AND published_date < ? AND id > ? ORDER BY id LIMIT ?",
+            (start.isoformat(), end.isoformat(), after_id, limit),
+        )))
+
+    @staticmethod
+    def _work_rows(cursor) -> List[Dict[str, Any]]:
+        rows = [dict(row) for row in cursor.fetchall()]
+        for row in rows:
+            if row.get("result") is not None:
+                row["result"] = json.loads(row["result"])
+        return sorted(rows, key=lambda r: r["id"])
+
+    async def enqueue_work(self, batch: str, kind: str, items: List[str]) -> int:
+        def write(conn):
+            with conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO work_leases (batch, kind, item) VALUES (?, ?, ?)",
+                    [(batch, kind, item) for item in items],
+                )
+                return conn.total_changes - before
+        return await self._run(write)
+
+    async def claim_work(self, batch: str, owner: str, lease_seconds: int = 300, limit: int = 1, max_attempts: int = 3) -> List[Dict[str, Any]]:
+        # One UPDATE under SQLite's database write lock: concurrent claimers get disjoint rows
+        now = datetime.now(timezone.utc)
+
+        def write(conn):
+            with conn:
+                return self._work_rows(conn.execute(
+                    "UPDATE work_leases SET status = 'leased', owner = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id IN ("
+                    "SELECT id FROM work_leases WHERE batch = ? AND attempts < ? "
+                    "AND (status = 'pending' OR (status = 'leased' AND lease_expires_at < ?)) "
+                    "ORDER BY id LIMIT ?) RETURNING *",
+                    (owner, (now + timedelta(seconds=lease_seconds)).isoformat(), now.isoformat(), batch, max_attempts, now.isoformat(), limit),
+                ))
+        return await self._run(write)
+
+    async def heartbeat_work(self, ids: List[int], owner: str, lease_seconds: int = 300) -> List[int]:
+        now = datetime.now(timezone.utc)
+        placeholders = ", ".join("?" for _ in ids)
+
+        def write(conn):
+            with conn:
+                return [row["id"] for row in conn.execute(
+                    f"UPDATE work_leases SET lease_expires_at = ?, updated_at = ? "
+                    f"WHERE id IN ({placeholders}) AND owner = ? AND status = 'leased' RETURNING id",
+                    ((now + timedelta(seconds=lease_seconds)).isoformat(), now.isoformat(), *ids, owner),
+                ).fetchall()]
+        return await self._run(write) if ids else []
+
+    async def finish_work(self, item_id: int, owner: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool:
+        def write(conn):
+            with conn:
+                cursor = conn.execute(
+                    "UPDATE work_leases SET status = ?, result = ?, error = ?, lease_expires_at = NULL, updated_at = ? "
+                    "WHERE id = ? AND owner = ? AND status = 'leased'",
+                    (status, json.dumps(result) if result is not None else None, error,
+                     datetime.now(timezone.utc).isoformat(), item_id, owner),
+                )
+            return cursor.rowcount > 0
+        return await self._run(write)
+
+    async def release_work(self, item_id: int, owner: str, attempts: int) -> bool:
+        def write(conn):
+            with conn:
+                cursor = conn.execute(
+                    "UPDATE work_leases SET status = 'pending', attempts = ?, lease_expires_at = NULL, updated_at = ? "
+                    "WHERE id = ? AND owner = ? AND status = 'leased'",
+                    (attempts, datetime.now(timezone.utc).isoformat(), item_id, owner),
+                )
+            return cursor.rowcount > 0
+        return await self._run(write)
+
+    async def get_work_items(self, batch: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        if kind is None:
+            return await self._run(lambda conn: self._work_rows(conn.execute(
+                "SELECT * FROM work_leases WHERE batch = ? ORDER BY id", (batch,))))
+        return await self._run(lambda conn: self._work_rows(conn.execute(
+            "SELECT * FROM work_leases WHERE batch = ? AND kind = ? ORDER BY id", (batch, kind))))
+
+    async def get_all_coins(self) -> List[Dict[str, Any]]:
+        return await self._run(lambda conn: self._rows(conn.execute(
+            "SELECT id, coingecko_id, symbol, name FROM coins"
+        )))
+
+    async def get_latest_coin_data(self) -> List[Dict[str, Any]]:
+        # Same ordering as the Supabase backend: scored coins first by score, then market cap
+        return await self._run(lambda conn: self._rows(conn.execute(
+            "SELECT * FROM latest_coin_data ORDER BY "
+            "CASE WHEN sentiment_score IS NULL OR no_mentions THEN -999 ELSE sentiment_score END DESC, "
+            "COALESCE(market_cap, 0) DESC"
+        )))
+
+    async def get_coin_details(self, coin_id: int) -> Optional[Dict[str, Any]]:
+        def read(conn):
+            coin = self._rows(conn.execute(
+                "SELECT id, coingecko_id, symbol, name, created_at FROM coins WHERE id = ?", (coin_id,)
+            ))
+            if not coin:
+                return None
+            prices = self._rows(conn.execute(
+                "SELECT date, price_usd, market_cap FROM coin_prices WHERE coin_id = ? ORDER BY date DESC LIMIT 30",
+                (coin_id,),
+            ))
+            sentiment = self._rows(conn.execute(
+                "SELECT date, sentiment_score, mentions_count, no_mentions FROM coin_sentiment "
+                "WHERE coin_id = ? ORDER BY date DESC LIMIT 30",
+                (coin_id,),
+            ))
+            return {"coin": coin[0], "recent_prices": prices, "recent_sentiment": sentiment}
+        return await self._run(read)
+
+    async def get_recent_articles_for_coin(self, coin_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent articles whose title or summary contains the coin's name or symbol"""
+        def read(conn):
+            coin = conn.execute("SELECT name, symbol FROM coins WHERE id = ?", (coin_id,)).fetchone()
+            if coin is None:
+                return []
+            name_lower = str(coin["name"] or "").lower()
+            symbol_lower = str(coin["symbol"] or "").lower()
+            return self._rows(conn.execute(
+                "SELECT id, title, summary, link, published_date FROM articles "
+                "WHERE (? != '' AND instr(lower(title || ' ' || COALESCE(summary, '')), ?) > 0) "
+                "OR (? != '' AND instr(lower(title || ' ' || COALESCE(summary, '')), ?) > 0) "
+                "ORDER BY published_date DESC LIMIT ?",
+                (name_lower, name_lower, symbol_lower, symbol_lower, max(0, int(limit))),
+            ))
+        return await self._run(read)
+
+    async def get_recent_articles_for_coins(self, coin_ids: List[int], limit: int = 10, since: Optional[datetime] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """SQLite version of the recent_articles_for_coins function: one ROW_NUMBER pass for all coins"""
+        if not coin_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in coin_ids)
+        # Only articles inside the window (published_date index) are matched against the coins
+        rows = await self._run(lambda conn: self._rows(conn.execute(
+            "SELECT coin_id, id, title, summary, link, published_date FROM ("
+            "  SELECT c.id AS coin_id, a.id, a.title, a.summary, a.link, a.published_date,"
+            "         ROW_NUMBER() OVER (PARTITION BY c.id ORDER BY a.published_date DESC, a.id DESC) AS rn"
+            "  FROM coins c JOIN (SELECT * FROM articles WHERE published_date >= ?) a"
+            "    ON (COALESCE(c.name, '') != '' AND instr(lower(a.title || ' ' || COALESCE(a.summary, '')), lower(c.name)) > 0)"
+            "    OR (COALESCE(c.symbol, '') != '' AND instr(lower(a.title || ' ' || COALESCE(a.summary, '')), lower(c.symbol)) > 0)"
+            f"  WHERE c.id IN ({placeholders})"
+            ") WHERE rn <= ? ORDER BY coin_id, rn",
+            (recent_articles_since(since).isoformat(), *coin_ids, max(0, int(limit))),
+        )))
+        return group_articles_by_coin(rows, coin_ids)
+
+    async def search_articles(self, query: str, coin_id: Optional[int] = None, date_from: Optional[datetime] = None,
+                              date_to: Optional[datetime] = None, cursor: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """FTS5 equivalent of the search_articles SQL function (bm25 ranked, keyset paginated)"""
+        after_rank, after_id = decode_search_cursor(cursor) if cursor else (None, None)
+
+        def read(conn):
+            match = fts_query(query)
+            if not match:
+                return search_page([], limit)
+            if coin_id is not None:
+                coin = conn.execute("SELECT name, symbol FROM coins WHERE id = ?", (coin_id,)).fetchone()
+                if coin is None:
+                    return search_page([], limit)
+                coin_terms = [t for t in (_fts_phrase(coin["name"]), _fts_phrase(coin["symbol"])) if t]
+                if not coin_terms:
+                    return search_page([], limit)
+                match = f"({match}) AND ({' OR '.join(coin_terms)})"
+
+            rows = self._rows(conn.execute(
+                "SELECT * FROM ("
+                "  SELECT a.id, a.title, a.summary, a.link, a.published_date, -bm25(articles_fts, 2.0, 1.0) AS rank"
+                "  FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+                "  WHERE articles_fts MATCH ?"
+                "    AND (? IS NULL OR a.published_date >= ?)"
+                "    AND (? IS NULL OR a.published_date < ?)"
+                ") WHERE ? IS NULL OR rank < ? OR (rank = ? AND id < ?) "
+                "ORDER BY rank DESC, id DESC LIMIT ?",
+                (
+                    match,
+                    _iso(date_from), _iso(date_from),
+                    _iso(date_to), _iso(date_to),
+                    after_rank, after_rank, after_rank, after_id,
+                    limit + 1,
+                ),
+            ))
+            return search_page(rows, limit)
+        return await self._run(read)
@@ -0,0 +1,114 @@
+-- SQLite mirror of supabase/init_schema.sql for the local storage backend
+-- Dates and timestamps are stored as ISO-8601 text, matching what PostgREST returns
+
+CREATE TABLE IF NOT EXISTS coins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    coingecko_id TEXT UNIQUE NOT NULL,
+    symbol TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%S', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS coin_prices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    coin_id INTEGER REFERENCES coins(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    price_usd REAL NOT NULL,
+    market_cap REAL,
+    UNIQUE(coin_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    summary TEXT,
+    link TEXT UNIQUE,
+    published_date TEXT NOT NULL,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%S', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS coin_sentiment (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    coin_id INTEGER REFERENCES coins(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    sentiment_score REAL,
+    mentions_count INTEGER DEFAULT 0,
+    no_mentions INTEGER DEFAULT 0,
+    UNIQUE(coin_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS coin_sentiment_deltas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    coin_id INTEGER REFERENCES coins(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    window_days INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    previous REAL NOT NULL,
+    delta REAL NOT NULL,
+    UNIQUE(coin_id, date, window_days, metric)
+);
+
+CREATE TABLE IF NOT EXISTS work_leases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(batch, kind, item)
+);
+
+CREATE INDEX IF NOT EXISTS idx_coins_coingecko_id ON coins(coingecko_id);
+CREATE INDEX IF NOT EXISTS idx_coin_prices_coin_id_date ON coin_prices(coin_id, date);
+CREATE INDEX IF NOT EXISTS idx_coin_sentiment_coin_id_date ON coin_sentiment(coin_id, date);
+CREATE INDEX IF NOT EXISTS idx_articles_published_date ON articles(published_date);
+CREATE INDEX IF NOT EXISTS idx_work_leases_claim ON work_leases(batch, status, lease_expires_at);
+CREATE INDEX IF NOT EXISTS idx_coin_sentiment_deltas_movers ON coin_sentiment_deltas(metric, window_days, date, delta);
+
+CREATE VIEW IF NOT EXISTS latest_coin_data AS
+SELECT
+    c.id as coin_id,
+    c.coingecko_id,
+    c.symbol,
+    c.name,
+    cp.price_usd,
+    cp.market_cap,
+    cs.sentiment_score,
+    cs.mentions_count,
+    cs.no_mentions,
+    cp.date as price_date,
+    cs.date as sentiment_date
+FROM coins c
+LEFT JOIN coin_prices cp ON c.id = cp.coin_id
+    AND cp.date = (SELECT MAX(date) FROM coin_prices WHERE coin_id = c.id)
+LEFT JOIN coin_sentiment cs ON c.id = cs.coin_id
+    AND cs.date = (SELECT MAX(date) FROM coin_sentiment WHERE coin_id = c.id)
+ORDER BY cp.market_cap DESC NULLS LAST;
+
+-- FTS5 index over title + summary, the local equivalent of articles.search_vector
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title,
+    summary,
+    content='articles',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+END;
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+END;
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+    INSERT INTO articles_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+END;
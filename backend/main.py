@@ -1,16 +1,33 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
-from database import Database
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from database import create_database
+from live_updates import CoinUpdateBroker, CoinChangePoller
+from coin_snapshot import CoinSnapshotReader, format_coin_row
+from movers import METRICS, WINDOWS
+from request_coalescing import RequestCoalescer
+import asyncio
+import json
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release the pooled database connections on shutdown
+    db.close()
+
+
 app = FastAPI(
     title="Crypto Sentiment Tracker API",
     description="API for tracking cryptocurrency sentiment based on news analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -32,8 +49,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database
-db = Database()
+# Opt-in profiling of a sample of requests (PROFILE_DIR, PROFILE_REQUEST_RATE)
+if os.getenv("PROFILE_DIR"):
+    from profiling import Profiler, install_request_profiling
+    install_request_profiling(app, Profiler.from_env())
+
+# Initialize database (Supabase by default, DATABASE_BACKEND=sqlite for a local file)
+db = create_database()
+
+# Snapshot published by the pipeline (COIN_SNAPSHOT_PATH); shared by all workers via mmap
+coin_snapshot = CoinSnapshotReader(
+    os.getenv("COIN_SNAPSHOT_PATH"),
+    max_age=float(os.getenv("COIN_SNAPSHOT_MAX_AGE", 36 * 3600)),
+)
+
+
+async def fetch_formatted_coins() -> List[Dict[str, Any]]:
+    body = coin_snapshot.coins_json()
+    if body is not None:
+        return json.loads(body)
+    return [format_coin_row(coin) for coin in await db.get_latest_coin_data()]
+
+
+# Identical concurrent reads share one database query, then a short-lived result
+_coalescer: Optional[RequestCoalescer] = None
+
+
+def coalescer() -> RequestCoalescer:
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = RequestCoalescer.from_env()
+    return _coalescer
+
+
+def format_article(a: Dict[str, Any]) -> Dict[str, Any]:
+    # Ensure consistent field types
+    return {
+        "id": a.get("id"),
+        "title": a.get("title"),
+        "summary": a.get("summary"),
+        "link": a.get("link"),
+        "published_date": a.get("published_date"),
+    }
+
+
+async def fetch_coin_articles(coin_id: int, limit: int) -> List[Dict[str, Any]]:
+    return [format_article(a) for a in await db.get_recent_articles_for_coin(coin_id=coin_id, limit=limit)]
+
+
+# Live updates: one poll of latest_coin_data fans out to every open stream
+live_broker = CoinUpdateBroker()
+live_poller = CoinChangePoller(live_broker, fetch_formatted_coins, interval=float(os.getenv("LIVE_POLL_SECONDS", 30)))
+STREAM_HEARTBEAT_SECONDS = 15
+
 
 @app.get("/")
 async def root():
@@ -44,8 +112,7 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        conn = await db.get_connection()
-        await conn.close()
+        await db.ping()
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
@@ -56,72 +123,57 @@ async def get_coins():
     Get the latest coin data including prices, market cap, and sentiment scores.
     Returns data sorted by sentiment score (highest first), then by market cap.
     """
+    body = coin_snapshot.coins_json()
+    if body is not None:
+        return Response(content=body, media_type="application/json")
     try:
-        coins_data = await db.get_latest_coin_data()
-        
-        # Format the response
-        formatted_coins = []
-        for coin in coins_data:
-            formatted_coin = {
-                "coin_id": coin["coin_id"],
-                "coingecko_id": coin["coingecko_id"],
-                "symbol": coin["symbol"],
-                "name": coin["name"],
-                "price_usd": float(coin["price_usd"]) if coin["price_usd"] else None,
-                "market_cap": float(coin["market_cap"]) if coin["market_cap"] else None,
-                "sentiment_score": float(coin["sentiment_score"]) if coin["sentiment_score"] is not None else None,
-                "mentions_count": coin["mentions_count"] if coin["mentions_count"] else 0,
-                "no_mentions": coin["no_mentions"] if coin["no_mentions"] is not None else True
-            }
-            formatted_coins.append(formatted_coin)
-        
-        return formatted_coins
-        
+        return await coalescer().get(("coins",), fetch_formatted_coins)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching coin data: {str(e)}")
 
+@app.get("/api/coins/stream")
+async def stream_coins(request: Request):
+    """Server-Sent Events stream of coin table changes.
+
+    Sends a `snapshot` event with every coin, then `update` events carrying
+    only the rows that changed (keyed by coin_id) and the ids that were removed.
+    """
+    # Without a running poller the broker's rows may be hours old (or never loaded)
+    if not live_broker.initialized or not live_poller.running:
+        try:
+            await live_poller.refresh()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching coin data: {str(e)}")
+    queue = live_broker.subscribe()
+    live_poller.ensure_running()
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            live_broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/api/coins/{coin_id}")
 async def get_coin_details(coin_id: int):
     """Get detailed information for a specific coin"""
+    body = coin_snapshot.coin_json(coin_id)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
     try:
-        conn = await db.get_connection()
-        try:
-            # Get coin basic info
-            coin_result = await conn.fetchrow("""
-                SELECT id, coingecko_id, symbol, name, created_at
-                FROM coins WHERE id = $1
-            """, coin_id)
-            
-            if not coin_result:
-                raise HTTPException(status_code=404, detail="Coin not found")
-            
-            # Get recent prices (last 30 days)
-            prices_result = await conn.fetch("""
-                SELECT date, price_usd, market_cap
-                FROM coin_prices 
-                WHERE coin_id = $1 
-                ORDER BY date DESC 
-                LIMIT 30
-            """, coin_id)
-            
-            # Get recent sentiment (last 30 days)
-            sentiment_result = await conn.fetch("""
-                SELECT date, sentiment_score, mentions_count, no_mentions
-                FROM coin_sentiment 
-                WHERE coin_id = $1 
-                ORDER BY date DESC 
-                LIMIT 30
-            """, coin_id)
-            
-            return {
-                "coin": dict(coin_result),
-                "recent_prices": [dict(row) for row in prices_result],
-                "recent_sentiment": [dict(row) for row in sentiment_result]
-            }
-            
-        finally:
-            await conn.close()
-            
+        details = await db.get_coin_details(coin_id)
+        if details is None:
+            raise HTTPException(status_code=404, detail="Coin not found")
+        return details
     except HTTPException:
         raise
     except Exception as e:
@@ -131,21 +183,138 @@ async def get_coin_details(coin_id: int):
 async def get_coin_articles(coin_id: int, limit: int = 10):
     """Get the most recent N articles that mention the given coin"""
     try:
-        articles = await db.get_recent_articles_for_coin(coin_id=coin_id, limit=limit)
-        # Ensure consistent field types
-        formatted = []
-        for a in articles:
-            formatted.append({
-                "id": a.get("id"),
-                "title": a.get("title"),
-                "summary": a.get("summary"),
-                "link": a.get("link"),
-                "published_date": a.get("published_date"),
-            })
-        return formatted
+        return await coalescer().get(("coin_articles", coin_id, limit), lambda: fetch_coin_articles(coin_id, limit))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching coin articles: {str(e)}")
 
+MAX_RECENT_ARTICLE_COINS = 100
+
+
+@app.get("/api/articles/recent")
+async def get_recent_articles(
+    coin_ids: str = Query(..., description="Comma separated coin ids"),
+    limit: int = Query(10, ge=1, le=50, description="Articles per coin"),
+):
+    """Latest articles for several coins in one response, keyed by coin id"""
+    try:
+        ids = sorted({int(i) for i in coin_ids.split(",") if i.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="coin_ids must be comma separated integers")
+    if not ids or len(ids) > MAX_RECENT_ARTICLE_COINS:
+        raise HTTPException(status_code=400, detail=f"coin_ids must list between 1 and {MAX_RECENT_ARTICLE_COINS} coins")
+
+    async def fetch():
+        grouped = await db.get_recent_articles_for_coins(ids, limit=limit)
+        return {
+            "limit": limit,
+            "articles": {str(coin_id): [format_article(a) for a in articles] for coin_id, articles in grouped.items()},
+        }
+
+    try:
+        return await coalescer().get(("recent_articles", tuple(ids), limit), fetch)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching recent articles: {str(e)}")
+
+@app.get("/api/articles/search")
+async def search_articles(
+    q: str = Query(..., min_length=1, description="Full-text query over article title and summary"),
+    coin_id: Optional[int] = Query(None, description="Only articles mentioning this coin"),
+    date_from: Optional[date] = Query(None, alias="from", description="First published day (inclusive)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last published day (inclusive)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Ranked full-text article search with keyset pagination"""
+    start = datetime.combine(date_from, time.min, tzinfo=timezone.utc) if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc) if date_to else None
+    try:
+        return await db.search_articles(q, coin_id=coin_id, date_from=start, date_to=end, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching articles: {str(e)}")
+
+@app.get("/api/movers")
+async def get_movers(
+    metric: str = Query("sentiment", description="sentiment or mentions"),
+    window: str = Query("1d", description="1d or 7d"),
+    direction: str = Query("up", description="up for the largest rises, down for the largest falls"),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Coins whose sentiment or mention count moved the most over the window, as of the latest day"""
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(METRICS)}")
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of: {', '.join(WINDOWS)}")
+    if direction not in ("up", "down"):
+        raise HTTPException(status_code=400, detail="direction must be up or down")
+    try:
+        rows = await db.get_top_movers(metric, WINDOWS[window], direction=direction, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching movers: {str(e)}")
+    return {
+        "date": str(rows[0]["date"])[:10] if rows else None,
+        "metric": metric,
+        "window": window,
+        "direction": direction,
+        "movers": [
+            {
+                "coin_id": r["coin_id"],
+                "coingecko_id": r["coingecko_id"],
+                "symbol": r["symbol"],
+                "name": r["name"],
+                "value": float(r["value"]),
+                "previous": float(r["previous"]),
+                "delta": float(r["delta"]),
+            }
+            for r in rows
+        ],
+    }
+
+# numpy and the analytics module load on the first analytics request, not at startup
+_correlation_service = None
+
+
+def correlation_service():
+    global _correlation_service
+    if _correlation_service is None:
+        from analytics import CorrelationService
+        _correlation_service = CorrelationService(db, ttl=float(os.getenv("ANALYTICS_CACHE_TTL", 900)))
+    return _correlation_service
+
+
+def reset_caches():
+    """Drop coalesced results and the analytics service, which hold data read through db.
+
+    For code that replaces db in a running process (tests, the load test).
+    """
+    global _coalescer, _correlation_service
+    _coalescer = None
+    _correlation_service = None
+
+
+@app.get("/api/analytics/correlation")
+async def get_correlation(
+    windows: str = Query("7,14,30", description="Comma separated rolling window sizes in days"),
+    max_lag: int = Query(3, ge=0, le=7, description="Largest sentiment-to-return lag in days"),
+    coin_id: Optional[int] = Query(None, description="Only this coin, with its full rolling series"),
+):
+    """Rolling sentiment vs daily return correlations and lagged statistics per coin"""
+    try:
+        window_sizes = sorted({int(w) for w in windows.split(",") if w.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="windows must be comma separated integers")
+    if not window_sizes or window_sizes[0] < 3 or window_sizes[-1] > 90:
+        raise HTTPException(status_code=400, detail="windows must be between 3 and 90 days")
+
+    try:
+        report = await correlation_service().report(window_sizes, max_lag, coin_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing correlations: {str(e)}")
+    if coin_id is not None and not report["coins"]:
+        raise HTTPException(status_code=404, detail="Coin not found")
+    return report
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+
+# Windows exposed by /api/movers, keyed by their query value
+WINDOWS = {"1d": 1, "7d": 7}
+METRICS = ("sentiment", "mentions")
+
+
+def _metric_value(row: Optional[Dict[str, Any]], metric: str) -> Optional[float]:
+    """Value of metric in a coin_sentiment row, or None when it cannot be compared"""
+    if row is None:
+        return None
+    if metric == "mentions":
+        return float(row.get("mentions_count") or 0)
+    if row.get("no_mentions") or row.get("sentiment_score") is None:
+        return None
+    return float(row["sentiment_score"])
+
+
+def compute_deltas(day: date, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """coin_sentiment_deltas rows for day from the coin_sentiment rows of day and each window start.
+
+    A coin gets a row per window and metric only when both ends have a
+    value: sentiment needs a score on both days (not a no-mentions day),
+    mentions needs a stored row on both days.
+    """
+    by_day: Dict[date, Dict[int, Dict[str, Any]]] = {}
+    for row in rows:
+        row_date = row["date"] if isinstance(row["date"], date) else date.fromisoformat(str(row["date"])[:10])
+        by_day.setdefault(row_date, {})[row["coin_id"]] = row
+
+    deltas = []
+    for coin_id, current in by_day.get(day, {}).items():
+        for window_days in WINDOWS.values():
+            previous_row = by_day.get(day - timedelta(days=window_days), {}).get(coin_id)
+            for metric in METRICS:
+                value, previous = _metric_value(current, metric), _metric_value(previous_row, metric)
+                if value is None or previous is None:
+                    continue
+                deltas.append({
+                    "coin_id": coin_id,
+                    "date": day,
+                    "window_days": window_days,
+                    "metric": metric,
+                    "value": value,
+                    "previous": previous,
+                    "delta": round(value - previous, 6),
+                })
+    return deltas
+
+
+async def update_sentiment_deltas(db, day: date, page_size: int = 1000) -> int:
+    """Recompute the deltas of day from coin_sentiment and store them; returns rows written.
+
+    day's existing deltas are deleted first, so a coin whose row (or window
+    start) was removed by a rewrite, backfill or retention stops ranking.
+    """
+    dates = [day] + [day - timedelta(days=w) for w in WINDOWS.values()]
+    rows, after_id = [], 0
+    while True:
+        page = await db.get_sentiment_rows(dates, after_id=after_id, limit=page_size)
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        after_id = page[-1]["id"]
+
+    deltas = compute_deltas(day, rows)
+    await db.delete_sentiment_deltas(day)
+    if not deltas:
+        return 0
+    return await db.upsert_sentiment_deltas(deltas)
+
+
+async def refresh_deltas_after(db, day: date, today: Optional[date] = None) -> int:
+    """Update day and every later day whose window starts on day (for rewritten history)"""
+    today = today or datetime.now(timezone.utc).date()
+    written = 0
+    for target in [day] + [day + timedelta(days=w) for w in WINDOWS.values()]:
+        if target <= today:
+            written += await update_sentiment_deltas(db, target)
+    return written
@@ -0,0 +1,215 @@
+import asyncio
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Optional
+
+
+class StackSampler(threading.Thread):
+    """Samples every thread's Python stack at a fixed interval.
+
+    Counts are kept per collapsed stack ("thread;outer;...;inner"), the
+    input format of flamegraph.pl, speedscope and friends.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write_collapsed(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Opt-in profiling of pipeline stages and sampled API requests.
+
+    Disabled unless a directory is given (PROFILE_DIR or cron_job.py
+    --profile). Each profiled stage writes, under that directory:
+
+    - <stage>.prof: cProfile stats (snakeviz, pstats)
+    - <stage>.collapsed: sampled stacks for flamegraph tools
+    - <stage>.tracemalloc: allocation snapshot (tracemalloc.Snapshot.load)
+    - <stage>.alloc.txt: the top allocation sites of that snapshot
+
+    Only one stage is profiled at a time; cProfile cannot nest, so a stage
+    that starts while another is running is executed unprofiled. cProfile
+    traces the thread that starts the stage; the stack sampler and
+    tracemalloc see every thread.
+    """
+
+    def __init__(self, directory: Optional[str] = None, request_rate: float = 0.01, sample_interval: float = 0.005):
+        self.directory = directory
+        self.request_rate = request_rate
+        self.sample_interval = sample_interval
+        self._busy = threading.Lock()
+        self._counter = 0
+
+    @classmethod
+    def from_env(cls, directory: Optional[str] = None) -> "Profiler":
+        return cls(
+            directory or os.getenv("PROFILE_DIR") or None,
+            request_rate=float(os.getenv("PROFILE_REQUEST_RATE", 0.01)),
+            sample_interval=float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5)) / 1000,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.request_rate
+
+    def stage(self, name: str, subdirectory: str = ""):
+        """Context manager profiling the enclosed block as stage name (a no-op when disabled)"""
+        if not self.enabled:
+            return nullcontext()
+        return self._profile(name, subdirectory)
+
+    @contextmanager
+    def _profile(self, name: str, subdirectory: str):
+        session = self.begin(name, subdirectory)
+        try:
+            yield
+        finally:
+            if session is not None:
+                self.write(session)
+
+    def begin(self, name: str, subdirectory: str = "") -> Optional["_Session"]:
+        """Start profiling name; None when another stage is already being profiled"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        self._counter += 1
+        directory = os.path.join(self.directory, subdirectory)
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")
+        session = _Session(name, os.path.join(directory, f"{self._counter:03d}_{slug}"), self.sample_interval)
+        session.start()
+        return session
+
+    def write(self, session: "_Session", header: str = ""):
+        """Stop session and write its files (blocking: the snapshot and dumps take a while)"""
+        try:
+            session.stop()
+            session.dump(header)
+        finally:
+            self._busy.release()
+
+    async def finish(self, session: "_Session", header: str = ""):
+        """write() on a worker thread, so the event loop keeps serving while the files are written"""
+        # cProfile only traces the thread that enabled it, so it is disabled here on the loop
+        session.profile.disable()
+        await asyncio.get_event_loop().run_in_executor(None, self.write, session, header)
+
+
+class _Session:
+    """One profiled stage: cProfile on the calling thread, stack sampling and tracemalloc"""
+
+    def __init__(self, name: str, base: str, sample_interval: float):
+        self.name = name
+        self.base = base
+        self.sampler = StackSampler(sample_interval)
+        self.profile = cProfile.Profile()
+        self.started_tracing = False
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def start(self):
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(10)
+        self.started = time.perf_counter()
+        self.sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+
+    def dump(self, header: str = ""):
+        snapshot = tracemalloc.take_snapshot()
+        if self.started_tracing:
+            tracemalloc.stop()
+        self.profile.dump_stats(f"{self.base}.prof")
+        self.sampler.write_collapsed(f"{self.base}.collapsed")
+        snapshot.dump(f"{self.base}.tracemalloc")
+        with open(f"{self.base}.alloc.txt", "w") as f:
+            if header:
+                f.write(f"# {header}\n")
+            for stat in snapshot.statistics("lineno")[:25]:
+                f.write(f"{stat}\n")
+        print(f"Profiled {self.name} in {self.elapsed:.2f}s -> {self.base}.*")
+
+
+# Written at the top of every request's .alloc.txt
+REQUEST_PROFILE_NOTE = (
+    "Whole-process profile while this request ran: cProfile covers every coroutine on the event loop, "
+    "the stacks and allocations cover every thread, so concurrent requests are included"
+)
+
+
+def install_request_profiling(app, profiler: Profiler):
+    """Profile a random PROFILE_REQUEST_RATE share of requests into <dir>/requests.
+
+    The profile is of the whole process for as long as the request runs,
+    until its body has been sent: whatever else the loop served meanwhile
+    is in it too, so sample at a quiet time (or a rate of 1 on a single
+    client) for a clean per-request picture. Event streams never end and
+    are not sampled. Files are written on a worker thread.
+    """
+
+    @app.middleware("http")
+    async def profile_requests(request, call_next):
+        if not profiler.should_sample() or "text/event-stream" in request.headers.get("accept", ""):
+            return await call_next(request)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        session = profiler.begin(f"{stamp} {request.method} {request.url.path}", subdirectory="requests")
+        if session is None:
+            return await call_next(request)
+        try:
+            response = await call_next(request)
+        except BaseException:
+            await profiler.finish(session, REQUEST_PROFILE_NOTE)
+            raise
+
+        body = response.body_iterator
+
+        async def profiled_body():
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                await profiler.finish(session, REQUEST_PROFILE_NOTE)
+
+        response.body_iterator = profiled_body()
+        return response
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class RequestCoalescer:
+    """Single-flight execution with a short-lived LRU of results.
+
+    Concurrent get() calls for the same key share one computation: the
+    first caller starts it as a task and later callers await that task, so
+    a burst of identical requests costs one backend query. The result is
+    then served from memory for ttl seconds, with at most max_entries keys
+    kept (least recently used evicted first). Failures are passed to every
+    waiting caller and are not cached. A caller that is cancelled (say, the
+    client disconnected) does not cancel the shared computation.
+    """
+
+    def __init__(self, ttl: float = 2.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "RequestCoalescer":
+        return cls(ttl=float(os.getenv("API_COALESCE_TTL", 2)), max_entries=int(os.getenv("API_COALESCE_MAX_ENTRIES", 256)))
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._results.pop(key, None)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            # Reinserted so the dict's order is least recently used first
+            self._results[key] = cached
+            self.hits += 1
+            return cached[1]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._run(key, compute))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await compute()
+            if self.ttl > 0:
+                self._results[key] = (time.monotonic(), result)
+                while len(self._results) > self.max_entries:
+                    del self._results[next(iter(self._results))]
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def clear(self):
+        self._results.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "coalesced": self.coalesced, "misses": self.misses,
+                "entries": len(self._results), "in_flight": len(self._in_flight)}
@@ -0,0 +1,172 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from feed_archive import DEFAULT_ARCHIVE_PATH, FeedArchive
+
+
+def _env_days(name: str, default: int) -> Optional[int]:
+    """Read a retention window in days from the environment; 0 disables the policy"""
+    value = int(os.getenv(name, default))
+    return value if value > 0 else None
+
+
+def enabled() -> bool:
+    """Whether the daily run applies retention (RETENTION_ENABLED=1); it deletes data, so it is off by default"""
+    return os.getenv("RETENTION_ENABLED", "0") == "1"
+
+
+def load_policies() -> Dict[str, Dict[str, Any]]:
+    """Per-table retention policies, overridable through environment variables.
+
+    articles are deleted outright once older than their window; the daily
+    time series tables are downsampled to one row per coin per ISO week.
+    feed_archive drops whole days of archived feed bodies.
+    Routine runs only look at the lookback_days before the downsampling
+    cutoff, since everything older was compacted by earlier runs.
+    """
+    lookback_days = _env_days("RETENTION_DOWNSAMPLE_LOOKBACK_DAYS", 28)
+    return {
+        "articles": {
+            "action": "delete",
+            "days": _env_days("RETENTION_ARTICLES_DAYS", 90),
+        },
+        "coin_prices": {
+            "action": "downsample_weekly",
+            "days": _env_days("RETENTION_PRICES_DAILY_DAYS", 180),
+            "lookback_days": lookback_days,
+        },
+        "coin_sentiment": {
+            "action": "downsample_weekly",
+            "days": _env_days("RETENTION_SENTIMENT_DAILY_DAYS", 180),
+            "lookback_days": lookback_days,
+        },
+        "feed_archive": {
+            "action": "prune_days",
+            "days": _env_days("FEED_ARCHIVE_DAYS", 30),
+            "path": os.getenv("FEED_ARCHIVE_DIR", DEFAULT_ARCHIVE_PATH),
+        },
+    }
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def aggregate_prices(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Weekly price row: mean close price and mean of the known market caps"""
+    prices = [float(r["price_usd"]) for r in rows if r.get("price_usd") is not None]
+    caps = [float(r["market_cap"]) for r in rows if r.get("market_cap") is not None]
+    return {
+        "price_usd": sum(prices) / len(prices) if prices else 0.0,
+        "market_cap": sum(caps) / len(caps) if caps else None,
+    }
+
+
+def aggregate_sentiment(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Weekly sentiment row: summed mentions and a mention-weighted mean score"""
+    mentions = sum(int(r.get("mentions_count") or 0) for r in rows)
+    weighted = [(float(r["sentiment_score"]), int(r.get("mentions_count") or 0))
+                for r in rows if r.get("sentiment_score") is not None and r.get("mentions_count")]
+    weight = sum(w for _, w in weighted)
+    return {
+        "sentiment_score": sum(s * w for s, w in weighted) / weight if weight else None,
+        "mentions_count": mentions,
+        "no_mentions": mentions == 0,
+    }
+
+
+AGGREGATORS = {
+    "coin_prices": aggregate_prices,
+    "coin_sentiment": aggregate_sentiment,
+}
+
+
+async def purge_articles(db, days: int, batch_size: int, now: datetime) -> Dict[str, int]:
+    cutoff = now - timedelta(days=days)
+    deleted = 0
+    while True:
+        removed = await db.delete_articles_batch(cutoff, limit=batch_size)
+        if not removed:
+            break
+        deleted += removed
+    return {"deleted": deleted}
+
+
+def prune_archive(path: str, days: int, today: date) -> Dict[str, int]:
+    """Remove the feed archive's day directories older than days"""
+    return {"deleted_days": FeedArchive(path).prune(today - timedelta(days=days))}
+
+
+async def downsample_table(db, table: str, days: int, batch_size: int, today: date, lookback_days: Optional[int] = None) -> Dict[str, int]:
+    """Collapse daily rows older than `days` into one row per coin per ISO week.
+
+    Only weeks that lie entirely before the cutoff are touched, and weeks
+    already reduced to their Monday row are skipped, so reruns are no-ops.
+    With lookback_days, only the weeks starting within that many days
+    before the cutoff are read; None reads the whole history.
+    """
+    cutoff = week_start(today - timedelta(days=days))
+    since = week_start(cutoff - timedelta(days=lookback_days)) if lookback_days else None
+    groups: Dict[Tuple[int, date], List[Dict[str, Any]]] = {}
+    after_id = 0
+    while True:
+        page = await db.get_daily_rows_before(table, cutoff, after_id=after_id, limit=batch_size, since=since)
+        if not page:
+            break
+        for row in page:
+            row_date = date.fromisoformat(str(row["date"])[:10])
+            groups.setdefault((row["coin_id"], week_start(row_date)), []).append(row)
+        after_id = page[-1]["id"]
+
+    aggregate = AGGREGATORS[table]
+    weekly_rows = []
+    obsolete_ids = []
+    for (coin_id, monday), rows in groups.items():
+        if len(rows) == 1 and str(rows[0]["date"])[:10] == monday.isoformat():
+            continue
+        weekly_rows.append({"coin_id": coin_id, "date": monday, **aggregate(rows)})
+        obsolete_ids.extend(r["id"] for r in rows if str(r["date"])[:10] != monday.isoformat())
+
+    # Write the weekly rows before deleting the dailies they replace
+    if table == "coin_prices":
+        await db.upsert_coin_prices(weekly_rows, batch_size=batch_size)
+    else:
+        await db.upsert_coin_sentiments(weekly_rows, batch_size=batch_size)
+    for start in range(0, len(obsolete_ids), batch_size):
+        await db.delete_rows_by_ids(table, obsolete_ids[start:start + batch_size])
+
+    return {"weekly_rows": len(weekly_rows), "deleted": len(obsolete_ids)}
+
+
+async def run_retention(db, policies: Optional[Dict[str, Dict[str, Any]]] = None, batch_size: Optional[int] = None,
+                        now: Optional[datetime] = None, full: bool = False) -> Dict[str, Dict[str, int]]:
+    """Apply every enabled retention policy and return reclaimed row counts per table.
+
+    full downsamples the whole history instead of each policy's lookback
+    window, for the first run or after retention was off for a while.
+    """
+    policies = policies or load_policies()
+    batch_size = batch_size or int(os.getenv("RETENTION_BATCH_SIZE", 1000))
+    now = now or datetime.now(timezone.utc)
+
+    report = {}
+    for table, policy in policies.items():
+        days = policy.get("days")
+        if not days:
+            continue
+        if policy["action"] == "delete":
+            report[table] = await purge_articles(db, days, batch_size, now)
+        elif policy["action"] == "downsample_weekly":
+            lookback_days = None if full else policy.get("lookback_days")
+            report[table] = await downsample_table(db, table, days, batch_size, now.date(), lookback_days)
+        elif policy["action"] == "prune_days":
+            report[table] = prune_archive(policy["path"], days, now.date())
+        else:
+            raise ValueError(f"Unknown retention action for {table}: {policy['action']}")
+
+    print("Retention summary:")
+    for table, counts in report.items():
+        details = ", ".join(f"{k}={v}" for k, v in counts.items())
+        print(f"- {table}: {details}")
+    return report
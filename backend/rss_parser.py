@@ -1,87 +1,112 @@
 import feedparser
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone, timedelta
 import time
 import csv
 import os
+import traceback
+
+from source_registry import feed_urls
+from text_cleaner import article_text
+
+# Entries published before this window are skipped
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+USER_AGENT = os.getenv("SOURCES_USER_AGENT", "crypto-sentiment-tracker/1.0")
+
+# A feed download fails after CONNECT seconds without a connection, READ
+# seconds without a byte, or MAX seconds overall (a slow drip resets READ)
+FEED_CONNECT_TIMEOUT = float(os.getenv("FEED_CONNECT_TIMEOUT", 5))
+FEED_READ_TIMEOUT = float(os.getenv("FEED_READ_TIMEOUT", 10))
+FEED_MAX_SECONDS = float(os.getenv("FEED_MAX_SECONDS", 20))
+FEED_MAX_BYTES = int(os.getenv("FEED_MAX_BYTES", 10 * 1024 * 1024))
+
+
+def fetch_feed(url: str, session=None, connect_timeout: float = FEED_CONNECT_TIMEOUT, read_timeout: float = FEED_READ_TIMEOUT,
+               max_seconds: float = FEED_MAX_SECONDS, max_bytes: int = FEED_MAX_BYTES) -> bytes:
+    """Download a feed body, failing fast on slow, hanging or oversized responses"""
+    deadline = time.monotonic() + max_seconds
+    response = (session or requests).get(url, timeout=(connect_timeout, read_timeout), stream=True, headers={"User-Agent": USER_AGENT})
+    with response:
+        response.raise_for_status()
+        chunks, size = [], 0
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Feed larger than {max_bytes} bytes")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Feed download exceeded {max_seconds}s")
+            chunks.append(chunk)
+    return b"".join(chunks)
 
 class RSSParser:
-    def __init__(self):
-        self.feeds = [
-            "https://www.coindesk.com/arc/outboundfeeds/rss/"
-            "https://cointelegraph.com/rss",
-            "https://decrypt.co/feed",
-            "https://www.newsbtc.com/feed/",
-            "https://bitcoinmagazine.com/.rss/full/",
-            "https://cryptoslate.com/feed/",
-            "https://www.cryptonews.com/news/feed/",
-            "https://blockchain.news/feed",
-            "https://www.ccn.com/news/crypto-news/feeds/",
-            "https://www.ccn.com/analysis/crypto-analysis/feeds/",
-            "https://coinjournal.net/feeds/",
-            "https://thedefiant.io/feed/",
-            "https://cryptopotato.com/feed/",
-            "https://livebitcoinnews.com/feed/",
-            "https://cryptoninjas.net/feed/",
-            "https://ambcrypto.com/feed/",
-            "https://u.today/rss",
-            "https://www.investing.com/rss/news_25.rss",
-            "https://bitcoinist.com/feed/",
-            "https://cryptobriefing.com/feed/",
-            "https://beincrypto.com/feed/",
-            "https://cryptonewsflash.com/feed/",
-            "https://finbold.com/feed/",
-            "https://blockonomi.com/feed/",
-        ]
+    def __init__(self, archive=None):
+        # The feed list lives in the source registry (feeds.csv)
+        self.feeds = feed_urls()
         self.max_feeds = len(self.feeds)
-        
+        # Optional feed_archive.FeedArchive keeping every fetched body for replay
+        self.archive = archive
+
     def parse_feed(self, feed_url: str) -> List[Dict[str, Any]]:
         """Parse a single RSS feed and return articles"""
         try:
             print(f"Parsing feed: {feed_url}")
-            feed = feedparser.parse(feed_url)
-            
+            # feedparser has no timeout of its own, so the download is bounded here
+            body = fetch_feed(feed_url)
+            if self.archive is not None:
+                try:
+                    self.archive.put(feed_url, body)
+                except OSError as e:
+                    print(f"Error archiving {feed_url}: {e}")
+            feed = feedparser.parse(body)
+
             if feed.bozo:
                 print(f"Warning: Feed may be malformed: {feed_url}")
-            
-            articles = []
-            for entry in feed.entries:
-                try:
-                    published_date = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        published_date = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
-                    else:
-                        published_date = datetime.now(datetime.timezone.utc)
-                    
-                    # last 7 days
-                    if published_date < datetime.now(timezone.utc) - timedelta(days=7):
-                        continue
-
-                    article = {
-                        "title": getattr(entry, 'title', ''),
-                        "summary": getattr(entry, 'summary', '') or getattr(entry, 'description', ''),
-                        "link": getattr(entry, 'link', ''),
-                        "published_date": published_date
-                    }
-                    
-                    if article["title"]:
-                        articles.append(article)
-                        
-                except Exception as e:
-                    print(f"Error parsing entry from {feed_url}: {e}")
-                    continue
-            
+
+            articles = RSSParser.articles_from_feed(feed, feed_url)
             print(f"Parsed {len(articles)} articles from {feed_url}")
             return articles
-            
+
         except Exception as e:
             print(traceback.format_exc())
             print(f"Error parsing feed {feed_url}: {e}")
             return []
-    
+
+    @staticmethod
+    def articles_from_feed(feed, feed_url: str, max_age: Optional[timedelta] = DEFAULT_MAX_AGE) -> List[Dict[str, Any]]:
+        """Normalize the entries of a parsed feed into articles (max_age None keeps old entries)"""
+        articles = []
+        for entry in feed.entries:
+            try:
+                published_date = None
+                if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                    published_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+                    published_date = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
+                else:
+                    published_date = datetime.now(timezone.utc)
+
+                if max_age is not None and published_date < datetime.now(timezone.utc) - max_age:
+                    continue
+
+                article = {
+                    "title": getattr(entry, 'title', ''),
+                    "summary": getattr(entry, 'summary', '') or getattr(entry, 'description', ''),
+                    "link": getattr(entry, 'link', ''),
+                    "published_date": published_date
+                }
+
+                if article["title"]:
+                    # Cleaned once here so dedup and scoring skip the markup
+                    article_text(article)
+                    articles.append(article)
+
+            except Exception as e:
+                print(f"Error parsing entry from {feed_url}: {e}")
+                continue
+        return articles
+
     def parse_all_feeds(self, max_feeds: int = None) -> List[Dict[str, Any]]:
         """Parse all RSS feeds and return combined articles"""
         all_articles = []
@@ -94,6 +119,6 @@ class RSSParser:
             articles = self.parse_feed(feed_url)
             all_articles.extend(articles)
             time.sleep(1)  # Be respectful to RSS feeds
-        
+
         print(f"Total articles parsed: {len(all_articles)}")
-        return all_articles
\ No newline at end of file
+        return all_articles
@@ -1,19 +1,35 @@
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+import os
 import re
 from datetime import date
 
+from text_cleaner import article_text
+from vader_engine import VaderEngine
+
 class SentimentAnalyzer:
-    def __init__(self):
-        self.analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, engine: Optional[str] = None):
+        # "fast" (default) scores with VaderEngine; "vader" with the reference implementation
+        self.engine = engine or os.getenv("SENTIMENT_ENGINE", "fast")
+        if self.engine == "vader":
+            self.analyzer = SentimentIntensityAnalyzer()
+        else:
+            self.analyzer = VaderEngine()
         
     def analyze_text(self, text: str) -> float:
         """Analyze sentiment of text using VADER and return compound score"""
         if not text:
             return 0.0
         
-        scores = self.analyzer.polarity_scores(text)
-        return scores['compound']
+        if self.engine == "vader":
+            return self.analyzer.polarity_scores(text)['compound']
+        return self.analyzer.compound(text)
+
+    def analyze_texts(self, texts: List[str]) -> List[float]:
+        """Compound scores for a batch of texts, in order"""
+        if self.engine == "vader":
+            return [self.analyze_text(text) for text in texts]
+        return self.analyzer.compound_many(texts)
     
     def find_coin_mentions(self, text: str, coins: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Find which coins are mentioned in the text"""
@@ -58,29 +74,28 @@ class SentimentAnalyzer:
                 'no_mentions': True
             }
         
-        # Process each article
+        # Find mentioned coins in each article, then score the ones that mention any in one batch
+        matched = []
         for article in articles:
-            # Combine title and summary for analysis
-            full_text = f"{article.get('title', '')} {article.get('summary', '')}"
-            
-            # Find mentioned coins
+            # Title and summary with markup stripped, as cleaned by RSSParser
+            full_text = article_text(article)
             mentioned_coins = self.find_coin_mentions(full_text, coins)
-            
             if mentioned_coins:
-                # Analyze sentiment of the article
-                sentiment_score = self.analyze_text(full_text)
+                matched.append((full_text, mentioned_coins))
+        sentiment_scores = self.analyze_texts([full_text for full_text, _ in matched])
+
+        for (_, mentioned_coins), sentiment_score in zip(matched, sentiment_scores):
+            # Add sentiment to each mentioned coin
+            for mentioned_coin in mentioned_coins:
+                coin_id = mentioned_coin['coin_id']
+                mentions = mentioned_coin['mentions']
+                
+                coin_sentiment_data[coin_id]['total_mentions'] += mentions
+                coin_sentiment_data[coin_id]['no_mentions'] = False
                 
-                # Add sentiment to each mentioned coin
-                for mentioned_coin in mentioned_coins:
-                    coin_id = mentioned_coin['coin_id']
-                    mentions = mentioned_coin['mentions']
-                    
-                    coin_sentiment_data[coin_id]['total_mentions'] += mentions
-                    coin_sentiment_data[coin_id]['no_mentions'] = False
-                    
-                    # Add sentiment score weighted by number of mentions
-                    for _ in range(mentions):
-                        coin_sentiment_data[coin_id]['sentiment_scores'].append(sentiment_score)
+                # Add sentiment score weighted by number of mentions
+                for _ in range(mentions):
+                    coin_sentiment_data[coin_id]['sentiment_scores'].append(sentiment_score)
         
         # Calculate average sentiment for each coin
         for coin_id, data in coin_sentiment_data.items():
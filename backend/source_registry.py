@@ -0,0 +1,28 @@
+import csv
+import os
+from typing import List, Dict, Optional, Set
+
+# One row per source: kind (rss, reddit, trends), url and enabled (true/false)
+DEFAULT_REGISTRY_PATH = os.getenv("SOURCES_CSV", os.path.join(os.path.dirname(os.path.abspath(__file__)), "feeds.csv"))
+
+
+def read_registry(path: Optional[str] = None, kinds: Optional[Set[str]] = None) -> List[Dict[str, str]]:
+    """Enabled rows of the source registry, in file order.
+
+    A file with only a feed_url column is read as a list of RSS feeds.
+    """
+    rows = []
+    with open(path or DEFAULT_REGISTRY_PATH, newline="") as f:
+        for row in csv.DictReader(f):
+            url = (row.get("url") or row.get("feed_url") or "").strip()
+            kind = (row.get("kind") or "rss").strip().lower()
+            enabled = (row.get("enabled") or "true").strip().lower() not in ("false", "0", "no")
+            if not url or not enabled or (kinds and kind not in kinds):
+                continue
+            rows.append({"kind": kind, "url": url})
+    return rows
+
+
+def feed_urls(path: Optional[str] = None) -> List[str]:
+    """URLs of the enabled RSS feeds"""
+    return [row["url"] for row in read_registry(path, kinds={"rss"})]
@@ -0,0 +1,338 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone, timedelta
+from typing import List, Dict, Any, Optional, Set
+
+import feedparser
+import requests
+
+from feed_archive import FeedArchive
+from feed_health import FeedHealth
+from rss_parser import RSSParser, DEFAULT_MAX_AGE, FEED_CONNECT_TIMEOUT, FEED_READ_TIMEOUT, FEED_MAX_SECONDS, USER_AGENT, fetch_feed
+from source_registry import read_registry
+from text_cleaner import article_text
+
+
+def make_article(title: str, summary: str, link: str, published_date: datetime, max_age: Optional[timedelta]) -> Optional[Dict[str, Any]]:
+    """Normalized article dict, or None when it has no title or is older than max_age"""
+    if not title:
+        return None
+    if max_age is not None and published_date < datetime.now(timezone.utc) - max_age:
+        return None
+    article = {"title": title, "summary": summary, "link": link, "published_date": published_date}
+    article_text(article)
+    return article
+
+
+class Source:
+    """One place articles come from.
+
+    fetch() downloads the raw payload through a transport and parse() turns
+    it into normalized articles (title, summary, link, published_date), so
+    a recorded payload goes through exactly the same code as a live one.
+    """
+
+    kind = "source"
+    # Set by parse() when the payload was malformed
+    bozo = False
+
+    def __init__(self, url: str, max_age: Optional[timedelta] = DEFAULT_MAX_AGE):
+        self.url = url
+        self.max_age = max_age
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.url!r})"
+
+    def fetch(self, transport) -> List[Dict[str, Any]]:
+        return self.parse(transport.get(self.url))
+
+    def parse(self, body: bytes) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class RSSSource(Source):
+    kind = "rss"
+
+    def parse(self, body: bytes) -> List[Dict[str, Any]]:
+        feed = feedparser.parse(body)
+        self.bozo = bool(feed.bozo)
+        if feed.bozo:
+            print(f"Warning: Feed may be malformed: {self.url}")
+        return RSSParser.articles_from_feed(feed, self.url, self.max_age)
+
+
+class RedditSource(Source):
+    """A subreddit listing (https://www.reddit.com/r/<name>/new.json)"""
+
+    kind = "reddit"
+
+    def parse(self, body: bytes) -> List[Dict[str, Any]]:
+        articles = []
+        for child in json.loads(body).get("data", {}).get("children", []):
+            post = child.get("data", {})
+            if post.get("stickied"):
+                continue
+            article = make_article(
+                post.get("title", ""),
+                post.get("selftext", ""),
+                f"https://www.reddit.com{post['permalink']}" if post.get("permalink") else post.get("url", ""),
+                datetime.fromtimestamp(post.get("created_utc", time.time()), tz=timezone.utc),
+                self.max_age,
+            )
+            if article:
+                articles.append(article)
+        return articles
+
+
+class TrendsSource(Source):
+    """Google Trends trending-searches RSS (https://trends.google.com/trending/rss?geo=XX).
+
+    Each trending search becomes an article titled with the query; the
+    headline of its top news item is the summary and its URL the link, since
+    every item shares the same trends page link.
+    """
+
+    kind = "trends"
+
+    def parse(self, body: bytes) -> List[Dict[str, Any]]:
+        articles = []
+        feed = feedparser.parse(body)
+        self.bozo = bool(feed.bozo)
+        for entry in feed.entries:
+            parsed = getattr(entry, "published_parsed", None)
+            published_date = datetime(*parsed[:6], tzinfo=timezone.utc) if parsed else datetime.now(timezone.utc)
+            title = getattr(entry, "title", "")
+            link = getattr(entry, "ht_news_item_url", "") or f"{getattr(entry, 'link', self.url)}#{title}"
+            article = make_article(title, getattr(entry, "ht_news_item_title", ""), link, published_date, self.max_age)
+            if article:
+                articles.append(article)
+        return articles
+
+
+SOURCE_TYPES = {cls.kind: cls for cls in (RSSSource, RedditSource, TrendsSource)}
+
+
+def load_sources(path: Optional[str] = None, kinds: Optional[Set[str]] = None, max_age: Optional[timedelta] = DEFAULT_MAX_AGE) -> List[Source]:
+    """Build a Source for every enabled row of the registry (feeds.csv)"""
+    sources = []
+    for row in read_registry(path, kinds):
+        source_type = SOURCE_TYPES.get(row["kind"])
+        if source_type is None:
+            print(f"Skipping unknown source kind {row['kind']!r}: {row['url']}")
+            continue
+        sources.append(source_type(row["url"], max_age=max_age))
+    return sources
+
+
+class HttpTransport:
+    """Fetches payloads over HTTP with one pooled session and fail-fast timeouts"""
+
+    def __init__(self, read_timeout: float = FEED_READ_TIMEOUT, connect_timeout: float = FEED_CONNECT_TIMEOUT,
+                 max_seconds: float = FEED_MAX_SECONDS, user_agent: str = USER_AGENT):
+        self.read_timeout = read_timeout
+        self.connect_timeout = connect_timeout
+        self.max_seconds = max_seconds
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+
+    def get(self, url: str) -> bytes:
+        return fetch_feed(url, self.session, self.connect_timeout, self.read_timeout, self.max_seconds)
+
+    def close(self):
+        self.session.close()
+
+
+def fixture_name(url: str) -> str:
+    """File name a recorded payload for url is stored under"""
+    slug = re.sub(r"[^A-Za-z0-9.]+", "_", re.sub(r"^https?://", "", url)).strip("_")[:60]
+    return f"{slug}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]}"
+
+
+class FixtureTransport:
+    """Serves payloads recorded under directory, optionally with a fixed latency per request"""
+
+    def __init__(self, directory: str, latency: float = 0.0):
+        self.directory = directory
+        self.latency = latency
+
+    def get(self, url: str) -> bytes:
+        if self.latency:
+            time.sleep(self.latency)
+        with open(os.path.join(self.directory, fixture_name(url)), "rb") as f:
+            return f.read()
+
+    def close(self):
+        pass
+
+
+class RecordingTransport:
+    """Passes requests to another transport and saves every payload as a fixture"""
+
+    def __init__(self, inner, directory: str):
+        self.inner = inner
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, url: str) -> bytes:
+        body = self.inner.get(url)
+        with open(os.path.join(self.directory, fixture_name(url)), "wb") as f:
+            f.write(body)
+        return body
+
+    def close(self):
+        self.inner.close()
+
+
+class ArchivingTransport:
+    """Passes requests to another transport and keeps every payload in a FeedArchive"""
+
+    def __init__(self, inner, archive: FeedArchive):
+        self.inner = inner
+        self.archive = archive
+
+    def get(self, url: str) -> bytes:
+        body = self.inner.get(url)
+        try:
+            self.archive.put(url, body)
+        except OSError as e:
+            print(f"Error archiving {url}: {e}")
+        return body
+
+    def close(self):
+        self.inner.close()
+
+
+def default_transport():
+    """HTTP, archived into the FEED_ARCHIVE_DIR archive when FEED_ARCHIVE=1"""
+    archive = FeedArchive.from_env()
+    return ArchivingTransport(HttpTransport(), archive) if archive is not None else HttpTransport()
+
+
+def replay_archive(archive: FeedArchive, day: date, registry: Optional[str] = None,
+                   max_age: Optional[timedelta] = DEFAULT_MAX_AGE) -> List[Dict[str, Any]]:
+    """Parse every distinct body archived on day, with no network; articles are deduplicated by link.
+
+    The parser for each URL comes from the source registry; URLs no longer
+    in it are parsed as RSS. Items older than max_age at the time the body
+    was fetched are dropped, as the live run dropped them, so a replay sees
+    the inputs the day actually had.
+    """
+    kinds = {source.url: type(source) for source in load_sources(registry, max_age=None)}
+    articles, links = [], set()
+    # A body fetched several times is replayed once, for its first fetch, whose window is the widest
+    for entry, body in archive.iter_day(day):
+        source = kinds.get(entry["url"], RSSSource)(entry["url"], max_age=None)
+        try:
+            parsed = source.parse(body)
+        except Exception as e:
+            print(f"Error replaying {entry['url']} fetched at {entry['fetched_at']}: {e}")
+            continue
+        cutoff = datetime.fromisoformat(entry["fetched_at"]) - max_age if max_age is not None else None
+        for article in parsed:
+            if cutoff is not None and article["published_date"] < cutoff:
+                continue
+            link = article.get("link")
+            if link and link in links:
+                continue
+            links.add(link)
+            articles.append(article)
+    return articles
+
+
+class SourceLimit:
+    """Per-kind caps: at most concurrency fetches in flight, starts at least min_interval seconds apart"""
+
+    def __init__(self, concurrency: int = 4, min_interval: float = 0.0):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+
+
+# Reddit allows about ten unauthenticated requests a minute, Trends is
+# throttled aggressively; RSS feeds are all different hosts
+DEFAULT_LIMITS = {
+    "rss": SourceLimit(concurrency=8),
+    "reddit": SourceLimit(concurrency=1, min_interval=6.0),
+    "trends": SourceLimit(concurrency=1, min_interval=5.0),
+}
+
+
+class _KindGate:
+    def __init__(self, limit: SourceLimit):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit.concurrency)
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+
+    async def wait_turn(self):
+        async with self.lock:
+            loop = asyncio.get_event_loop()
+            delay = self.next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_start = loop.time() + self.limit.min_interval
+
+
+class SourceScheduler:
+    """Fetches many sources concurrently within global and per-kind limits.
+
+    Fetching and parsing run on a bounded thread pool (max_concurrency
+    workers); each kind additionally gets its own concurrency cap and
+    minimum spacing between request starts. A failing source is logged and
+    contributes no articles. With a FeedHealth, every outcome is recorded
+    and sources whose circuit breaker is open are skipped.
+    """
+
+    def __init__(self, transport=None, limits: Optional[Dict[str, SourceLimit]] = None, max_concurrency: int = 16,
+                 health: Optional[FeedHealth] = None):
+        self.transport = transport or default_transport()
+        self.health = health
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="sources")
+        self._gates: Dict[str, _KindGate] = {}
+
+    def _gate(self, kind: str) -> _KindGate:
+        if kind not in self._gates:
+            self._gates[kind] = _KindGate(self.limits.get(kind, SourceLimit()))
+        return self._gates[kind]
+
+    async def fetch_source(self, source: Source, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """Articles of one source; a failed fetch is logged and yields [] unless raise_errors"""
+        if self.health is not None and not self.health.allow(source.url):
+            print(f"Skipping {source.url}: circuit open")
+            return []
+        gate = self._gate(source.kind)
+        async with gate.semaphore:
+            await gate.wait_turn()
+            started = time.perf_counter()
+            try:
+                articles = await asyncio.get_event_loop().run_in_executor(self._executor, source.fetch, self.transport)
+            except Exception as e:
+                print(f"Error fetching {source.kind} source {source.url}: {e}")
+                if self.health is not None:
+                    self.health.record_failure(source.url, time.perf_counter() - started, str(e) or type(e).__name__)
+                if raise_errors:
+                    raise
+                return []
+        elapsed = time.perf_counter() - started
+        if self.health is not None:
+            self.health.record_success(source.url, elapsed, len(articles), source.bozo)
+        print(f"Fetched {len(articles)} articles from {source.url} in {elapsed:.2f}s")
+        return articles
+
+    async def fetch_all(self, sources: List[Source]) -> List[Dict[str, Any]]:
+        """Articles of every source, in source order"""
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self.fetch_source(s) for s in sources))
+        articles = [article for result in results for article in result]
+        print(f"Fetched {len(articles)} articles from {len(sources)} sources in {time.perf_counter() - started:.2f}s")
+        return articles
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.transport.close()
@@ -65,4 +65,233 @@ LEFT JOIN coin_prices cp ON c.id = cp.coin_id
     AND cp.date = (SELECT MAX(date) FROM coin_prices WHERE coin_id = c.id)
 LEFT JOIN coin_sentiment cs ON c.id = cs.coin_id 
     AND cs.date = (SELECT MAX(date) FROM coin_sentiment WHERE coin_id = c.id)
-ORDER BY cp.market_cap DESC NULLS LAST;
\ No newline at end of file
+ORDER BY cp.market_cap DESC NULLS LAST;
+
+-- Full-text search over articles
+ALTER TABLE articles
+ADD COLUMN search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+) STORED;
+
+CREATE INDEX idx_articles_search_vector ON articles USING GIN (search_vector);
+
+-- Ranked, keyset-paginated search. Pass the rank and id of the last row of
+-- the previous page as p_after_rank / p_after_id to fetch the next page.
+-- p_coin_id restricts results to articles mentioning the coin's name or symbol.
+CREATE OR REPLACE FUNCTION search_articles(
+    q TEXT,
+    p_coin_id INTEGER DEFAULT NULL,
+    p_from TIMESTAMP DEFAULT NULL,
+    p_to TIMESTAMP DEFAULT NULL,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    title TEXT,
+    summary TEXT,
+    link TEXT,
+    published_date TIMESTAMP,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', q) AS tsq
+    ),
+    coin_query AS (
+        SELECT phraseto_tsquery('english', c.name) || plainto_tsquery('english', c.symbol) AS tsq
+        FROM coins c
+        WHERE c.id = p_coin_id
+    ),
+    ranked AS (
+        SELECT a.id, a.title, a.summary, a.link, a.published_date,
+               ts_rank(a.search_vector, query.tsq) AS rank
+        FROM articles a, query
+        WHERE a.search_vector @@ query.tsq
+          AND (p_coin_id IS NULL OR a.search_vector @@ (SELECT tsq FROM coin_query))
+          AND (p_from IS NULL OR a.published_date >= p_from)
+          AND (p_to IS NULL OR a.published_date < p_to)
+    )
+    SELECT * FROM ranked
+    WHERE p_after_rank IS NULL
+       OR rank < p_after_rank
+       OR (rank = p_after_rank AND ranked.id < p_after_id)
+    ORDER BY rank DESC, id DESC
+    LIMIT p_limit;
+$$;
+
+-- Day-over-day and week-over-week changes in sentiment and mention volume,
+-- written by the pipeline alongside coin_sentiment. One row per coin, date,
+-- window (1 or 7 days) and metric ('sentiment' or 'mentions'); rows are only
+-- written when both ends of the window have a value.
+CREATE TABLE coin_sentiment_deltas (
+    id SERIAL PRIMARY KEY,
+    coin_id INTEGER REFERENCES coins(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    window_days INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    value FLOAT NOT NULL,
+    previous FLOAT NOT NULL,
+    delta FLOAT NOT NULL,
+    UNIQUE(coin_id, date, window_days, metric)
+);
+
+-- /api/movers reads the top or bottom N of one (metric, window, date) slice
+CREATE INDEX idx_coin_sentiment_deltas_movers ON coin_sentiment_deltas(metric, window_days, date, delta);
+
+-- Top N movers of the latest day for one metric and window. Each branch is a
+-- single range scan of idx_coin_sentiment_deltas_movers in delta order.
+CREATE OR REPLACE FUNCTION top_movers(
+    p_metric TEXT,
+    p_window_days INTEGER,
+    p_direction TEXT DEFAULT 'up',
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    coin_id INTEGER,
+    coingecko_id TEXT,
+    symbol TEXT,
+    name TEXT,
+    date DATE,
+    value FLOAT,
+    previous FLOAT,
+    delta FLOAT
+)
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    latest DATE;
+BEGIN
+    SELECT MAX(d.date) INTO latest
+    FROM coin_sentiment_deltas d
+    WHERE d.metric = p_metric AND d.window_days = p_window_days;
+
+    IF p_direction = 'down' THEN
+        RETURN QUERY
+        SELECT d.coin_id, c.coingecko_id, c.symbol, c.name, d.date, d.value, d.previous, d.delta
+        FROM coin_sentiment_deltas d JOIN coins c ON c.id = d.coin_id
+        WHERE d.metric = p_metric AND d.window_days = p_window_days AND d.date = latest
+        ORDER BY d.delta ASC
+        LIMIT p_limit;
+    ELSE
+        RETURN QUERY
+        SELECT d.coin_id, c.coingecko_id, c.symbol, c.name, d.date, d.value, d.previous, d.delta
+        FROM coin_sentiment_deltas d JOIN coins c ON c.id = d.coin_id
+        WHERE d.metric = p_metric AND d.window_days = p_window_days AND d.date = latest
+        ORDER BY d.delta DESC
+        LIMIT p_limit;
+    END IF;
+END;
+$$;
+
+-- Work items for distributed ingestion and backfill (cron_job.py --distributed).
+-- A batch (e.g. 'ingest:2025-09-26') holds one row per feed, backfill day or
+-- aggregation step. Workers lease rows with claim_work, extend the lease
+-- with heartbeat_work while they run, and mark them done with their result.
+-- A lease that is not renewed expires and the row can be claimed again.
+CREATE TABLE work_leases (
+    id SERIAL PRIMARY KEY,
+    batch TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result JSONB,
+    error TEXT,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(batch, kind, item)
+);
+
+CREATE INDEX idx_work_leases_claim ON work_leases(batch, status, lease_expires_at);
+
+-- Lease up to p_limit claimable items of a batch: pending ones and leased
+-- ones whose lease expired. SKIP LOCKED lets concurrent workers claim
+-- disjoint rows without waiting on each other.
+CREATE OR REPLACE FUNCTION claim_work(
+    p_batch TEXT,
+    p_owner TEXT,
+    p_lease_seconds INTEGER DEFAULT 300,
+    p_limit INTEGER DEFAULT 1,
+    p_max_attempts INTEGER DEFAULT 3
+)
+RETURNS SETOF work_leases
+LANGUAGE sql
+AS $$
+    UPDATE work_leases w
+    SET status = 'leased',
+        owner = p_owner,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = w.attempts + 1,
+        updated_at = NOW()
+    WHERE w.id IN (
+        SELECT id FROM work_leases
+        WHERE batch = p_batch
+          AND attempts < p_max_attempts
+          AND (status = 'pending' OR (status = 'leased' AND lease_expires_at < NOW()))
+        ORDER BY id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING w.*;
+$$;
+
+-- Extend the leases p_owner still holds; returns their ids
+CREATE OR REPLACE FUNCTION heartbeat_work(
+    p_ids INTEGER[],
+    p_owner TEXT,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS TABLE (id INTEGER)
+LANGUAGE sql
+AS $$
+    UPDATE work_leases w
+    SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        updated_at = NOW()
+    WHERE w.id = ANY(p_ids) AND w.owner = p_owner AND w.status = 'leased'
+    RETURNING w.id;
+$$;
+
+-- Latest p_limit articles for each of p_coin_ids among those published since
+-- p_since. An article belongs to a coin when its title or summary contains
+-- the coin's name or symbol (case-insensitive), as in get_recent_articles_for_coin.
+-- The window is applied first (idx_articles_published_date), so the substring
+-- join only sees recent articles rather than the whole table.
+CREATE OR REPLACE FUNCTION recent_articles_for_coins(
+    p_coin_ids INTEGER[],
+    p_limit INTEGER DEFAULT 10,
+    p_since TIMESTAMP DEFAULT NOW() - INTERVAL '30 days'
+)
+RETURNS TABLE (
+    coin_id INTEGER,
+    id INTEGER,
+    title TEXT,
+    summary TEXT,
+    link TEXT,
+    published_date TIMESTAMP
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH recent AS (
+        SELECT a.id, a.title, a.summary, a.link, a.published_date
+        FROM articles a
+        WHERE a.published_date >= p_since
+    )
+    SELECT ranked.coin_id, ranked.id, ranked.title, ranked.summary, ranked.link, ranked.published_date
+    FROM (
+        SELECT c.id AS coin_id, a.id, a.title, a.summary, a.link, a.published_date,
+               ROW_NUMBER() OVER (PARTITION BY c.id ORDER BY a.published_date DESC, a.id DESC) AS rn
+        FROM coins c
+        JOIN recent a
+          ON (c.name <> '' AND strpos(lower(a.title || ' ' || coalesce(a.summary, '')), lower(c.name)) > 0)
+          OR (c.symbol <> '' AND strpos(lower(a.title || ' ' || coalesce(a.summary, '')), lower(c.symbol)) > 0)
+        WHERE c.id = ANY(p_coin_ids)
+    ) ranked
+    WHERE ranked.rn <= p_limit
+    ORDER BY ranked.coin_id, ranked.rn;
+$$;
@@ -0,0 +1,57 @@
+-- Full-text search over article title + summary
+
+ALTER TABLE articles
+ADD COLUMN search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+) STORED;
+
+CREATE INDEX idx_articles_search_vector ON articles USING GIN (search_vector);
+
+-- Ranked, keyset-paginated search. Pass the rank and id of the last row of
+-- the previous page as p_after_rank / p_after_id to fetch the next page.
+-- p_coin_id restricts results to articles mentioning the coin's name or symbol.
+CREATE OR REPLACE FUNCTION search_articles(
+    q TEXT,
+    p_coin_id INTEGER DEFAULT NULL,
+    p_from TIMESTAMP DEFAULT NULL,
+    p_to TIMESTAMP DEFAULT NULL,
+    p_after_rank REAL DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    title TEXT,
+    summary TEXT,
+    link TEXT,
+    published_date TIMESTAMP,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', q) AS tsq
+    ),
+    coin_query AS (
+        SELECT phraseto_tsquery('english', c.name) || plainto_tsquery('english', c.symbol) AS tsq
+        FROM coins c
+        WHERE c.id = p_coin_id
+    ),
+    ranked AS (
+        SELECT a.id, a.title, a.summary, a.link, a.published_date,
+               ts_rank(a.search_vector, query.tsq) AS rank
+        FROM articles a, query
+        WHERE a.search_vector @@ query.tsq
+          AND (p_coin_id IS NULL OR a.search_vector @@ (SELECT tsq FROM coin_query))
+          AND (p_from IS NULL OR a.published_date >= p_from)
+          AND (p_to IS NULL OR a.published_date < p_to)
+    )
+    SELECT * FROM ranked
+    WHERE p_after_rank IS NULL
+       OR rank < p_after_rank
+       OR (rank = p_after_rank AND ranked.id < p_after_id)
+    ORDER BY rank DESC, id DESC
+    LIMIT p_limit;
+$$;
@@ -0,0 +1,63 @@
+-- Day-over-day and week-over-week changes in sentiment and mention volume,
+-- written by the pipeline alongside coin_sentiment. One row per coin, date,
+-- window (1 or 7 days) and metric ('sentiment' or 'mentions'); rows are only
+-- written when both ends of the window have a value.
+CREATE TABLE coin_sentiment_deltas (
+    id SERIAL PRIMARY KEY,
+    coin_id INTEGER REFERENCES coins(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    window_days INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    value FLOAT NOT NULL,
+    previous FLOAT NOT NULL,
+    delta FLOAT NOT NULL,
+    UNIQUE(coin_id, date, window_days, metric)
+);
+
+-- /api/movers reads the top or bottom N of one (metric, window, date) slice
+CREATE INDEX idx_coin_sentiment_deltas_movers ON coin_sentiment_deltas(metric, window_days, date, delta);
+
+-- Top N movers of the latest day for one metric and window. Each branch is a
+-- single range scan of idx_coin_sentiment_deltas_movers in delta order.
+CREATE OR REPLACE FUNCTION top_movers(
+    p_metric TEXT,
+    p_window_days INTEGER,
+    p_direction TEXT DEFAULT 'up',
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    coin_id INTEGER,
+    coingecko_id TEXT,
+    symbol TEXT,
+    name TEXT,
+    date DATE,
+    value FLOAT,
+    previous FLOAT,
+    delta FLOAT
+)
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    latest DATE;
+BEGIN
+    SELECT MAX(d.date) INTO latest
+    FROM coin_sentiment_deltas d
+    WHERE d.metric = p_metric AND d.window_days = p_window_days;
+
+    IF p_direction = 'down' THEN
+        RETURN QUERY
+        SELECT d.coin_id, c.coingecko_id, c.symbol, c.name, d.date, d.value, d.previous, d.delta
+        FROM coin_sentiment_deltas d JOIN coins c ON c.id = d.coin_id
+        WHERE d.metric = p_metric AND d.window_days = p_window_days AND d.date = latest
+        ORDER BY d.delta ASC
+        LIMIT p_limit;
+    ELSE
+        RETURN QUERY
+        SELECT d.coin_id, c.coingecko_id, c.symbol, c.name, d.date, d.value, d.previous, d.delta
+        FROM coin_sentiment_deltas d JOIN coins c ON c.id = d.coin_id
+        WHERE d.metric = p_metric AND d.window_days = p_window_days AND d.date = latest
+        ORDER BY d.delta DESC
+        LIMIT p_limit;
+    END IF;
+END;
+$$;
@@ -0,0 +1,68 @@
+-- Work items for distributed ingestion and backfill (cron_job.py --distributed).
+-- A batch (e.g. 'ingest:2025-09-26') holds one row per feed, backfill day or
+-- aggregation step. Workers lease rows with claim_work, extend the lease
+-- with heartbeat_work while they run, and mark them done with their result.
+-- A lease that is not renewed expires and the row can be claimed again.
+CREATE TABLE work_leases (
+    id SERIAL PRIMARY KEY,
+    batch TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result JSONB,
+    error TEXT,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(batch, kind, item)
+);
+
+CREATE INDEX idx_work_leases_claim ON work_leases(batch, status, lease_expires_at);
+
+-- Lease up to p_limit claimable items of a batch: pending ones and leased
+-- ones whose lease expired. SKIP LOCKED lets concurrent workers claim
+-- disjoint rows without waiting on each other.
+CREATE OR REPLACE FUNCTION claim_work(
+    p_batch TEXT,
+    p_owner TEXT,
+    p_lease_seconds INTEGER DEFAULT 300,
+    p_limit INTEGER DEFAULT 1,
+    p_max_attempts INTEGER DEFAULT 3
+)
+RETURNS SETOF work_leases
+LANGUAGE sql
+AS $$
+    UPDATE work_leases w
+    SET status = 'leased',
+        owner = p_owner,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = w.attempts + 1,
+        updated_at = NOW()
+    WHERE w.id IN (
+        SELECT id FROM work_leases
+        WHERE batch = p_batch
+          AND attempts < p_max_attempts
+          AND (status = 'pending' OR (status = 'leased' AND lease_expires_at < NOW()))
+        ORDER BY id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING w.*;
+$$;
+
+-- Extend the leases p_owner still holds; returns their ids
+CREATE OR REPLACE FUNCTION heartbeat_work(
+    p_ids INTEGER[],
+    p_owner TEXT,
+    p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS TABLE (id INTEGER)
+LANGUAGE sql
+AS $$
+    UPDATE work_leases w
+    SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        updated_at = NOW()
+    WHERE w.id = ANY(p_ids) AND w.owner = p_owner AND w.status = 'leased'
+    RETURNING w.id;
+$$;
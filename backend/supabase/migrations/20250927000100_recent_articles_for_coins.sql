@@ -0,0 +1,30 @@
+-- Latest p_limit articles for each of p_coin_ids in one pass over articles.
+-- An article belongs to a coin when its title or summary contains the coin's
+-- name or symbol (case-insensitive), as in get_recent_articles_for_coin.
+CREATE OR REPLACE FUNCTION recent_articles_for_coins(
+    p_coin_ids INTEGER[],
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    coin_id INTEGER,
+    id INTEGER,
+    title TEXT,
+    summary TEXT,
+    link TEXT,
+    published_date TIMESTAMP
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT ranked.coin_id, ranked.id, ranked.title, ranked.summary, ranked.link, ranked.published_date
+    FROM (
+        SELECT c.id AS coin_id, a.id, a.title, a.summary, a.link, a.published_date,
+               ROW_NUMBER() OVER (PARTITION BY c.id ORDER BY a.published_date DESC, a.id DESC) AS rn
+        FROM coins c
+        JOIN articles a
+          ON (c.name <> '' AND strpos(lower(a.title || ' ' || coalesce(a.summary, '')), lower(c.name)) > 0)
+          OR (c.symbol <> '' AND strpos(lower(a.title || ' ' || coalesce(a.summary, '')), lower(c.symbol)) > 0)
+        WHERE c.id = ANY(p_coin_ids)
+    ) ranked
+    WHERE ranked.rn <= p_limit
+    ORDER BY ranked.coin_id, ranked.rn;
+$$;
@@ -9,6 +9,11 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+# Backend modules import their siblings by bare name (e.g. `from database import Database`)
+BACKEND_ROOT = os.path.join(PROJECT_ROOT, "backend")
+if BACKEND_ROOT not in sys.path:
+    sys.path.append(BACKEND_ROOT)
+
 # Minimal fake supabase chainable query builder compatible with our Database usage
 class FakeQuery:
     def __init__(self, table_name, store):
@@ -20,6 +25,10 @@ class FakeQuery:
         self._insert = None
         self._order = []
         self._on_conflict = None
+        self._upsert = None
+        self._delete = False
+        self._limit = None
+        self._ignore_duplicates = False
 
     # Builders
     def select(self, fields="*"):
@@ -27,7 +36,27 @@ class FakeQuery:
         return self
 
     def eq(self, key, value):
-        self._filters.append((key, value))
+        self._filters.append((key, "eq", value))
+        return self
+
+    def gt(self, key, value):
+        self._filters.append((key, "gt", value))
+        return self
+
+    def gte(self, key, value):
+        self._filters.append((key, "gte", value))
+        return self
+
+    def lt(self, key, value):
+        self._filters.append((key, "lt", value))
+        return self
+
+    def lte(self, key, value):
+        self._filters.append((key, "lte", value))
+        return self
+
+    def in_(self, key, values):
+        self._filters.append((key, "in", list(values)))
         return self
 
     def update(self, payload):
@@ -38,10 +67,24 @@ class FakeQuery:
         self._insert = payload
         return self
 
+    def upsert(self, payload, on_conflict="", ignore_duplicates=False):
+        self._upsert = payload
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def delete(self):
+        self._delete = True
+        return self
+
     def order(self, key, desc=False):
         self._order.append((key, desc))
         return self
 
+    def limit(self, size):
+        self._limit = size
+        return self
+
     def on_conflict(self, key):
         self._on_conflict = key
         return self
@@ -51,16 +94,63 @@ class FakeQuery:
         table = self.store.setdefault(self.table_name, [])
 
         def match(row):
-            for k, v in self._filters:
-                if row.get(k) != v:
+            for k, op, v in self._filters:
+                value = row.get(k)
+                if op == "eq" and value != v:
+                    return False
+                if op == "in" and value not in v:
                     return False
+                if op in ("gt", "gte", "lt", "lte"):
+                    if value is None:
+                        return False
+                    if op == "gt" and not value > v:
+                        return False
+                    if op == "gte" and not value >= v:
+                        return False
+                    if op == "lt" and not value < v:
+                        return False
+                    if op == "lte" and not value <= v:
+                        return False
             return True
 
         # Handle select
-        if self._select is not None and self._update is None and self._insert is None:
+        if self._select is not None and self._update is None and self._insert is None and self._upsert is None and not self._delete:
             rows = [r for r in table if match(r)]
+            for key, desc in reversed(self._order):
+                rows.sort(key=lambda r: (r.get(key) is not None, r.get(key)), reverse=desc)
+            if self._limit is not None:
+                rows = rows[: self._limit]
             return types.SimpleNamespace(data=rows)
 
+        # Handle delete
+        if self._delete:
+            deleted = [r for r in table if match(r)]
+            table[:] = [r for r in table if not match(r)]
+            return types.SimpleNamespace(data=deleted)
+
+        # Handle upsert keyed on the comma separated on_conflict columns
+        if self._upsert is not None:
+            payload = self._upsert if isinstance(self._upsert, list) else [self._upsert]
+            keys = [k.strip() for k in self._on_conflict.split(",") if k.strip()]
+            written = []
+            for item in payload:
+                existing = None
+                for r in table:
+                    if keys and all(r.get(k) == item.get(k) for k in keys):
+                        existing = r
+                        break
+                if existing is not None:
+                    if self._ignore_duplicates:
+                        continue
+                    existing.update(item)
+                    written.append(existing)
+                else:
+                    new_row = item.copy()
+                    new_row.setdefault("id", max((r["id"] for r in table), default=0) + 1)
+                    table.append(new_row)
+                    written.append(new_row)
+            return types.SimpleNamespace(data=written)
+
         # Handle update
         if self._update is not None:
             updated = []
@@ -85,7 +175,15 @@ class FakeQuery:
                             return types.SimpleNamespace(data=[r])
                 table.append(new_row)
                 return types.SimpleNamespace(data=[new_row])
-            raise ValueError("Only single-row insert supported in FakeQuery")
+            if isinstance(payload, list):
+                inserted = []
+                for item in payload:
+                    new_row = item.copy()
+                    new_row.setdefault("id", max((r["id"] for r in table), default=0) + 1)
+                    table.append(new_row)
+                    inserted.append(new_row)
+                return types.SimpleNamespace(data=inserted)
+            raise ValueError("Unsupported insert payload in FakeQuery")
 
         return types.SimpleNamespace(data=[])
 
@@ -97,6 +195,25 @@ class FakeSupabaseClient:
     def table(self, name):
         return FakeQuery(name, self.store)
 
+    def rpc(self, name, params):
+        # Records the call; tests seed canned rows under "rpc:<name>"
+        self.store.setdefault("rpc_calls", []).append((name, params))
+        rows = self.store.get(f"rpc:{name}", [])
+        return types.SimpleNamespace(execute=lambda: types.SimpleNamespace(data=rows[: params.get("p_limit", len(rows))]))
+
+
+@pytest.fixture(autouse=True)
+def fresh_api_caches():
+    """Tests swap main.db; results cached from another test's database must not be served"""
+    def reset():
+        # benchmarks import the API as bare `main`, tests as backend.main
+        for name in ("backend.main", "main"):
+            if name in sys.modules:
+                sys.modules[name].reset_caches()
+    reset()
+    yield
+    reset()
+
 
 @pytest.fixture(autouse=True)
 def supabase_env(monkeypatch):
@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+import math
+
+import httpx
+import numpy as np
+import pytest
+
+from backend.analytics import DailyHistory, correlation_report, rolling_correlation
+from backend.local_database import LocalDatabase
+
+
+def naive_corr(xs, ys):
+    pairs = [(x, y) for x, y in zip(xs, ys) if not (math.isnan(x) or math.isnan(y))]
+    n = len(pairs)
+    mx = sum(p[0] for p in pairs) / n
+    my = sum(p[1] for p in pairs) / n
+    cov = sum((x - mx) * (y - my) for x, y in pairs)
+    vx = sum((x - mx) ** 2 for x, _ in pairs)
+    vy = sum((y - my) ** 2 for _, y in pairs)
+    return cov / math.sqrt(vx * vy)
+
+
+def test_rolling_correlation_matches_naive_pearson_and_skips_gaps():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(3, 40))
+    y = 0.5 * x + rng.normal(size=(3, 40))
+    x[1, 5] = np.nan
+    y[2, 20] = np.nan
+
+    corr, obs = rolling_correlation(x, y, window=10)
+
+    assert corr.shape == (3, 31)
+    for row in range(3):
+        for end in (9, 25, 39):
+            expected = naive_corr(x[row, end - 9:end + 1], y[row, end - 9:end + 1])
+            assert corr[row, end - 9] == pytest.approx(expected)
+    assert obs[1, 0] == 9
+    assert obs[0, 0] == 10
+
+
+def test_rolling_correlation_is_nan_without_enough_pairs_or_variance():
+    x = np.array([[1.0, np.nan, np.nan, np.nan, 2.0], [1.0, 1.0, 1.0, 1.0, 1.0]])
+    y = np.array([[1.0, 2.0, 3.0, 4.0, 5.0], [1.0, 2.0, 3.0, 4.0, 5.0]])
+    corr, _ = rolling_correlation(x, y, window=5)
+    assert np.isnan(corr).all()
+
+
+def build_history(days=30):
+    coins = [{"id": 1, "symbol": "BTC", "name": "Bitcoin"}, {"id": 2, "symbol": "ETH", "name": "Ethereum"}]
+    start = date(2024, 1, 1)
+    rng = np.random.default_rng(3)
+    sentiment = rng.uniform(-1, 1, size=days)
+    prices, sentiment_rows = [], []
+    btc, eth = 100.0, 100.0
+    for i in range(days):
+        day = start + timedelta(days=i)
+        # BTC moves with the previous day's sentiment, ETH ignores it
+        if i:
+            btc *= 1 + 0.05 * sentiment[i - 1]
+            eth *= 1 + 0.05 * rng.uniform(-1, 1)
+        prices += [{"coin_id": 1, "date": day.isoformat(), "price_usd": btc}, {"coin_id": 2, "date": day.isoformat(), "price_usd": eth}]
+        sentiment_rows += [{"coin_id": 1, "date": day.isoformat(), "sentiment_score": sentiment[i]},
+                           {"coin_id": 2, "date": day.isoformat(), "sentiment_score": sentiment[i]}]
+    return DailyHistory.from_rows(coins, prices, sentiment_rows, days=days)
+
+
+def test_report_finds_lagged_relationship():
+    history = build_history()
+    report = correlation_report(history, [7, 14], max_lag=2)
+
+    assert report["as_of"] == "2024-01-30"
+    btc, eth = report["coins"]
+    assert btc["lagged"]["1"] == pytest.approx(1.0)
+    assert abs(eth["lagged"]["1"]) < 0.5
+    assert btc["observations"] == {"7": 7, "14": 14}
+    assert "series" not in btc
+
+    single = correlation_report(history, [7], max_lag=0, coin_id=1)
+    assert len(single["coins"]) == 1
+    series = single["coins"][0]["series"]
+    assert len(series) == 30
+    assert "7" not in series[5] and "7" in series[6]
+
+
+@pytest.mark.asyncio
+async def test_correlation_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "api.db"))
+    from backend import main
+
+    db = LocalDatabase(str(tmp_path / "pipeline.db"))
+    coin_id = await db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    today = date.today()
+    await db.upsert_coin_prices([{"coin_id": coin_id, "date": today - timedelta(days=i), "price_usd": 100.0 + i * (-1) ** i, "market_cap": 1e9} for i in range(20)])
+    await db.upsert_coin_sentiments([{"coin_id": coin_id, "date": today - timedelta(days=i), "sentiment_score": 0.1 * (i % 5), "mentions_count": 1, "no_mentions": False} for i in range(20)])
+    monkeypatch.setattr(main, "db", db)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        report = (await client.get("/api/analytics/correlation?windows=7,14")).json()
+        single = await client.get(f"/api/analytics/correlation?windows=7&coin_id={coin_id}")
+        assert (await client.get("/api/analytics/correlation?windows=2")).status_code == 400
+        assert (await client.get("/api/analytics/correlation?windows=a")).status_code == 400
+        assert (await client.get("/api/analytics/correlation?coin_id=999")).status_code == 404
+    db.close()
+
+    assert report["as_of"] == today.isoformat()
+    assert report["windows"] == [7, 14]
+    assert report["coins"][0]["observations"] == {"7": 7, "14": 14}
+    assert report["coins"][0]["correlation"]["7"] is not None
+    assert single.status_code == 200
+    assert single.json()["coins"][0]["series"][-1]["date"] == today.isoformat()
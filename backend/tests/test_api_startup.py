@@ -0,0 +1,5 @@
+from backend.benchmarks.import_budget import loaded_forbidden_modules
+
+
+def test_api_startup_skips_supabase_sdk_and_ingestion_modules():
+    assert loaded_forbidden_modules() == []
@@ -0,0 +1,119 @@
+import json
+from datetime import date
+import pytest
+
+from backend.backfill import run_backfill, score_articles, build_sentiment_rows
+from backend.database import Database
+from backend.sentiment_analyzer import SentimentAnalyzer
+
+
+COINS = [
+    {"id": 1, "coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin"},
+    {"id": 2, "coingecko_id": "ethereum", "symbol": "ETH", "name": "Ethereum"},
+]
+
+
+def seed(store):
+    store.setdefault("coins", []).extend(dict(c) for c in COINS)
+    store.setdefault("articles", []).extend([
+        {"id": 1, "title": "Bitcoin rallies to a great new high", "summary": "", "link": "u1", "published_date": "2024-01-01T08:00:00+00:00"},
+        {"id": 2, "title": "BTC crash wipes out terrible leverage", "summary": "", "link": "u2", "published_date": "2024-01-01T12:00:00+00:00"},
+        {"id": 3, "title": "Ethereum upgrade is a success", "summary": "", "link": "u3", "published_date": "2024-01-01T18:00:00+00:00"},
+        {"id": 4, "title": "Bitcoin and ETH steady", "summary": "", "link": "u4", "published_date": "2024-01-02T09:00:00+00:00"},
+    ])
+
+
+def test_score_articles_matches_daily_analyzer():
+    analyzer = SentimentAnalyzer()
+    articles = [
+        {"title": "Bitcoin is great, BTC to the moon", "summary": ""},
+        {"title": "Ethereum disappoints", "summary": "bad week for ETH"},
+    ]
+
+    totals = score_articles(articles, COINS, analyzer)
+    rows = build_sentiment_rows(totals, COINS, date(2024, 1, 1))
+    expected = analyzer.analyze_articles_for_coins(articles, COINS, date(2024, 1, 1))
+
+    for row in rows:
+        assert row["mentions_count"] == expected[row["coin_id"]]["total_mentions"]
+        assert row["sentiment_score"] == pytest.approx(expected[row["coin_id"]]["sentiment_score"])
+
+
+@pytest.mark.asyncio
+async def test_run_backfill_writes_one_row_per_coin_and_day(fake_supabase, tmp_path):
+    seed(fake_supabase)
+    db = Database()
+    checkpoint = tmp_path / "checkpoint.json"
+
+    await run_backfill(date(2024, 1, 1), date(2024, 1, 3), db=db, checkpoint_path=str(checkpoint), workers=1, page_size=2)
+
+    rows = {(r["coin_id"], r["date"]): r for r in fake_supabase["coin_sentiment"]}
+    assert len(rows) == 6
+    assert rows[(1, "2024-01-01")]["mentions_count"] == 2
+    assert rows[(2, "2024-01-01")]["mentions_count"] == 1
+    assert rows[(1, "2024-01-03")]["no_mentions"] is True
+    assert rows[(1, "2024-01-03")]["sentiment_score"] is None
+    # Finished backfills clean up after themselves
+    assert not checkpoint.exists()
+
+
+class FlakyDatabase:
+    """Wraps a Database and fails once after a number of article pages"""
+
+    def __init__(self, db, fail_after_pages):
+        self.db = db
+        self.pages = 0
+        self.fail_after_pages = fail_after_pages
+
+    async def get_all_coins(self):
+        return await self.db.get_all_coins()
+
+    async def get_articles_page(self, *args, **kwargs):
+        self.pages += 1
+        if self.pages > self.fail_after_pages:
+            raise RuntimeError("connection dropped")
+        return await self.db.get_articles_page(*args, **kwargs)
+
+    async def upsert_coin_sentiments(self, rows):
+        return await self.db.upsert_coin_sentiments(rows)
+
+    async def get_sentiment_rows(self, *args, **kwargs):
+        return await self.db.get_sentiment_rows(*args, **kwargs)
+
+    async def upsert_sentiment_deltas(self, rows):
+        return await self.db.upsert_sentiment_deltas(rows)
+
+    async def delete_sentiment_deltas(self, delta_date):
+        return await self.db.delete_sentiment_deltas(delta_date)
+
+
+@pytest.mark.asyncio
+async def test_run_backfill_resumes_from_checkpoint(fake_supabase, tmp_path):
+    seed(fake_supabase)
+    db = Database()
+    checkpoint = tmp_path / "checkpoint.json"
+
+    flaky = FlakyDatabase(db, fail_after_pages=2)
+    with pytest.raises(RuntimeError):
+        await run_backfill(date(2024, 1, 1), date(2024, 1, 2), db=flaky, checkpoint_path=str(checkpoint), workers=1, page_size=1)
+
+    state = json.loads(checkpoint.read_text())
+    assert state["completed_dates"] == []
+    assert state["current"]["date"] == "2024-01-01"
+    assert state["current"]["last_id"] == 2
+
+    resumed = FlakyDatabase(db, fail_after_pages=100)
+    await run_backfill(date(2024, 1, 1), date(2024, 1, 2), db=resumed, checkpoint_path=str(checkpoint), workers=1, page_size=1)
+
+    # Resuming only reads the articles after the checkpointed id
+    assert resumed.pages == 4
+    rows = {(r["coin_id"], r["date"]): r for r in fake_supabase["coin_sentiment"]}
+    assert rows[(1, "2024-01-01")]["mentions_count"] == 2
+    assert rows[(2, "2024-01-02")]["mentions_count"] == 1
+    assert not checkpoint.exists()
+
+
+@pytest.mark.asyncio
+async def test_run_backfill_rejects_reversed_range(fake_supabase, tmp_path):
+    with pytest.raises(ValueError):
+        await run_backfill(date(2024, 1, 2), date(2024, 1, 1), db=Database(), checkpoint_path=str(tmp_path / "c.json"), workers=1)
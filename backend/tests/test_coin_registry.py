@@ -0,0 +1,80 @@
+import pytest
+
+from backend.coin_registry import CoinRegistry
+from backend.database import Database
+
+
+class CountingDatabase:
+    """Records which write methods the registry calls on a real Database"""
+
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    async def get_all_coins(self):
+        return await self.db.get_all_coins()
+
+    async def insert_coins(self, coins):
+        if coins:
+            self.writes.append(("insert", [c["coingecko_id"] for c in coins]))
+        return await self.db.insert_coins(coins)
+
+    async def update_coin(self, coin_id, symbol, name):
+        self.writes.append(("update", coin_id))
+        return await self.db.update_coin(coin_id, symbol, name)
+
+
+INCOMING = [
+    {"coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin"},
+    {"coingecko_id": "ethereum", "symbol": "ETH", "name": "Ethereum"},
+]
+
+
+@pytest.mark.asyncio
+async def test_sync_inserts_only_new_coins_and_maps_ids(fake_supabase):
+    fake_supabase["coins"] = [{"id": 7, "coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin"}]
+    db = CountingDatabase(Database())
+    registry = CoinRegistry()
+    await registry.load(db)
+
+    coin_ids_map = await registry.sync(db, INCOMING)
+
+    assert db.writes == [("insert", ["ethereum"])]
+    assert coin_ids_map["bitcoin"]["id"] == 7
+    assert coin_ids_map["ethereum"]["id"] == 8
+    assert len(fake_supabase["coins"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_steady_state_makes_no_writes(fake_supabase):
+    db = CountingDatabase(Database())
+    registry = CoinRegistry()
+    await registry.load(db)
+    await registry.sync(db, INCOMING)
+    db.writes.clear()
+
+    # Next run: a fresh registry loads what the previous run stored
+    registry = CoinRegistry()
+    await registry.load(db)
+    coin_ids_map = await registry.sync(db, INCOMING)
+
+    assert db.writes == []
+    assert set(coin_ids_map) == {"bitcoin", "ethereum"}
+
+
+@pytest.mark.asyncio
+async def test_sync_updates_changed_metadata(fake_supabase):
+    fake_supabase["coins"] = [{"id": 1, "coingecko_id": "bitcoin", "symbol": "XBT", "name": "Bitcoin"}]
+    db = CountingDatabase(Database())
+    registry = CoinRegistry()
+    await registry.load(db)
+
+    coin_ids_map = await registry.sync(db, INCOMING[:1])
+
+    assert db.writes == [("update", 1)]
+    assert fake_supabase["coins"][0]["symbol"] == "BTC"
+    assert coin_ids_map["bitcoin"]["symbol"] == "BTC"
+    # The registry is now in sync, so repeating the run writes nothing
+    db.writes.clear()
+    await registry.sync(db, INCOMING[:1])
+    assert db.writes == []
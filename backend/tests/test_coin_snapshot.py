@@ -0,0 +1,98 @@
+from datetime import date
+import json
+import os
+
+import httpx
+import pytest
+
+from backend.coin_snapshot import CoinSnapshotReader, publish_snapshot, write_snapshot
+from backend.local_database import LocalDatabase
+
+
+COINS = [
+    {"coin_id": 2, "coingecko_id": "ethereum", "symbol": "ETH", "name": "Ethereum", "price_usd": 2200.0},
+    {"coin_id": 1, "coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "price_usd": 42000.0},
+]
+DETAILS = {
+    1: {"coin": {"id": 1, "coingecko_id": "bitcoin"}, "recent_prices": [{"date": "2024-01-01", "price_usd": 42000.0}], "recent_sentiment": []},
+    2: {"coin": {"id": 2, "coingecko_id": "ethereum"}, "recent_prices": [], "recent_sentiment": []},
+}
+
+
+def test_snapshot_round_trips_ranked_table_and_details(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    version = write_snapshot(path, COINS, DETAILS, version=7)
+
+    reader = CoinSnapshotReader(path)
+    assert version == 7
+    assert reader.snapshot().version == 7
+    assert json.loads(reader.coins_json()) == COINS
+    assert json.loads(reader.coin_json(1)) == DETAILS[1]
+    assert reader.coin_json(3) is None
+    assert os.listdir(tmp_path) == ["snapshot.bin"]
+
+
+def test_concurrent_writers_never_publish_a_mixed_file(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = str(tmp_path / "snapshot.bin")
+    big = {coin_id: {"coin": {"id": coin_id}, "recent_prices": [{"price_usd": coin_id}] * 200} for coin_id in range(50)}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda v: write_snapshot(path, COINS, big, version=v), range(1, 21)))
+
+    reader = CoinSnapshotReader(path)
+    assert reader.snapshot().version in range(1, 21)
+    assert json.loads(reader.coin_json(49)) == big[49]
+    assert os.listdir(tmp_path) == ["snapshot.bin"]
+
+
+def test_reader_follows_atomic_swaps_and_ignores_bad_or_stale_files(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    reader = CoinSnapshotReader(path, check_interval=0)
+    assert reader.coins_json() is None
+
+    write_snapshot(path, COINS, DETAILS, version=1)
+    old = reader.snapshot()
+    write_snapshot(path, COINS[:1], {2: DETAILS[2]}, version=2)
+
+    assert reader.snapshot().version == 2
+    assert json.loads(reader.coins_json()) == COINS[:1]
+    # A worker still holding the previous map keeps reading it intact
+    assert json.loads(old.coins_json()) == COINS
+
+    with open(path, "wb") as f:
+        f.write(b"not a snapshot at all, just some bytes")
+    assert reader.coins_json() is None
+
+    stale = CoinSnapshotReader(path, max_age=0)
+    write_snapshot(path, COINS, DETAILS)
+    assert stale.coins_json() is None
+
+
+@pytest.mark.asyncio
+async def test_api_serves_published_snapshot_without_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "api.db"))
+    from backend import main
+
+    db = LocalDatabase(str(tmp_path / "pipeline.db"))
+    coin_id = await db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    await db.insert_coin_price(coin_id, date(2024, 1, 1), 42000.0, 8e11)
+    path = str(tmp_path / "snapshot.bin")
+    await publish_snapshot(db, path)
+    db.close()
+
+    class NoDatabase:
+        def __getattr__(self, name):
+            raise AssertionError(f"database was queried: {name}")
+
+    monkeypatch.setattr(main, "db", NoDatabase())
+    monkeypatch.setattr(main, "coin_snapshot", CoinSnapshotReader(path))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        coins = (await client.get("/api/coins")).json()
+        details = (await client.get(f"/api/coins/{coin_id}")).json()
+
+    assert [c["coingecko_id"] for c in coins] == ["bitcoin"]
+    assert coins[0]["price_usd"] == 42000.0
+    assert details["recent_prices"] == [{"date": "2024-01-01", "price_usd": 42000.0, "market_cap": 8e11}]
+    assert await main.fetch_formatted_coins() == coins
@@ -1,5 +1,8 @@
+import asyncio
+import httpx
+import pytest
 import requests
-from backend.coingecko_client import CoinGeckoClient
+from backend.coingecko_client import CoinGeckoClient, AsyncCoinGeckoClient, ResponseCache, TokenBucket
 
 
 def test_get_top_coins_success_and_params(monkeypatch):
@@ -113,5 +116,138 @@ def test_rate_limit_delay(monkeypatch):
     assert called["seconds"] == 1.2
 
 
+def test_get_top_coins_pages_past_250(monkeypatch):
+    client = CoinGeckoClient()
+    pages = []
+
+    def fake_get(url, params=None):
+        pages.append(params["page"])
+
+        class Resp:
+            def raise_for_status(self):
+                return None
+
+            def json(self):
+                return [make_market_coin(f"{params['page']}-{i}") for i in range(params["per_page"])]
+
+        return Resp()
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+    monkeypatch.setattr(client, "rate_limit_delay", lambda: None)
+
+    coins = client.get_top_coins(limit=300)
+
+    assert pages == [1, 2]
+    assert len(coins) == 300
+
+
+def make_market_coin(coin_id):
+    return {
+        "id": coin_id,
+        "symbol": coin_id[:3],
+        "name": coin_id.title(),
+        "current_price": 1.0,
+        "market_cap": 2.0,
+        "last_updated": "2024-01-01T00:00:00Z",
+    }
+
+
+def market_handler(calls, fail_first_with_429=False):
+    def handler(request):
+        page = int(request.url.params["page"])
+        per_page = int(request.url.params["per_page"])
+        calls.append(page)
+        if fail_first_with_429 and calls.count(page) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json=[make_market_coin(f"coin-{page}-{i}") for i in range(per_page)])
+    return handler
+
+
+def make_async_client(handler, tmp_path, ttl=60):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = ResponseCache(directory=str(tmp_path), ttl=ttl)
+    return AsyncCoinGeckoClient(requests_per_minute=6000, burst=10, cache=cache, http_client=http_client)
+
+
+@pytest.mark.asyncio
+async def test_async_get_top_coins_fetches_pages_concurrently(tmp_path):
+    calls = []
+    client = make_async_client(market_handler(calls), tmp_path, ttl=0)
+
+    coins = await client.get_top_coins(limit=600)
+    await client.aclose()
+
+    assert sorted(calls) == [1, 2, 3]
+    assert len(coins) == 600
+    assert coins[0]["coingecko_id"] == "coin-1-0"
+    assert coins[250]["coingecko_id"] == "coin-2-0"
+
+
+@pytest.mark.asyncio
+async def test_async_get_top_coins_retries_on_429(tmp_path):
+    calls = []
+    client = make_async_client(market_handler(calls, fail_first_with_429=True), tmp_path, ttl=0)
+
+    coins = await client.get_top_coins(limit=5)
+    await client.aclose()
+
+    assert calls == [1, 1]
+    assert len(coins) == 5
+
+
+@pytest.mark.asyncio
+async def test_async_get_top_coins_reuses_cached_snapshot(tmp_path):
+    calls = []
+    first = make_async_client(market_handler(calls), tmp_path)
+    await first.get_top_coins(limit=10)
+    await first.aclose()
+
+    # A second client (e.g. another process) sharing the cache directory
+    second = make_async_client(market_handler(calls), tmp_path)
+    coins = await second.get_top_coins(limit=10)
+    await second.aclose()
+
+    assert calls == [1]
+    assert len(coins) == 10
+
+
+@pytest.mark.asyncio
+async def test_non_positive_limits_return_empty_without_requests(tmp_path, monkeypatch):
+    calls = []
+    client = make_async_client(market_handler(calls), tmp_path, ttl=0)
+    assert await client.get_top_coins(limit=0) == []
+    assert await client.get_top_coins(limit=-5) == []
+    await client.aclose()
+
+    sync_client = CoinGeckoClient()
+    monkeypatch.setattr(sync_client.session, "get", lambda *a, **k: calls.append("sync"))
+    assert sync_client.get_top_coins(limit=0) == []
+    assert sync_client.get_top_coins(limit=-5) == []
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_async_get_top_coins_http_error_returns_empty(tmp_path):
+    client = make_async_client(lambda request: httpx.Response(500), tmp_path, ttl=0)
+
+    assert await client.get_top_coins(limit=5) == []
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_burst(monkeypatch):
+    bucket = TokenBucket(rate=1000, capacity=2)
+    slept = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        await real_sleep(0)
 
+    monkeypatch.setattr("backend.coingecko_client.asyncio.sleep", fake_sleep)
 
+    await bucket.acquire()
+    await bucket.acquire()
+    assert slept == []
+    await bucket.acquire()
+    assert slept
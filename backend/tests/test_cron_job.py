@@ -0,0 +1,73 @@
+from datetime import date, datetime, timezone
+
+import httpx
+import pytest
+
+from backend import cron_job
+from backend.local_database import LocalDatabase
+
+RUN_AT = datetime(2025, 9, 25, 6, 0, tzinfo=timezone.utc)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return RUN_AT if tz else RUN_AT.replace(tzinfo=None)
+
+
+class FakeCoinGecko:
+    def __init__(self, api_key=None):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_daily_run_at_six_utc_publishes_the_completed_day(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "cron.db")
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", db_path)
+    monkeypatch.setenv("FEED_HEALTH_PATH", str(tmp_path / "health.json"))
+    monkeypatch.setenv("NEAR_DUP_INDEX_PATH", str(tmp_path / "near_duplicates.json"))
+    monkeypatch.delenv("COIN_SNAPSHOT_PATH", raising=False)
+
+    async def fake_top_coins(client, limit=100):
+        return [
+            {"coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "price_usd": 115000.0, "market_cap": 2.2e12},
+            {"coingecko_id": "ethereum", "symbol": "ETH", "name": "Ethereum", "price_usd": 4100.0, "market_cap": 5e11},
+        ]
+
+    async def fake_articles(scheduler, sources, max_feeds=None):
+        return [
+            {"title": "Bitcoin rally is great news", "summary": "", "link": "u1",
+             "published_date": datetime(2025, 9, 24, 10, tzinfo=timezone.utc)},
+            {"title": "Bitcoin miners upbeat", "summary": "", "link": "u2",
+             "published_date": datetime(2025, 9, 24, 22, tzinfo=timezone.utc)},
+            {"title": "Ethereum fees are terrible", "summary": "", "link": "u3",
+             "published_date": datetime(2025, 9, 25, 5, tzinfo=timezone.utc)},
+        ]
+
+    monkeypatch.setattr(cron_job, "datetime", FrozenDatetime)
+    monkeypatch.setattr(cron_job, "AsyncCoinGeckoClient", FakeCoinGecko)
+    monkeypatch.setattr(cron_job, "fetch_top_coins", fake_top_coins)
+    monkeypatch.setattr(cron_job, "fetch_source_articles", fake_articles)
+    monkeypatch.setattr(cron_job, "load_sources", lambda: [])
+
+    await cron_job.run_daily_update()
+
+    from backend import main
+    db = LocalDatabase(db_path)
+    monkeypatch.setattr(main, "db", db)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        coins = {c["coingecko_id"]: c for c in (await client.get("/api/coins")).json()}
+
+    # The dashboard shows all of the 24th, not the six hours of the 25th seen so far
+    assert coins["bitcoin"]["mentions_count"] == 2
+    assert coins["ethereum"]["no_mentions"] is True
+    assert await db.get_sentiment_rows([date(2025, 9, 25)]) == []
+    assert {r["date"] for r in await db.get_sentiment_rows([date(2025, 9, 24)])} == {"2025-09-24"}
+    db.close()
@@ -74,6 +74,23 @@ async def test_insert_article_respects_on_conflict_link(fake_supabase):
     assert first_id == second_id == articles[0]["id"]
 
 
+@pytest.mark.asyncio
+async def test_insert_articles_upserts_in_batches_ignoring_known_links(fake_supabase):
+    db = Database()
+    published = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    first_id = await db.insert_article("Title", "Summary", "u1", published)
+
+    written = await db.insert_articles([
+        {"title": f"Title {i}", "summary": "", "link": f"u{i}", "published_date": published}
+        for i in range(1, 4)
+    ], batch_size=2)
+
+    articles = fake_supabase["articles"]
+    assert written == 3
+    assert [a["link"] for a in articles] == ["u1", "u2", "u3"]
+    assert articles[0]["id"] == first_id and articles[0]["title"] == "Title"
+
+
 @pytest.mark.asyncio
 async def test_insert_coin_sentiment_insert_then_update(fake_supabase):
     db = Database()
@@ -151,3 +168,118 @@ async def test_get_recent_articles_for_coin_filters_by_name_and_symbol_and_limit
     # No coin -> empty
     empty = await db.get_recent_articles_for_coin(coin_id=999, limit=10)
     assert empty == []
+
+
+@pytest.mark.asyncio
+async def test_get_recent_articles_for_coins_groups_rpc_rows(fake_supabase):
+    db = Database()
+    fake_supabase["rpc:recent_articles_for_coins"] = [
+        {"coin_id": 1, "id": 5, "title": "BTC whales move", "summary": "", "link": "u5", "published_date": "2024-01-06T00:00:00Z"},
+        {"coin_id": 1, "id": 4, "title": "Bitcoin falls", "summary": "", "link": "u4", "published_date": "2024-01-05T00:00:00Z"},
+        {"coin_id": 2, "id": 3, "title": "ETH upgrade", "summary": "", "link": "u3", "published_date": "2024-01-04T00:00:00Z"},
+    ]
+
+    since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    grouped = await db.get_recent_articles_for_coins([1, 2, 3], limit=3, since=since)
+    assert fake_supabase["rpc_calls"][-1] == (
+        "recent_articles_for_coins",
+        {"p_coin_ids": [1, 2, 3], "p_limit": 3, "p_since": "2024-01-01T00:00:00+00:00"},
+    )
+    assert [a["id"] for a in grouped[1]] == [5, 4]
+    assert grouped[2][0] == {"id": 3, "title": "ETH upgrade", "summary": "", "link": "u3", "published_date": "2024-01-04T00:00:00Z"}
+    assert grouped[3] == []
+    assert await db.get_recent_articles_for_coins([]) == {}
+
+
+@pytest.mark.asyncio
+async def test_get_recent_articles_for_coins_defaults_to_a_recent_window(fake_supabase, monkeypatch):
+    monkeypatch.setenv("RECENT_ARTICLES_DAYS", "7")
+    db = Database()
+    fake_supabase["rpc:recent_articles_for_coins"] = []
+
+    before = datetime.now(timezone.utc)
+    await db.get_recent_articles_for_coins([1])
+
+    since = datetime.fromisoformat(fake_supabase["rpc_calls"][-1][1]["p_since"])
+    assert abs((before - since).total_seconds() - 7 * 86400) < 60
+
+
+@pytest.mark.asyncio
+async def test_search_articles_calls_rpc_and_builds_cursor(fake_supabase):
+    db = Database()
+    fake_supabase["rpc:search_articles"] = [
+        {"id": 9, "title": "a", "rank": 0.5},
+        {"id": 7, "title": "b", "rank": 0.25},
+        {"id": 3, "title": "c", "rank": 0.25},
+    ]
+
+    page = await db.search_articles("etf approval", coin_id=1, limit=2)
+
+    assert [r["id"] for r in page["results"]] == [9, 7]
+    assert page["next_cursor"] == "0.25:7"
+    name, params = fake_supabase["rpc_calls"][0]
+    assert name == "search_articles"
+    assert params["q"] == "etf approval"
+    assert params["p_coin_id"] == 1
+    assert params["p_limit"] == 3
+    assert params["p_after_rank"] is None
+
+    await db.search_articles("etf approval", cursor=page["next_cursor"], limit=2)
+    _, params = fake_supabase["rpc_calls"][1]
+    assert (params["p_after_rank"], params["p_after_id"]) == (0.25, 7)
+
+
+def test_http_client_is_pooled_http2_with_timeouts(monkeypatch):
+    from backend.database import build_http_client
+
+    monkeypatch.setenv("SUPABASE_MAX_CONNECTIONS", "4")
+    monkeypatch.setenv("SUPABASE_TIMEOUT", "7")
+    client = build_http_client()
+    try:
+        pool = client._transport._pool
+        assert pool._http2 is True
+        assert pool._max_connections == 4
+        assert pool._max_keepalive_connections == 4
+        assert client.timeout.read == 7.0
+        assert client.timeout.connect == 5.0
+    finally:
+        client.close()
+
+
+def test_create_client_hands_the_shared_http_client_to_supabase(monkeypatch):
+    import supabase
+    from backend.database import create_client
+
+    captured = {}
+
+    def fake_supabase_create_client(url, key, options=None):
+        captured["options"] = options
+        return object()
+
+    monkeypatch.setattr(supabase, "create_client", fake_supabase_create_client)
+    create_client("https://example.supabase.co", "key")
+
+    http_client = captured["options"].httpx_client
+    assert http_client is not None
+    http_client.close()
+
+
+@pytest.mark.asyncio
+async def test_queries_run_on_the_bounded_executor(fake_supabase, monkeypatch):
+    import threading
+
+    monkeypatch.setenv("SUPABASE_MAX_CONCURRENCY", "2")
+    db = Database()
+    threads = set()
+    original_table = db.supabase.table
+
+    def recording_table(name):
+        threads.add(threading.current_thread().name)
+        return original_table(name)
+
+    db.supabase.table = recording_table
+    await asyncio.gather(*(db.get_all_coins() for _ in range(8)), db.get_latest_coin_data())
+    db.close()
+
+    assert db._executor._max_workers == 2
+    assert threads and all(name.startswith("supabase") for name in threads)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+import json
+
+from backend.dedup import NearDuplicateIndex, minhash, normalize, similarity
+
+
+STORY = (
+    "Bitcoin climbed above $70,000 on Tuesday as spot ETF inflows accelerated, "
+    "with analysts pointing to renewed institutional demand and shrinking exchange reserves."
+)
+
+
+def test_normalize_strips_markup_and_punctuation():
+    assert normalize("<p>Bitcoin  <b>SURGES</b>!</p>\n") == "bitcoin surges"
+
+
+def test_minhash_similarity_is_high_for_light_edits_and_low_for_other_stories():
+    edited = STORY.replace("Tuesday", "Tuesday morning") + " The post appeared first on Example News."
+    other = "Ethereum developers scheduled the next network upgrade for the second quarter after a testnet delay."
+
+    base = minhash(normalize(STORY))
+    assert similarity(base, minhash(normalize(STORY))) == 1.0
+    assert similarity(base, minhash(normalize(edited))) >= 0.5
+    assert similarity(base, minhash(normalize(other))) < 0.2
+    assert minhash("") == []
+
+
+def test_filter_articles_collapses_syndicated_copies(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "index.json"))
+    articles = [
+        {"title": "Bitcoin tops $70K", "summary": STORY, "link": "https://a.example/1"},
+        {"title": "Bitcoin tops $70K", "summary": "<p>" + STORY + "</p>", "link": "https://b.example/2"},
+        {"title": "Ethereum upgrade date set", "summary": "Developers agreed on the timeline.", "link": "https://c.example/3"},
+        {"title": "Bitcoin tops $70K", "summary": STORY + " The post appeared first on Example News.", "link": "https://d.example/4"},
+    ]
+
+    kept, collapsed = index.filter_articles(articles)
+
+    assert collapsed == 2
+    assert [a["link"] for a in kept] == ["https://a.example/1", "https://c.example/3"]
+
+
+def test_index_persists_and_recognises_same_link_as_not_duplicate(tmp_path):
+    path = str(tmp_path / "index.json")
+    first = NearDuplicateIndex(path=path)
+    first.filter_articles([{"title": "Bitcoin tops $70K", "summary": STORY, "link": "https://a.example/1"}])
+    first.save()
+
+    second = NearDuplicateIndex(path=path)
+    second.load()
+    kept, collapsed = second.filter_articles([
+        # Feeds repeat the same item on later runs: keep it
+        {"title": "Bitcoin tops $70K", "summary": STORY, "link": "https://a.example/1"},
+        # The same story syndicated elsewhere on a later run: drop it
+        {"title": "Bitcoin tops $70K", "summary": STORY, "link": "https://b.example/9"},
+    ])
+
+    assert collapsed == 1
+    assert [a["link"] for a in kept] == ["https://a.example/1"]
+
+
+def test_load_prunes_expired_entries(tmp_path):
+    path = tmp_path / "index.json"
+    old = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    path.write_text(json.dumps({"entries": [{"signature": minhash(normalize(STORY)), "link": "x", "seen_at": old}]}))
+
+    index = NearDuplicateIndex(path=str(path), max_age_days=7)
+    index.load()
+
+    assert index.entries == []
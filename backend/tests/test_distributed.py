@@ -0,0 +1,241 @@
+import asyncio
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from backend import distributed
+from backend.database import Database
+from backend.distributed import WorkQueue, run_backfill_worker, run_ingest_worker
+from backend.local_database import LocalDatabase
+from backend.sources import FixtureTransport, load_sources
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "sources")
+
+
+@pytest.mark.asyncio
+async def test_local_leases_are_disjoint_expire_and_check_the_owner(tmp_path):
+    db = LocalDatabase(str(tmp_path / "leases.db"))
+    assert await db.enqueue_work("b", "feed", ["a", "b", "c"]) == 3
+    assert await db.enqueue_work("b", "feed", ["a", "d"]) == 1
+
+    first = await db.claim_work("b", "w1", lease_seconds=60, limit=2)
+    second = await db.claim_work("b", "w2", lease_seconds=60, limit=5)
+    assert [i["item"] for i in first] == ["a", "b"]
+    assert [i["item"] for i in second] == ["c", "d"]
+    assert await db.claim_work("b", "w3") == []
+
+    assert await db.heartbeat_work([first[0]["id"], second[0]["id"]], "w1") == [first[0]["id"]]
+    assert not await db.finish_work(first[0]["id"], "w2", "done")
+    assert await db.finish_work(first[0]["id"], "w1", "done", result={"articles": 3})
+
+    # An expired lease is handed to the next claimer
+    expired = await db.claim_work("b", "w4", lease_seconds=0)
+    assert expired == []
+    await db.finish_work(second[0]["id"], "w2", "pending", error="boom")
+    retried = await db.claim_work("b", "w4", lease_seconds=0)
+    assert retried[0]["item"] == "c" and retried[0]["attempts"] == 2
+    stolen = await db.claim_work("b", "w5")
+    assert stolen[0]["item"] == "c"
+    assert not await db.finish_work(stolen[0]["id"], "w4", "done")
+
+    items = {i["item"]: i for i in await db.get_work_items("b")}
+    assert items["a"]["result"] == {"articles": 3}
+    assert items["c"]["owner"] == "w5"
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_process_each_item_once_and_retry_failures(tmp_path):
+    db = LocalDatabase(str(tmp_path / "queue.db"))
+    seen = []
+    failures = {"flaky": 1, "broken": 99}
+
+    async def handler(item):
+        seen.append(item)
+        await asyncio.sleep(0.01)
+        if failures.get(item, 0) > 0:
+            failures[item] -= 1
+            raise RuntimeError(f"{item} failed")
+        return {"item": item}
+
+    items = [f"feed-{i}" for i in range(10)] + ["flaky", "broken"]
+    queues = [WorkQueue(db, "batch", f"w{i}", lease_seconds=30, max_attempts=2, poll_interval=0.01) for i in range(3)]
+    await queues[0].enqueue("feed", items)
+    completed = await asyncio.gather(*(q.run({"feed": handler}) for q in queues))
+
+    assert sum(completed) == 11
+    assert sorted(seen) == sorted(items + ["flaky", "broken"])
+    assert await queues[0].counts() == {"done": 11, "failed": 1}
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_does_not_wait_on_an_item_that_ran_out_of_attempts(tmp_path):
+    db = LocalDatabase(str(tmp_path / "queue.db"))
+    await db.enqueue_work("batch", "feed", ["crashed"])
+    # A worker took the last attempt and died without renewing its lease
+    await db.claim_work("batch", "dead", lease_seconds=0, max_attempts=1)
+
+    queue = WorkQueue(db, "batch", "live", max_attempts=1, poll_interval=0.01)
+    assert await asyncio.wait_for(queue.run({}), timeout=1) == 0
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_supabase_leases_use_rpc_and_owner_checked_updates(fake_supabase, monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "http://example")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "key")
+    db = Database()
+
+    assert await db.enqueue_work("b", "feed", ["a", "b"]) == 2
+    fake_supabase["work_leases"][0]["status"] = "done"
+    assert await db.enqueue_work("b", "feed", ["a"]) == 0
+    assert fake_supabase["work_leases"][0]["status"] == "done"
+
+    fake_supabase["rpc:claim_work"] = [{"id": 2, "item": "b"}]
+    assert await db.claim_work("b", "w1", lease_seconds=30, limit=4) == [{"id": 2, "item": "b"}]
+    assert fake_supabase["rpc_calls"][-1] == ("claim_work", {"p_batch": "b", "p_owner": "w1", "p_lease_seconds": 30, "p_limit": 4, "p_max_attempts": 3})
+
+    fake_supabase["rpc:heartbeat_work"] = [{"id": 2}]
+    assert await db.heartbeat_work([2], "w1") == [2]
+
+    fake_supabase["work_leases"][1].update(status="leased", owner="w1", attempts=2)
+    assert not await db.release_work(2, "w2", 1)
+    assert await db.release_work(2, "w1", 1)
+    assert (fake_supabase["work_leases"][1]["status"], fake_supabase["work_leases"][1]["attempts"]) == ("pending", 1)
+
+    fake_supabase["work_leases"][1].update(status="leased", owner="w1")
+    assert not await db.finish_work(2, "w2", "done")
+    assert await db.finish_work(2, "w1", "done", result={"articles": 1})
+    assert [i["status"] for i in await db.get_work_items("b", kind="feed")] == ["done", "done"]
+
+
+@pytest.fixture
+def fake_coingecko(monkeypatch):
+    class FakeCoinGecko:
+        def __init__(self, api_key=None):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def fake_top_coins(client, limit=100):
+        return [
+            {"coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "price_usd": 115000.0, "market_cap": 2.2e12},
+            {"coingecko_id": "ethereum", "symbol": "ETH", "name": "Ethereum", "price_usd": 4100.0, "market_cap": 5e11},
+        ]
+
+    monkeypatch.setattr(distributed, "AsyncCoinGeckoClient", FakeCoinGecko)
+    monkeypatch.setattr(distributed, "fetch_top_coins", fake_top_coins)
+
+
+@pytest.mark.asyncio
+async def test_two_ingest_workers_shard_feeds_and_aggregate_once(tmp_path, monkeypatch, fake_coingecko):
+    monkeypatch.setenv("FEED_HEALTH_PATH", str(tmp_path / "health.json"))
+    db = LocalDatabase(str(tmp_path / "ingest.db"))
+    # The run on the 25th writes the 24th, the last completed day, which the fixtures cover
+    day = date(2025, 9, 25)
+
+    registry = os.path.join(FIXTURES, "registry.csv")
+    sources = load_sources(registry, kinds={"rss", "reddit"}, max_age=None)
+
+    class SlowFixtureTransport(FixtureTransport):
+        # Long enough that the second worker claims a feed while the first is busy
+        def get(self, url):
+            time.sleep(0.2)
+            return super().get(url)
+
+    completed = await asyncio.gather(*(
+        run_ingest_worker(db, day=day, worker_id=f"w{i}", sources=sources, transport=SlowFixtureTransport(FIXTURES), poll_interval=0.05)
+        for i in range(2)
+    ))
+
+    assert sum(completed) == 5  # prices, three feeds, aggregate
+    items = await db.get_work_items(distributed.ingest_batch(day))
+    assert {i["status"] for i in items} == {"done"}
+    assert len({i["owner"] for i in items}) == 2
+
+    coins = {c["symbol"]: c["id"] for c in await db.get_all_coins()}
+    rows = {r["coin_id"]: r for r in await db.get_sentiment_rows([date(2025, 9, 24)])}
+    assert await db.get_sentiment_rows([day]) == []
+    assert rows[coins["BTC"]]["mentions_count"] >= 2
+    assert rows[coins["ETH"]]["mentions_count"] >= 1
+    assert len(await db.get_articles_page(datetime(2025, 9, 1, tzinfo=timezone.utc), datetime(2025, 10, 1, tzinfo=timezone.utc))) == 8
+
+    # Rerunning joins the finished batch and changes nothing
+    assert await run_ingest_worker(db, day=day, worker_id="late", sources=sources, transport=FixtureTransport(FIXTURES), poll_interval=0.05) == 0
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_feeds_are_given_back_while_a_crashed_worker_holds_prices(tmp_path, monkeypatch, fake_coingecko):
+    monkeypatch.setenv("FEED_HEALTH_PATH", str(tmp_path / "health.json"))
+    db = LocalDatabase(str(tmp_path / "ingest.db"))
+    day = date(2025, 9, 24)
+    batch = distributed.ingest_batch(day)
+    await db.enqueue_work(batch, "prices", ["coingecko"])
+    # A worker took the prices step and died; its lease runs out shortly
+    await db.claim_work(batch, "dead", lease_seconds=1)
+
+    sources = load_sources(os.path.join(FIXTURES, "registry.csv"), kinds={"rss"}, max_age=None)
+    completed = await asyncio.wait_for(
+        run_ingest_worker(db, day=day, worker_id="live", sources=sources, transport=FixtureTransport(FIXTURES), poll_interval=0.05),
+        timeout=10,
+    )
+
+    assert completed == 4  # prices, two feeds, aggregate
+    items = {(i["kind"], i["item"]): i for i in await db.get_work_items(batch)}
+    assert {i["status"] for i in items.values()} == {"done"}
+    assert items[("prices", "coingecko")]["attempts"] == 2
+    # Giving a feed back while prices was unfinished did not use up its attempts
+    assert all(i["attempts"] == 1 for (kind, _), i in items.items() if kind == "feed")
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_feed_downloads_are_retried_not_recorded_as_empty(tmp_path, monkeypatch, fake_coingecko):
+    monkeypatch.setenv("FEED_HEALTH_PATH", str(tmp_path / "health.json"))
+    db = LocalDatabase(str(tmp_path / "ingest.db"))
+    day = date(2025, 9, 24)
+    sources = load_sources(os.path.join(FIXTURES, "registry.csv"), kinds={"rss"}, max_age=None)
+    broken = sources[1].url
+
+    class BrokenFeedTransport(FixtureTransport):
+        def get(self, url):
+            if url == broken:
+                raise OSError("connection reset")
+            return super().get(url)
+
+    await run_ingest_worker(db, day=day, worker_id="w", sources=sources, transport=BrokenFeedTransport(FIXTURES), poll_interval=0.01)
+
+    feeds = {i["item"]: i for i in await db.get_work_items(distributed.ingest_batch(day), kind="feed")}
+    assert feeds[broken]["status"] == "failed"
+    assert feeds[broken]["attempts"] == distributed.MAX_ATTEMPTS
+    assert "connection reset" in feeds[broken]["error"]
+    assert feeds[sources[0].url]["status"] == "done"
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_backfill_workers_split_the_date_range(tmp_path):
+    db = LocalDatabase(str(tmp_path / "backfill.db"))
+    await db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    start = date(2024, 1, 1)
+    for i in range(4):
+        day = start + timedelta(days=i)
+        await db.insert_article(f"Bitcoin surges on day {i}", "", f"https://news.example/{i}",
+                                datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc))
+
+    end = start + timedelta(days=3)
+    completed = await asyncio.gather(*(run_backfill_worker(start, end, db=db, worker_id=f"w{i}", workers=1) for i in range(2)))
+
+    assert sum(completed) == 4
+    rows = await db.get_daily_rows_since("coin_sentiment", start)
+    assert sorted(r["date"] for r in rows) == [(start + timedelta(days=i)).isoformat() for i in range(4)]
+    assert all(r["mentions_count"] == 1 for r in rows)
+    db.close()
@@ -0,0 +1,133 @@
+import os
+from datetime import date, datetime, timezone
+
+import pytest
+
+from backend.benchmarks.archive_replay import build_archive, run_replay
+from backend.feed_archive import FeedArchive
+from backend.local_database import LocalDatabase
+from backend.sources import ArchivingTransport, FixtureTransport, load_sources, replay_archive
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "sources")
+REGISTRY = os.path.join(FIXTURES, "registry.csv")
+DAY = date(2025, 9, 24)
+
+
+def at(hour, minute=0):
+    return datetime(DAY.year, DAY.month, DAY.day, hour, minute, tzinfo=timezone.utc)
+
+
+def test_bodies_are_stored_once_per_day_and_segments_rotate(tmp_path):
+    archive = FeedArchive(str(tmp_path), segment_max_bytes=64)
+    first = archive.put("https://a.example/rss", b"<rss>one</rss>", fetched_at=at(1))
+    again = archive.put("https://a.example/rss", b"<rss>one</rss>", fetched_at=at(2))
+    other = archive.put("https://b.example/rss", os.urandom(200), fetched_at=at(3))
+    third = archive.put("https://a.example/rss", b"<rss>two</rss>", fetched_at=at(4))
+    archive.put("https://a.example/rss", b"<rss>one</rss>", fetched_at=datetime(2025, 9, 25, tzinfo=timezone.utc))
+
+    assert (again["segment"], again["offset"]) == (first["segment"], first["offset"])
+    # The random body pushed the segment past its limit, so the next body starts a new one
+    assert other["segment"] == first["segment"]
+    assert third["segment"] != first["segment"]
+    assert archive.days() == [DAY, date(2025, 9, 25)]
+    assert [e["fetched_at"] for e in archive.entries(DAY)] == [at(h).isoformat() for h in (1, 2, 3, 4)]
+    assert archive.read(DAY, third) == b"<rss>two</rss>"
+
+    stats = archive.stats(DAY)
+    assert stats["fetches"] == 4
+    assert stats["bodies"] == 3
+    assert stats["raw_bytes"] == 14 + 14 + 200 + 14
+
+    # A second writer sees what is already stored; a torn index line is skipped
+    with open(tmp_path / DAY.isoformat() / "index.jsonl", "a") as f:
+        f.write('{"url": "https://a.exa')
+    reopened = FeedArchive(str(tmp_path))
+    assert reopened.put("https://a.example/rss", b"<rss>two</rss>", fetched_at=at(5))["segment"] == third["segment"]
+    bodies = [body for _, body in reopened.iter_day(DAY)]
+    assert sorted(bodies) == sorted([b"<rss>one</rss>", b"<rss>two</rss>", archive.read(DAY, other)])
+    assert len(list(reopened.iter_day(DAY, unique=False))) == 5
+
+
+def test_archiving_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEED_ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.delenv("FEED_ARCHIVE", raising=False)
+    assert FeedArchive.from_env() is None
+    monkeypatch.setenv("FEED_ARCHIVE", "1")
+    assert FeedArchive.from_env().root == str(tmp_path)
+
+
+def test_replay_matches_parsing_the_live_fetches(tmp_path):
+    archive = FeedArchive(str(tmp_path))
+    transport = ArchivingTransport(FixtureTransport(FIXTURES), archive)
+    live = []
+    for _ in range(2):
+        for source in load_sources(REGISTRY, max_age=None):
+            for article in source.fetch(transport):
+                if article["link"] not in {a["link"] for a in live}:
+                    live.append(article)
+
+    today = datetime.now(timezone.utc).date()
+    assert archive.stats(today)["fetches"] == 8
+    assert archive.stats(today)["bodies"] == 4
+    replayed = replay_archive(archive, today, REGISTRY, max_age=None)
+    assert sorted(a["link"] for a in replayed) == sorted(a["link"] for a in live)
+    assert replay_archive(archive, date(2000, 1, 1), REGISTRY) == []
+
+
+def test_replay_applies_the_age_window_at_fetch_time(tmp_path):
+    archive = FeedArchive(str(tmp_path))
+    url = load_sources(REGISTRY, max_age=None)[0].url
+    body = FixtureTransport(FIXTURES).get(url)
+    fetched_at = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    archive.put(url, body, fetched_at=fetched_at)
+    # Fetched again later, when the window had moved past more of the items
+    archive.put(url, body, fetched_at=datetime(2025, 10, 1, 20, tzinfo=timezone.utc))
+
+    # The 2025-09-23 item was already older than seven days when the feed was fetched
+    replayed = replay_archive(archive, fetched_at.date(), REGISTRY)
+    assert {a["published_date"].date() for a in replayed} == {date(2025, 9, 24)}
+    assert len(replayed) == 2
+    assert len(replay_archive(archive, fetched_at.date(), REGISTRY, max_age=None)) == 3
+
+
+def test_writer_keeps_only_the_current_days_bodies_in_memory(tmp_path):
+    archive = FeedArchive(str(tmp_path))
+    for day in range(1, 4):
+        archive.put("https://a.example/rss", b"<rss>same</rss>", fetched_at=datetime(2025, 9, day, tzinfo=timezone.utc))
+    assert archive._blobs_day == "2025-09-03"
+    assert len(archive._blobs) == 1
+
+    # Going back to an earlier day reloads its index and still stores the body once
+    first = archive.put("https://a.example/rss", b"<rss>same</rss>", fetched_at=datetime(2025, 9, 1, 12, tzinfo=timezone.utc))
+    assert archive.stats(date(2025, 9, 1))["bodies"] == 1
+    assert archive.read(date(2025, 9, 1), first) == b"<rss>same</rss>"
+    newer = archive.put("https://a.example/rss", b"<rss>new</rss>", fetched_at=datetime(2025, 9, 1, 13, tzinfo=timezone.utc))
+    assert newer["segment"] != first["segment"]
+    assert sorted(body for _, body in archive.iter_day(date(2025, 9, 1))) == [b"<rss>new</rss>", b"<rss>same</rss>"]
+
+
+@pytest.mark.asyncio
+async def test_cron_replay_rewrites_the_days_sentiment(tmp_path):
+    from backend import cron_job
+
+    archive = build_archive(str(tmp_path / "archive"), variants=2, polls=2)
+    db = LocalDatabase(str(tmp_path / "replay.db"))
+    bitcoin = await db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+
+    articles = await cron_job.run_replay(DAY, archive=archive, db=db)
+    assert articles
+    rows = await db.get_sentiment_rows([DAY])
+    assert {r["coin_id"] for r in rows} == {bitcoin}
+    assert rows[0]["mentions_count"] > 0
+
+    assert await cron_job.run_replay(date(2000, 1, 1), archive=archive, db=db) == []
+    db.close()
+
+
+def test_benchmark_replays_every_distinct_body(tmp_path):
+    archive = build_archive(str(tmp_path), variants=3, polls=2)
+    result = run_replay(archive, registry=REGISTRY)
+    assert result["fetches"] == 4 * 3 * 2
+    assert result["bodies"] == 4 * 3
+    assert result["compression_ratio"] > 1
+    assert result["articles"] > 0
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from backend.feed_health import FeedHealth
+from backend.sources import FixtureTransport, RSSSource, SourceScheduler, load_sources
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "sources")
+URL = "https://dead.example/rss"
+
+
+def test_breaker_opens_after_consecutive_failures_and_backs_off(tmp_path):
+    health = FeedHealth(str(tmp_path / "health.json"), failure_threshold=3, base_backoff=100, max_backoff=300)
+
+    for _ in range(2):
+        health.record_failure(URL, 0.5, "timed out", now=0)
+    assert health.allow(URL, now=1)
+    health.record_failure(URL, 0.5, "timed out", now=0)
+    assert not health.allow(URL, now=99)
+    assert health.summary(URL, now=50)["state"] == "open"
+
+    # Half-open probe fails: reopened straight away for twice as long
+    assert health.allow(URL, now=100)
+    health.record_failure(URL, 0.5, "timed out", now=100)
+    assert not health.allow(URL, now=299)
+    assert health.allow(URL, now=300)
+    health.record_failure(URL, 0.5, "timed out", now=300)
+    assert health.feeds[URL]["open_until"] == 600  # capped at max_backoff
+
+    health.record_success(URL, 0.2, items=5, now=600)
+    assert health.allow(URL, now=600)
+    assert health.summary(URL)["state"] == "closed"
+    assert health.feeds[URL]["trips"] == 0
+
+
+def test_summary_rates_and_persistence(tmp_path):
+    path = str(tmp_path / "health.json")
+    health = FeedHealth(path)
+    health.record_success(URL, 0.1, items=10)
+    health.record_success(URL, 0.3, items=20, bozo=True)
+    health.record_failure(URL, 0.2, "HTTP 503")
+    # Malformed and empty is a failure, not a success
+    health.record_success(URL, 0.2, items=0, bozo=True)
+    health.save()
+
+    loaded = FeedHealth(path)
+    loaded.load()
+    summary = loaded.summary(URL)
+    assert summary["fetches"] == 4
+    assert summary["error_rate"] == 0.5
+    assert summary["bozo_rate"] == 0.5
+    assert summary["avg_items"] == 15.0
+    assert summary["avg_latency_ms"] == 200.0
+    assert summary["consecutive_failures"] == 2
+    assert summary["last_error"] == "malformed feed with no items"
+
+
+def test_load_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "health.json"
+    path.write_text("{not json")
+    health = FeedHealth(str(path))
+    health.load()
+    assert health.feeds == {}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_records_outcomes_and_skips_open_circuits(tmp_path):
+    health = FeedHealth(str(tmp_path / "health.json"), failure_threshold=1)
+    sources = load_sources(os.path.join(FIXTURES, "registry.csv"), kinds={"rss"}, max_age=None) + [RSSSource(URL, max_age=None)]
+    scheduler = SourceScheduler(FixtureTransport(FIXTURES), health=health)
+
+    first = await scheduler.fetch_all(sources)
+    assert len(first) == 5
+    assert health.summary(URL)["state"] == "open"
+    assert health.summary(sources[0].url)["avg_items"] == 3.0
+
+    transport_calls = []
+    scheduler.transport.get = lambda url: transport_calls.append(url) or FixtureTransport(FIXTURES).get(url)
+    await scheduler.fetch_all(sources)
+    scheduler.close()
+    assert URL not in transport_calls
+    assert len(transport_calls) == 2
@@ -0,0 +1,203 @@
+from datetime import date, datetime, timezone
+import pytest
+
+from backend.dedup import NearDuplicateIndex
+from backend.feed_health import FeedHealth
+from backend.ingest_daemon import IngestDaemon, next_interval
+from backend.local_database import LocalDatabase
+from backend.sources import FixtureTransport, Source, SourceScheduler
+
+
+TODAY = date(2024, 3, 1)
+
+
+def article(title, link, hour=9, day=TODAY):
+    return {
+        "title": title,
+        "summary": "",
+        "link": link,
+        "published_date": datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc),
+    }
+
+
+class ScriptedSource(Source):
+    kind = "rss"
+
+    def __init__(self, url, feeds):
+        super().__init__(url, max_age=None)
+        self.feeds = feeds
+
+    def fetch(self, transport):
+        self.feeds.calls.append(self.url)
+        if isinstance(self.feeds.items[self.url], Exception):
+            raise self.feeds.items[self.url]
+        return list(self.feeds.items[self.url])
+
+
+class ScriptedFeeds:
+    """Returns the scripted items for each source, as a live feed would show them"""
+
+    def __init__(self, items):
+        self.items = items
+        self.sources = [ScriptedSource(url, self) for url in items]
+        self.calls = []
+
+
+@pytest.fixture()
+def local_db(tmp_path):
+    db = LocalDatabase(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+def make_daemon(db, feeds, tmp_path):
+    scheduler = SourceScheduler(FixtureTransport(str(tmp_path)), health=FeedHealth(path=str(tmp_path / "health.json")))
+    return IngestDaemon(
+        db,
+        sources=feeds.sources,
+        scheduler=scheduler,
+        dedup_index=NearDuplicateIndex(path=str(tmp_path / "index.json")),
+        min_interval=60,
+        max_interval=3600,
+        initial_interval=600,
+    )
+
+
+def test_next_interval_backs_off_quiet_feeds_and_tightens_busy_ones():
+    assert next_interval(600, 0, 60, 3600) == 900
+    assert next_interval(600, 1, 60, 3600) == 600
+    assert next_interval(600, 10, 60, 3600) == 300
+    assert next_interval(3000, 0, 60, 3600) == 3600
+    assert next_interval(100, 5, 60, 3600) == 60
+
+
+@pytest.mark.asyncio
+async def test_feeds_adapt_independently(local_db, tmp_path):
+    parser = ScriptedFeeds({"busy": [], "quiet": [article("Quiet news", "q1")]})
+    daemon = make_daemon(local_db, parser, tmp_path)
+    await daemon.start(now=0)
+
+    await daemon.run_cycle(now=1000, today=TODAY)
+    parser.items["busy"] = [article(f"Market story number {i}", f"b{i}") for i in range(5)]
+    await daemon.run_cycle(now=2000, today=TODAY)
+
+    busy, quiet = daemon.schedules
+    assert busy.interval == 300
+    assert quiet.interval == 900
+    assert busy.next_due == 2300
+    # Nothing is due before the busy feed's next poll
+    assert await daemon.run_cycle(now=2100, today=TODAY) == 0
+    assert daemon.seconds_until_next_poll(now=2100) == 200
+
+
+@pytest.mark.asyncio
+async def test_new_articles_update_todays_sentiment_incrementally(local_db, tmp_path):
+    coin_id = await local_db.insert_or_update_coin("bitcoin", "btc", "Bitcoin")
+    parser = ScriptedFeeds({"feed": [article("Bitcoin rallies to a great new high", "u1")]})
+    daemon = make_daemon(local_db, parser, tmp_path)
+    await daemon.start(now=0)
+
+    assert await daemon.run_cycle(now=1000, today=TODAY) == 1
+    parser.items["feed"].append(article("Bitcoin slides after terrible week", "u2", hour=11))
+    # A story from yesterday is stored but does not count towards today
+    parser.items["feed"].append(article("Bitcoin closed flat", "u3", day=date(2024, 2, 29)))
+    assert await daemon.run_cycle(now=2000, today=TODAY) == 2
+    # Repeats of the same items are not ingested again
+    assert await daemon.run_cycle(now=3000, today=TODAY) == 0
+
+    row = local_db.conn.execute("SELECT * FROM coin_sentiment WHERE coin_id = ?", (coin_id,)).fetchone()
+    assert row["date"] == "2024-03-01"
+    assert row["mentions_count"] == 2
+    assert local_db.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] == 3
+
+
+@pytest.mark.asyncio
+async def test_restart_seeds_totals_from_stored_articles(local_db, tmp_path):
+    coin_id = await local_db.insert_or_update_coin("bitcoin", "btc", "Bitcoin")
+    await local_db.insert_article("Bitcoin rallies to a great new high", "", "u1", datetime(2024, 3, 1, 8, tzinfo=timezone.utc))
+    parser = ScriptedFeeds({"feed": [
+        article("Bitcoin rallies to a great new high", "u1", hour=8),
+        article("Bitcoin miners expand", "u2", hour=10),
+    ]})
+    daemon = make_daemon(local_db, parser, tmp_path)
+    await daemon.start(now=0)
+
+    await daemon.run_cycle(now=1000, today=TODAY)
+
+    row = local_db.conn.execute("SELECT mentions_count FROM coin_sentiment WHERE coin_id = ?", (coin_id,)).fetchone()
+    # u1 was already stored before the restart and is counted once
+    assert row["mentions_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_daemon_and_daily_run_write_the_same_row(local_db, tmp_path, monkeypatch):
+    from backend import ingest_daemon
+    from backend.cron_job import store_day_sentiment
+
+    coin_id = await local_db.insert_or_update_coin("bitcoin", "btc", "Bitcoin")
+    parser = ScriptedFeeds({"feed": [
+        article("Bitcoin rallies to a great new high", "u1"),
+        article("Bitcoin slides after terrible week", "u2", hour=11),
+        article("Bitcoin closed flat last week", "u3", day=date(2024, 2, 25)),
+    ]})
+    daemon = make_daemon(local_db, parser, tmp_path)
+
+    async def broken_deltas(db, day):
+        raise RuntimeError("deltas table missing")
+
+    # A deltas failure is logged; the cycle still finishes
+    monkeypatch.setattr(ingest_daemon, "update_sentiment_deltas", broken_deltas)
+    await daemon.start(now=0)
+    assert await daemon.run_cycle(now=1000, today=TODAY) == 3
+
+    query = "SELECT sentiment_score, mentions_count, no_mentions FROM coin_sentiment WHERE coin_id = ? AND date = ?"
+    from_daemon = dict(local_db.conn.execute(query, (coin_id, TODAY.isoformat())).fetchone())
+    await store_day_sentiment(local_db, daemon.analyzer, daemon.coins(), TODAY)
+    assert dict(local_db.conn.execute(query, (coin_id, TODAY.isoformat())).fetchone()) == from_daemon
+    assert from_daemon["mentions_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_publishing_is_throttled(local_db, tmp_path, monkeypatch):
+    from backend import ingest_daemon
+
+    published = []
+
+    async def fake_publish(db, path):
+        published.append(path)
+
+    monkeypatch.setattr(ingest_daemon, "publish_snapshot", fake_publish)
+    await local_db.insert_or_update_coin("bitcoin", "btc", "Bitcoin")
+    parser = ScriptedFeeds({"feed": [article("Bitcoin rallies to a great new high", "u1")]})
+    daemon = make_daemon(local_db, parser, tmp_path)
+    daemon.snapshot_path = str(tmp_path / "snapshot.bin")
+    daemon.snapshot_interval = 1500
+    await daemon.start(now=0)
+
+    await daemon.run_cycle(now=1000, today=TODAY)
+    parser.items["feed"].append(article("Bitcoin slides after terrible week", "u2", hour=11))
+    await daemon.run_cycle(now=2000, today=TODAY)
+    # The second change waits for the interval, then goes out even without new articles
+    assert len(published) == 1
+    await daemon.run_cycle(now=2600, today=TODAY)
+    assert len(published) == 2
+    await daemon.run_cycle(now=5000, today=TODAY)
+    assert len(published) == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_sources_trip_the_shared_circuit_breaker(local_db, tmp_path):
+    feeds = ScriptedFeeds({"down": OSError("connection reset"), "up": [article("Market news", "m1")]})
+    daemon = make_daemon(local_db, feeds, tmp_path)
+    await daemon.start(now=0)
+
+    for cycle in range(1, 5):
+        await daemon.run_cycle(now=cycle * 10000, today=TODAY)
+
+    # Three failures open the breaker; the fourth poll does not reach the source
+    assert feeds.calls.count("down") == 3
+    assert feeds.calls.count("up") == 4
+    saved = FeedHealth(path=str(tmp_path / "health.json"))
+    saved.load()
+    assert not saved.allow("down")
+    assert saved.allow("up")
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import pytest
+
+from backend.live_updates import CoinUpdateBroker, CoinChangePoller
+
+
+def parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def coin(coin_id, score):
+    return {"coin_id": coin_id, "symbol": f"C{coin_id}", "sentiment_score": score}
+
+
+@pytest.mark.asyncio
+async def test_subscribers_get_snapshot_then_only_changed_rows():
+    broker = CoinUpdateBroker()
+    broker.publish([coin(1, 0.1), coin(2, 0.2)])
+    first, second = broker.subscribe(), broker.subscribe()
+
+    event, data = parse(first.get_nowait())
+    assert event == "snapshot"
+    assert [c["coin_id"] for c in data["coins"]] == [1, 2]
+
+    diff = broker.publish([coin(1, 0.1), coin(2, 0.5), coin(3, 0.0)])
+    assert [c["coin_id"] for c in diff["changed"]] == [2, 3]
+
+    update = first.get_nowait()
+    event, data = parse(update)
+    assert event == "update"
+    assert [c["coin_id"] for c in data["changed"]] == [2, 3]
+    assert data["removed"] == []
+    # Every subscriber receives the same encoded message
+    second.get_nowait()
+    assert second.get_nowait() is update
+
+
+@pytest.mark.asyncio
+async def test_publish_without_changes_is_silent_and_removals_are_reported():
+    broker = CoinUpdateBroker()
+    broker.publish([coin(1, 0.1), coin(2, 0.2)])
+    queue = broker.subscribe()
+    queue.get_nowait()
+
+    assert broker.publish([coin(1, 0.1), coin(2, 0.2)]) is None
+    assert queue.empty()
+
+    broker.publish([coin(1, 0.1)])
+    _, data = parse(queue.get_nowait())
+    assert data["removed"] == [2]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_resynced_with_snapshot():
+    broker = CoinUpdateBroker(queue_size=2)
+    queue = broker.subscribe()
+    for i in range(5):
+        broker.publish([coin(1, i / 10)])
+
+    # The backlog was dropped in favour of a snapshot, followed by newer updates
+    event, data = parse(queue.get_nowait())
+    assert event == "snapshot"
+    assert data["coins"] == [coin(1, 0.3)]
+    event, data = parse(queue.get_nowait())
+    assert event == "update"
+    assert data["changed"] == [coin(1, 0.4)]
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_poller_queries_once_per_interval_for_all_subscribers():
+    broker = CoinUpdateBroker()
+    calls = []
+
+    async def fetch_rows():
+        calls.append(1)
+        return [coin(1, len(calls) / 10)]
+
+    poller = CoinChangePoller(broker, fetch_rows, interval=0.01)
+    queues = [broker.subscribe() for _ in range(100)]
+    poller.ensure_running()
+    poller.ensure_running()
+    await asyncio.sleep(0.05)
+
+    for q in queues:
+        broker.unsubscribe(q)
+    await asyncio.sleep(0.03)
+
+    assert poller._task.done()
+    assert 1 <= len(calls) <= 6
+    assert queues[0].qsize() >= 2
+
+
+class FakeRequest:
+    def __init__(self, polls_before_disconnect):
+        self.polls = polls_before_disconnect
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_sends_snapshot_and_updates(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "api.db"))
+    from backend import main
+    from backend.local_database import LocalDatabase
+    from datetime import date
+
+    db = LocalDatabase(str(tmp_path / "stream.db"))
+    coin_id = await db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    await db.insert_coin_price(coin_id, date(2024, 1, 1), 42000.0, 8e11)
+    broker = main.CoinUpdateBroker()
+    monkeypatch.setattr(main, "db", db)
+    monkeypatch.setattr(main, "live_broker", broker)
+    monkeypatch.setattr(main, "live_poller", main.CoinChangePoller(broker, main.fetch_formatted_coins, interval=3600))
+
+    response = await main.stream_coins(FakeRequest(polls_before_disconnect=2))
+    assert response.media_type == "text/event-stream"
+    body = response.body_iterator
+
+    event, data = parse(await body.__anext__())
+    assert event == "snapshot"
+    assert data["coins"][0]["coingecko_id"] == "bitcoin"
+
+    await db.insert_coin_price(coin_id, date(2024, 1, 2), 43000.0, 8.1e11)
+    await main.live_poller.refresh()
+    event, data = parse(await body.__anext__())
+    assert event == "update"
+    assert data["changed"][0]["price_usd"] == 43000.0
+
+    with pytest.raises(StopAsyncIteration):
+        await body.__anext__()
+    assert broker.subscribers == set()
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_reloads_when_the_poller_is_idle_and_tracks_empty_loads(monkeypatch):
+    from backend import main
+
+    rows = []
+    calls = []
+
+    async def fetch_rows():
+        calls.append(1)
+        return list(rows)
+
+    broker = main.CoinUpdateBroker()
+    poller = main.CoinChangePoller(broker, fetch_rows, interval=3600)
+    monkeypatch.setattr(main, "live_broker", broker)
+    monkeypatch.setattr(main, "live_poller", poller)
+
+    # An empty table still counts as loaded; the running poller serves the next client
+    await main.stream_coins(FakeRequest(polls_before_disconnect=0))
+    assert broker.initialized and broker.version == 0
+    await main.stream_coins(FakeRequest(polls_before_disconnect=0))
+    assert len(calls) == 1
+
+    # Once the poller has stopped, the next client gets fresh rows, not the stale snapshot
+    poller._task.cancel()
+    await asyncio.sleep(0)
+    rows.append(coin(1, 0.4))
+    response = await main.stream_coins(FakeRequest(polls_before_disconnect=1))
+    assert len(calls) == 2
+    event, data = parse(await response.body_iterator.__anext__())
+    assert data["coins"] == [coin(1, 0.4)]
+    await response.body_iterator.aclose()
+    poller._task.cancel()
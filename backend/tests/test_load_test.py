@@ -0,0 +1,45 @@
+import os
+import pytest
+
+from backend.benchmarks.load_test import percentile, run_load_test
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_load_test_reports_every_endpoint_per_table_size(monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", "unused.db")
+
+    results = await run_load_test([20, 50], coins=3, days=2, requests=12, concurrency=4)
+
+    assert set(results) == {"20", "50"}
+    for endpoints in results.values():
+        assert set(endpoints) == {"/api/coins", "/api/coins/{coin_id}", "/api/coins/{coin_id}/articles"}
+        for stats in endpoints.values():
+            assert stats["requests"] == 12
+            assert stats["errors"] == 0
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+
+@pytest.mark.asyncio
+async def test_load_test_gives_main_its_database_and_environment_back(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "app.db"))
+    import main
+
+    monkeypatch.delenv("DATABASE_BACKEND", raising=False)
+    monkeypatch.delenv("SQLITE_PATH", raising=False)
+    app_db = main.db
+
+    await run_load_test([5], coins=2, days=1, requests=2, concurrency=1)
+
+    assert main.db is app_db
+    assert "DATABASE_BACKEND" not in os.environ
+    assert "SQLITE_PATH" not in os.environ
@@ -0,0 +1,226 @@
+from datetime import date, datetime, timezone
+import pytest
+
+from backend.local_database import LocalDatabase
+
+
+@pytest.fixture()
+def local_db(tmp_path):
+    db = LocalDatabase(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_mode_and_schema(local_db):
+    mode = local_db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    assert await local_db.ping() is True
+    assert await local_db.get_latest_coin_data() == []
+
+
+@pytest.mark.asyncio
+async def test_insert_or_update_coin_and_prices(local_db):
+    coin_id = await local_db.insert_or_update_coin("bitcoin", "old", "Old")
+    assert await local_db.insert_or_update_coin("bitcoin", "btc", "Bitcoin") == coin_id
+
+    d = date(2024, 1, 1)
+    await local_db.insert_coin_price(coin_id, d, 42000.0, 8e11)
+    await local_db.insert_coin_price(coin_id, d, 43000.0, 8.1e11)
+
+    coins = await local_db.get_all_coins()
+    assert coins == [{"id": coin_id, "coingecko_id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+    details = await local_db.get_coin_details(coin_id)
+    assert details["recent_prices"] == [{"date": "2024-01-01", "price_usd": 43000.0, "market_cap": 8.1e11}]
+    assert await local_db.get_coin_details(999) is None
+
+
+@pytest.mark.asyncio
+async def test_insert_article_returns_existing_id_on_duplicate_link(local_db):
+    published = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    first_id = await local_db.insert_article("Title", "Summary", "http://example.com/a", published)
+    second_id = await local_db.insert_article("Title 2", "Summary 2", "http://example.com/a", published)
+    assert first_id == second_id
+
+
+@pytest.mark.asyncio
+async def test_insert_articles_skips_links_already_stored(local_db):
+    published = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    first_id = await local_db.insert_article("Title", "Summary", "u1", published)
+    await local_db.insert_articles([
+        {"title": "Title 2", "summary": "Summary 2", "link": "u1", "published_date": published},
+        {"title": "Title 3", "summary": None, "link": "u2", "published_date": published},
+    ])
+
+    page = await local_db.get_articles_page(published, datetime(2024, 1, 3, tzinfo=timezone.utc))
+    assert [(a["id"], a["title"]) for a in page][0] == (first_id, "Title")
+    assert [a["link"] for a in page] == ["u1", "u2"]
+
+
+@pytest.mark.asyncio
+async def test_latest_coin_data_view_orders_like_supabase_backend(local_db):
+    rows = await local_db.insert_coins([
+        {"coingecko_id": "b", "symbol": "B", "name": "Bee"},
+        {"coingecko_id": "a", "symbol": "A", "name": "Ay"},
+        {"coingecko_id": "c", "symbol": "C", "name": "Cee"},
+        {"coingecko_id": "d", "symbol": "D", "name": "Dee"},
+    ])
+    ids = {r["coingecko_id"]: r["id"] for r in rows}
+    today = date(2024, 1, 2)
+    await local_db.upsert_coin_prices([
+        {"coin_id": ids["b"], "date": today, "price_usd": 1, "market_cap": 100},
+        {"coin_id": ids["a"], "date": today, "price_usd": 1, "market_cap": 50},
+        {"coin_id": ids["c"], "date": today, "price_usd": 1, "market_cap": 200},
+        {"coin_id": ids["d"], "date": today, "price_usd": 1, "market_cap": 999},
+    ])
+    await local_db.upsert_coin_sentiments([
+        {"coin_id": ids["a"], "date": today, "sentiment_score": 0.8, "mentions_count": 1, "no_mentions": False},
+        {"coin_id": ids["c"], "date": today, "sentiment_score": 0.8, "mentions_count": 1, "no_mentions": False},
+        {"coin_id": ids["d"], "date": today, "sentiment_score": 0.2, "mentions_count": 0, "no_mentions": True},
+        # Older day must not be picked up by the view
+        {"coin_id": ids["b"], "date": date(2024, 1, 1), "sentiment_score": 0.9, "mentions_count": 1, "no_mentions": False},
+        {"coin_id": ids["b"], "date": today, "sentiment_score": None, "mentions_count": 0, "no_mentions": False},
+    ])
+
+    rows = await local_db.get_latest_coin_data()
+
+    assert [r["coingecko_id"] for r in rows] == ["c", "a", "d", "b"]
+    assert rows[2]["no_mentions"] is True
+
+
+@pytest.mark.asyncio
+async def test_recent_articles_for_coin_and_retention_helpers(local_db):
+    coin_id = await local_db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    for i, (title, day) in enumerate([
+        ("Markets rally", 2), ("Bitcoin hits new ATH", 3), ("ETH upgrade", 4), ("BTC whales move", 6),
+    ], start=1):
+        await local_db.insert_article(title, "", f"u{i}", datetime(2024, 1, day, tzinfo=timezone.utc))
+
+    results = await local_db.get_recent_articles_for_coin(coin_id, limit=2)
+    assert [r["title"] for r in results] == ["BTC whales move", "Bitcoin hits new ATH"]
+
+    eth_id = await local_db.insert_or_update_coin("ethereum", "ETH", "Ethereum")
+    grouped = await local_db.get_recent_articles_for_coins([coin_id, eth_id, 999], limit=2, since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert grouped[coin_id] == results
+    assert [r["title"] for r in grouped[eth_id]] == ["ETH upgrade"]
+    assert grouped[999] == []
+    # Articles older than the window are not matched at all
+    windowed = await local_db.get_recent_articles_for_coins([coin_id], limit=2, since=datetime(2024, 1, 5, tzinfo=timezone.utc))
+    assert [r["title"] for r in windowed[coin_id]] == ["BTC whales move"]
+    assert await local_db.get_recent_articles_for_coins([coin_id], limit=2) == {coin_id: []}
+
+    page = await local_db.get_articles_page(datetime(2024, 1, 3, tzinfo=timezone.utc), datetime(2024, 1, 5, tzinfo=timezone.utc))
+    assert [a["title"] for a in page] == ["Bitcoin hits new ATH", "ETH upgrade"]
+
+    assert await local_db.delete_articles_batch(datetime(2024, 1, 5, tzinfo=timezone.utc), limit=2) == 2
+    assert await local_db.delete_articles_batch(datetime(2024, 1, 5, tzinfo=timezone.utc), limit=2) == 1
+    assert await local_db.delete_articles_batch(datetime(2024, 1, 5, tzinfo=timezone.utc), limit=2) == 0
+
+    with pytest.raises(ValueError):
+        await local_db.delete_rows_by_ids("coins", [coin_id])
+
+
+@pytest.mark.asyncio
+async def test_pipeline_and_api_run_on_local_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "api.db"))
+    import httpx
+    from backend import cron_job, main
+    from backend.coin_registry import CoinRegistry
+    from backend.sentiment_analyzer import SentimentAnalyzer
+
+    db = LocalDatabase(str(tmp_path / "pipeline.db"))
+    monkeypatch.setattr(main, "db", db)
+    today = datetime.now(timezone.utc).date()
+
+    registry = CoinRegistry()
+    await registry.load(db)
+    coins_data = [
+        {"coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "price_usd": 42000.0, "market_cap": 8e11},
+        {"coingecko_id": "ethereum", "symbol": "ETH", "name": "Ethereum", "price_usd": 2200.0, "market_cap": 2.6e11},
+    ]
+    articles = [
+        {"title": "Bitcoin rally is great news", "summary": "", "link": "u1", "published_date": datetime.now(timezone.utc)},
+        {"title": "Ethereum fees are terrible", "summary": "", "link": "u2", "published_date": datetime.now(timezone.utc)},
+    ]
+    coin_ids_map = await cron_job.upsert_coins_and_prices(db, registry, coins_data, today)
+    await cron_job.store_articles(db, articles)
+    await cron_job.store_day_sentiment(db, SentimentAnalyzer(), list(coin_ids_map.values()), today)
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+    coins = (await client.get("/api/coins")).json()
+    assert [c["coingecko_id"] for c in coins] == ["bitcoin", "ethereum"]
+    assert coins[0]["mentions_count"] == 1
+
+    btc_id = coins[0]["coin_id"]
+    details = (await client.get(f"/api/coins/{btc_id}")).json()
+    assert details["coin"]["coingecko_id"] == "bitcoin"
+    assert len(details["recent_sentiment"]) == 1
+    assert (await client.get("/api/coins/999")).status_code == 404
+
+    articles_resp = (await client.get(f"/api/coins/{btc_id}/articles")).json()
+    assert [a["link"] for a in articles_resp] == ["u1"]
+    eth_id = coins[1]["coin_id"]
+    recent = (await client.get("/api/articles/recent", params={"coin_ids": f"{eth_id},{btc_id}", "limit": 5})).json()
+    assert recent["articles"][str(btc_id)] == articles_resp
+    assert [a["link"] for a in recent["articles"][str(eth_id)]] == ["u2"]
+    assert (await client.get("/api/articles/recent", params={"coin_ids": "1,x"})).status_code == 400
+    assert (await client.get("/api/articles/recent", params={"coin_ids": ","})).status_code == 400
+    assert (await client.get("/health")).json()["status"] == "healthy"
+
+    search = (await client.get("/api/articles/search", params={"q": "rally", "coin_id": btc_id, "from": today.isoformat(), "to": today.isoformat()})).json()
+    assert [a["link"] for a in search["results"]] == ["u1"]
+    assert (await client.get("/api/articles/search", params={"q": "rally", "cursor": "garbage"})).status_code == 400
+    await client.aclose()
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_search_articles_ranks_filters_and_paginates(local_db):
+    btc = await local_db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    articles = [
+        ("ETF approval lifts Bitcoin", "Spot ETF approved", 1),
+        ("ETF filings pile up", "Ethereum ETF next", 2),
+        ("Miners sell BTC", "ETF outflows", 3),
+        ("Bitcoin ETF volume record", "ETF", 10),
+        ("Unrelated story", "nothing here", 4),
+    ]
+    for i, (title, summary, day) in enumerate(articles, start=1):
+        await local_db.insert_article(title, summary, f"u{i}", datetime(2024, 1, day, tzinfo=timezone.utc))
+
+    everything = await local_db.search_articles("etf", limit=10)
+    assert len(everything["results"]) == 4
+    assert everything["next_cursor"] is None
+    ranks = [r["rank"] for r in everything["results"]]
+    assert ranks == sorted(ranks, reverse=True)
+
+    # Walking pages of 1 via the cursor yields the same order without repeats
+    seen, cursor = [], None
+    while True:
+        page = await local_db.search_articles("etf", cursor=cursor, limit=1)
+        seen.extend(r["id"] for r in page["results"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [r["id"] for r in everything["results"]]
+
+    by_coin = await local_db.search_articles("etf", coin_id=btc, limit=10)
+    assert {r["link"] for r in by_coin["results"]} == {"u1", "u3", "u4"}
+
+    in_range = await local_db.search_articles(
+        "etf", date_from=datetime(2024, 1, 2, tzinfo=timezone.utc), date_to=datetime(2024, 1, 5, tzinfo=timezone.utc)
+    )
+    assert {r["link"] for r in in_range["results"]} == {"u2", "u3"}
+
+    # Query syntax characters are treated as plain words
+    assert (await local_db.search_articles('etf" OR NEAR(')) is not None
+    assert (await local_db.search_articles("!!!"))["results"] == []
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_article_deletes(local_db):
+    await local_db.insert_article("Solana outage", "", "u1", datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert len((await local_db.search_articles("solana"))["results"]) == 1
+
+    await local_db.delete_articles_batch(datetime(2024, 2, 1, tzinfo=timezone.utc))
+    assert (await local_db.search_articles("solana"))["results"] == []
@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from backend.database import Database
+from backend.local_database import LocalDatabase
+from backend.movers import compute_deltas, update_sentiment_deltas, refresh_deltas_after
+
+
+def sentiment_row(coin_id, day, score, mentions, no_mentions=False):
+    return {"coin_id": coin_id, "date": day, "sentiment_score": score, "mentions_count": mentions, "no_mentions": no_mentions}
+
+
+def test_compute_deltas_needs_both_ends_of_the_window():
+    day = date(2024, 3, 10)
+    rows = [
+        sentiment_row(1, day, 0.5, 10),
+        sentiment_row(1, day - timedelta(days=1), 0.2, 4),
+        sentiment_row(1, day - timedelta(days=7), None, 0, no_mentions=True),
+        sentiment_row(2, day, None, 0, no_mentions=True),
+        sentiment_row(2, day - timedelta(days=1), 0.4, 3),
+    ]
+
+    deltas = {(d["coin_id"], d["window_days"], d["metric"]): d for d in compute_deltas(day, rows)}
+
+    assert deltas[(1, 1, "sentiment")]["delta"] == pytest.approx(0.3)
+    assert deltas[(1, 1, "mentions")]["delta"] == 6
+    # No score a week ago, but the zero mention count still compares
+    assert (1, 7, "sentiment") not in deltas
+    assert deltas[(1, 7, "mentions")]["delta"] == 10
+    assert (2, 1, "sentiment") not in deltas
+    assert deltas[(2, 1, "mentions")]["delta"] == -3
+    assert (2, 7, "mentions") not in deltas
+
+
+async def seed(db, today):
+    btc = await db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    eth = await db.insert_or_update_coin("ethereum", "ETH", "Ethereum")
+    sol = await db.insert_or_update_coin("solana", "SOL", "Solana")
+    yesterday = today - timedelta(days=1)
+    await db.upsert_coin_sentiments([
+        sentiment_row(btc, yesterday, 0.1, 5), sentiment_row(btc, today, 0.6, 9),
+        sentiment_row(eth, yesterday, 0.3, 8), sentiment_row(eth, today, -0.2, 2),
+        sentiment_row(sol, yesterday, 0.0, 1), sentiment_row(sol, today, 0.1, 1),
+    ])
+    return btc, eth, sol
+
+
+@pytest.mark.asyncio
+async def test_local_top_movers_reads_latest_day(tmp_path):
+    db = LocalDatabase(str(tmp_path / "movers.db"))
+    today = date(2024, 3, 10)
+    btc, eth, sol = await seed(db, today)
+    # An older day's deltas must not leak into the ranking
+    await db.upsert_sentiment_deltas([{"coin_id": sol, "date": today - timedelta(days=1), "window_days": 1, "metric": "sentiment", "value": 1.0, "previous": -1.0, "delta": 2.0}])
+
+    assert await update_sentiment_deltas(db, today) == 6
+
+    up = await db.get_top_movers("sentiment", 1, direction="up", limit=2)
+    down = await db.get_top_movers("mentions", 1, direction="down", limit=1)
+    db.close()
+
+    assert [r["symbol"] for r in up] == ["BTC", "SOL"]
+    assert up[0]["delta"] == pytest.approx(0.5)
+    assert up[0]["date"] == today.isoformat()
+    assert [(r["symbol"], r["delta"]) for r in down] == [("ETH", -6)]
+
+
+@pytest.mark.asyncio
+async def test_refresh_deltas_after_rewrites_later_windows(tmp_path):
+    db = LocalDatabase(str(tmp_path / "movers.db"))
+    today = date(2024, 3, 10)
+    btc, _, _ = await seed(db, today)
+    await update_sentiment_deltas(db, today)
+
+    # A backfill rewrites yesterday; today's 1d delta depends on it
+    await db.upsert_coin_sentiments([sentiment_row(btc, today - timedelta(days=1), -0.4, 5)])
+    await refresh_deltas_after(db, today - timedelta(days=1), today=today)
+
+    top = await db.get_top_movers("sentiment", 1, limit=1)
+    db.close()
+    assert top[0]["symbol"] == "BTC"
+    assert top[0]["delta"] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_deltas_of_removed_rows_are_dropped(tmp_path):
+    db = LocalDatabase(str(tmp_path / "movers.db"))
+    today = date(2024, 3, 10)
+    btc, eth, sol = await seed(db, today)
+    await update_sentiment_deltas(db, today)
+
+    # A rewrite removed SOL's row for yesterday, so its 1d deltas no longer exist
+    sol_yesterday = db.conn.execute(
+        "SELECT id FROM coin_sentiment WHERE coin_id = ? AND date = ?", (sol, (today - timedelta(days=1)).isoformat())
+    ).fetchone()["id"]
+    await db.delete_rows_by_ids("coin_sentiment", [sol_yesterday])
+    assert await refresh_deltas_after(db, today - timedelta(days=1), today=today) == 4
+
+    movers = await db.get_top_movers("mentions", 1, direction="up", limit=10)
+    db.close()
+    assert sorted(r["symbol"] for r in movers) == ["BTC", "ETH"]
+
+
+@pytest.mark.asyncio
+async def test_supabase_deltas_and_top_movers(fake_supabase, monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "http://example")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "key")
+    db = Database()
+    today = date(2024, 3, 10)
+    await db.upsert_coin_sentiments([sentiment_row(1, today - timedelta(days=1), 0.1, 5), sentiment_row(1, today, 0.6, 9)])
+
+    await update_sentiment_deltas(db, today)
+    await update_sentiment_deltas(db, today)
+
+    stored = fake_supabase["coin_sentiment_deltas"]
+    assert sorted((r["metric"], r["delta"]) for r in stored) == [("mentions", 4.0), ("sentiment", 0.5)]
+    assert stored[0]["date"] == today.isoformat()
+
+    # The day's rows are replaced, not merged with stale ones
+    fake_supabase["coin_sentiment"] = [r for r in fake_supabase["coin_sentiment"] if r["date"] == today.isoformat()]
+    assert await update_sentiment_deltas(db, today) == 0
+    assert fake_supabase["coin_sentiment_deltas"] == []
+
+    fake_supabase["rpc:top_movers"] = [{"coin_id": 1, "symbol": "BTC"}]
+    assert await db.get_top_movers("mentions", 7, direction="down", limit=5) == [{"coin_id": 1, "symbol": "BTC"}]
+    assert fake_supabase["rpc_calls"][-1] == ("top_movers", {"p_metric": "mentions", "p_window_days": 7, "p_direction": "down", "p_limit": 5})
+
+
+@pytest.mark.asyncio
+async def test_movers_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "api.db"))
+    from backend import main
+
+    db = LocalDatabase(str(tmp_path / "pipeline.db"))
+    today = date.today()
+    await seed(db, today)
+    await update_sentiment_deltas(db, today)
+    monkeypatch.setattr(main, "db", db)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        response = await client.get("/api/movers?metric=sentiment&window=1d&limit=1")
+        empty = (await client.get("/api/movers?window=7d")).json()
+        assert (await client.get("/api/movers?metric=price")).status_code == 400
+        assert (await client.get("/api/movers?window=30d")).status_code == 400
+        assert (await client.get("/api/movers?direction=sideways")).status_code == 400
+    db.close()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["date"] == today.isoformat()
+    assert body["movers"][0]["symbol"] == "BTC"
+    assert body["movers"][0]["previous"] == pytest.approx(0.1)
+    assert empty == {"date": None, "metric": "sentiment", "window": "7d", "direction": "up", "movers": []}
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import tracemalloc
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.profiling import Profiler, install_request_profiling
+
+
+def busy_work():
+    total = 0
+    for i in range(50000):
+        total += i * i
+    return [str(i) for i in range(2000)], total
+
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = Profiler.from_env(None)
+    with profiler.stage("analyze_sentiment"):
+        busy_work()
+    assert not profiler.enabled
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stage_writes_profile_stacks_and_allocations(tmp_path):
+    profiler = Profiler(str(tmp_path), sample_interval=0.001)
+    with profiler.stage("analyze_sentiment", "run"):
+        busy_work()
+
+    files = sorted(os.listdir(tmp_path / "run"))
+    assert files == [
+        "001_analyze_sentiment.alloc.txt",
+        "001_analyze_sentiment.collapsed",
+        "001_analyze_sentiment.prof",
+        "001_analyze_sentiment.tracemalloc",
+    ]
+    collapsed = (tmp_path / "run" / "001_analyze_sentiment.collapsed").read_text()
+    assert "busy_work (test_profiling.py" in collapsed
+    assert collapsed.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+    assert tracemalloc.Snapshot.load(str(tmp_path / "run" / "001_analyze_sentiment.tracemalloc")).traces
+    # Tracing is only left on if it was on before the stage
+    assert not tracemalloc.is_tracing()
+
+
+def test_overlapping_stages_run_unprofiled(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    with profiler.stage("outer"):
+        with profiler.stage("inner"):
+            pass
+    assert sorted(os.listdir(tmp_path)) == [
+        "001_outer.alloc.txt", "001_outer.collapsed", "001_outer.prof", "001_outer.tracemalloc",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_request_profiling_samples_requests(tmp_path):
+    app = FastAPI()
+
+    @app.get("/api/coins/{coin_id}")
+    async def coin(coin_id: int):
+        await asyncio.sleep(0)
+        return {"id": coin_id}
+
+    install_request_profiling(app, Profiler(str(tmp_path), request_rate=1.0))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/coins/7")
+
+    assert response.json() == {"id": 7}
+    names = os.listdir(tmp_path / "requests")
+    assert len(names) == 4
+    assert all("GET_api_coins_7" in name for name in names)
+
+
+@pytest.mark.asyncio
+async def test_request_profile_covers_streamed_bodies_and_skips_event_streams(tmp_path):
+    import pstats
+
+    from fastapi.responses import StreamingResponse
+
+    app = FastAPI()
+
+    async def slow_chunks():
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            yield f"chunk{i}\n".encode()
+
+    @app.get("/export")
+    async def export():
+        return StreamingResponse(slow_chunks(), media_type="text/plain")
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(slow_chunks(), media_type="text/event-stream")
+
+    install_request_profiling(app, Profiler(str(tmp_path), request_rate=1.0))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/export")).text == "chunk0\nchunk1\nchunk2\n"
+        assert (await client.get("/stream", headers={"Accept": "text/event-stream"})).status_code == 200
+
+    names = sorted(os.listdir(tmp_path / "requests"))
+    assert len(names) == 4 and all("GET_export" in name for name in names)
+    base = tmp_path / "requests" / names[0].rsplit(".", 2)[0]
+    # The body was produced after the endpoint returned, and is still in the profile
+    assert any(func[2] == "slow_chunks" for func in pstats.Stats(f"{base}.prof").stats)
+    assert (tmp_path / "requests" / f"{base.name}.alloc.txt").read_text().startswith("# Whole-process profile")
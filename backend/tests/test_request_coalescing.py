@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from backend.local_database import LocalDatabase
+from backend.request_coalescing import RequestCoalescer
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_computation_then_the_cached_result():
+    coalescer = RequestCoalescer(ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["row"]
+
+    results = await asyncio.gather(*(coalescer.get(("coins",), compute) for _ in range(20)))
+    assert results == [["row"]] * 20
+    assert await coalescer.get(("coins",), compute) == ["row"]
+    assert len(calls) == 1
+    assert coalescer.stats() == {"hits": 1, "coalesced": 19, "misses": 1, "entries": 1, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_waiter_and_are_not_cached():
+    coalescer = RequestCoalescer(ttl=60)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("database down")
+        return "ok"
+
+    results = await asyncio.gather(*(coalescer.get("k", flaky) for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert await coalescer.get("k", flaky) == "ok"
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_expiry_lru_bound_and_cancelled_callers():
+    coalescer = RequestCoalescer(ttl=0.05, max_entries=2)
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    for key in ("a", "b", "a", "c"):
+        await coalescer.get(key, lambda key=key: compute(key))
+    # "b" was least recently used when "c" arrived
+    assert list(coalescer._results) == ["a", "c"]
+    await asyncio.sleep(0.06)
+    await coalescer.get("a", lambda: compute("a"))
+    assert calls == ["a", "b", "c", "a"]
+
+    first = asyncio.ensure_future(coalescer.get("slow", lambda: compute("slow")))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(coalescer.get("slow", lambda: compute("slow")))
+    first.cancel()
+    assert await second == "slow"
+
+
+@pytest.mark.asyncio
+async def test_api_burst_of_identical_requests_queries_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "api.db"))
+    from backend import main
+
+    db = LocalDatabase(str(tmp_path / "coalesce.db"))
+    coin_id = await db.insert_or_update_coin("bitcoin", "BTC", "Bitcoin")
+    await db.insert_article("Bitcoin rallies", "", "https://news.example/1", datetime(2025, 9, 24, tzinfo=timezone.utc))
+    queries = []
+    original = db.get_recent_articles_for_coin
+
+    async def counted(coin_id, limit=10):
+        queries.append((coin_id, limit))
+        await asyncio.sleep(0.02)
+        return await original(coin_id=coin_id, limit=limit)
+
+    db.get_recent_articles_for_coin = counted
+    monkeypatch.setattr(main, "db", db)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get(f"/api/coins/{coin_id}/articles?limit=5") for _ in range(25)))
+        other = await client.get(f"/api/coins/{coin_id}/articles?limit=1")
+
+    assert {r.status_code for r in responses} == {200}
+    assert all(r.json()[0]["title"] == "Bitcoin rallies" for r in responses)
+    assert other.status_code == 200
+    assert queries == [(coin_id, 5), (coin_id, 1)]
+    db.close()
@@ -0,0 +1,121 @@
+from datetime import date, datetime, timezone
+import pytest
+
+from backend.database import Database
+from backend.retention import enabled, run_retention, load_policies
+
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_purge_articles_deletes_in_bounded_batches(fake_supabase):
+    fake_supabase["articles"] = [
+        {"id": i, "title": f"a{i}", "link": f"u{i}", "published_date": "2024-01-01T00:00:00+00:00"}
+        for i in range(1, 8)
+    ]
+    fake_supabase["articles"].append({"id": 8, "title": "fresh", "link": "u8", "published_date": "2024-05-30T00:00:00+00:00"})
+
+    policies = {"articles": {"action": "delete", "days": 30}}
+    report = await run_retention(Database(), policies=policies, batch_size=3, now=NOW)
+
+    assert report == {"articles": {"deleted": 7}}
+    assert [a["id"] for a in fake_supabase["articles"]] == [8]
+
+
+@pytest.mark.asyncio
+async def test_downsample_collapses_old_weeks_and_keeps_recent_days(fake_supabase):
+    # 2024-01-01 is a Monday; the whole week is older than the cutoff
+    fake_supabase["coin_prices"] = [
+        {"id": 1, "coin_id": 1, "date": "2024-01-01", "price_usd": 100.0, "market_cap": 10.0},
+        {"id": 2, "coin_id": 1, "date": "2024-01-03", "price_usd": 200.0, "market_cap": None},
+        {"id": 3, "coin_id": 1, "date": "2024-01-07", "price_usd": 300.0, "market_cap": 30.0},
+        {"id": 4, "coin_id": 1, "date": "2024-05-31", "price_usd": 500.0, "market_cap": 50.0},
+    ]
+    fake_supabase["coin_sentiment"] = [
+        {"id": 1, "coin_id": 1, "date": "2024-01-02", "sentiment_score": 0.5, "mentions_count": 3, "no_mentions": False},
+        {"id": 2, "coin_id": 1, "date": "2024-01-04", "sentiment_score": -0.5, "mentions_count": 1, "no_mentions": False},
+        {"id": 3, "coin_id": 1, "date": "2024-01-05", "sentiment_score": None, "mentions_count": 0, "no_mentions": True},
+    ]
+
+    policies = {
+        "coin_prices": {"action": "downsample_weekly", "days": 30},
+        "coin_sentiment": {"action": "downsample_weekly", "days": 30},
+    }
+    report = await run_retention(Database(), policies=policies, batch_size=2, now=NOW)
+
+    assert report["coin_prices"] == {"weekly_rows": 1, "deleted": 2}
+    assert report["coin_sentiment"] == {"weekly_rows": 1, "deleted": 3}
+
+    prices = {p["date"]: p for p in fake_supabase["coin_prices"]}
+    assert set(prices) == {"2024-01-01", "2024-05-31"}
+    assert prices["2024-01-01"]["price_usd"] == pytest.approx(200.0)
+    assert prices["2024-01-01"]["market_cap"] == pytest.approx(20.0)
+
+    sentiment = fake_supabase["coin_sentiment"]
+    assert len(sentiment) == 1
+    assert sentiment[0]["date"] == "2024-01-01"
+    assert sentiment[0]["mentions_count"] == 4
+    assert sentiment[0]["sentiment_score"] == pytest.approx(0.25)
+
+    # Second run finds nothing left to compact
+    again = await run_retention(Database(), policies=policies, batch_size=2, now=NOW)
+    assert again["coin_prices"] == {"weekly_rows": 0, "deleted": 0}
+    assert again["coin_sentiment"] == {"weekly_rows": 0, "deleted": 0}
+
+
+def test_load_policies_zero_disables(monkeypatch):
+    monkeypatch.setenv("RETENTION_ARTICLES_DAYS", "0")
+    monkeypatch.setenv("RETENTION_PRICES_DAILY_DAYS", "365")
+
+    policies = load_policies()
+
+    assert policies["articles"]["days"] is None
+    assert policies["coin_prices"]["days"] == 365
+
+
+@pytest.mark.asyncio
+async def test_routine_runs_only_read_the_lookback_window(fake_supabase):
+    # 2024-01-01 and 2024-04-01 are Mondays; with days=30 the cutoff is 2024-04-29
+    fake_supabase["coin_prices"] = [
+        {"id": 1, "coin_id": 1, "date": "2024-01-01", "price_usd": 100.0, "market_cap": None},
+        {"id": 2, "coin_id": 1, "date": "2024-01-02", "price_usd": 300.0, "market_cap": None},
+        {"id": 3, "coin_id": 1, "date": "2024-04-01", "price_usd": 100.0, "market_cap": None},
+        {"id": 4, "coin_id": 1, "date": "2024-04-03", "price_usd": 300.0, "market_cap": None},
+    ]
+    policies = {"coin_prices": {"action": "downsample_weekly", "days": 30, "lookback_days": 28}}
+
+    report = await run_retention(Database(), policies=policies, now=NOW)
+    assert report["coin_prices"] == {"weekly_rows": 1, "deleted": 1}
+    assert [p["date"] for p in fake_supabase["coin_prices"]] == ["2024-01-01", "2024-01-02", "2024-04-01"]
+
+    # A full run also compacts the history the routine runs no longer read
+    report = await run_retention(Database(), policies=policies, now=NOW, full=True)
+    assert report["coin_prices"] == {"weekly_rows": 1, "deleted": 1}
+    assert [p["date"] for p in fake_supabase["coin_prices"]] == ["2024-01-01", "2024-04-01"]
+
+
+def test_retention_is_off_unless_enabled(monkeypatch):
+    monkeypatch.delenv("RETENTION_ENABLED", raising=False)
+    assert not enabled()
+    monkeypatch.setenv("RETENTION_ENABLED", "1")
+    assert enabled()
+    assert load_policies()["coin_sentiment"]["lookback_days"] == 28
+
+
+@pytest.mark.asyncio
+async def test_feed_archive_days_older_than_the_window_are_removed(tmp_path):
+    from backend.feed_archive import FeedArchive
+
+    archive = FeedArchive(str(tmp_path))
+    for day in (1, 9, 10):
+        archive.put("https://a.example/rss", b"<rss/>", fetched_at=datetime(2025, 9, day, tzinfo=timezone.utc))
+    policies = {"feed_archive": {"action": "prune_days", "days": 5, "path": str(tmp_path)}}
+
+    report = await run_retention(None, policies=policies, now=datetime(2025, 9, 14, tzinfo=timezone.utc))
+
+    assert report["feed_archive"] == {"deleted_days": 1}
+    assert archive.days() == [date(2025, 9, 9), date(2025, 9, 10)]
+    # The writer forgets the pruned day and can archive into a fresh one
+    archive.put("https://a.example/rss", b"<rss/>", fetched_at=datetime(2025, 9, 14, tzinfo=timezone.utc))
+    assert archive.stats(date(2025, 9, 14))["bodies"] == 1
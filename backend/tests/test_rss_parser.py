@@ -1,8 +1,9 @@
 from datetime import datetime, timezone, timedelta
+import time
 import types
 import pytest
 
-from backend.rss_parser import RSSParser
+from backend.rss_parser import RSSParser, fetch_feed
 
 
 def make_entry(title="T", link="L", summary="S", dt=None, use_updated=False):
@@ -33,6 +34,7 @@ def test_parse_feed_includes_recent_entries_and_skips_old(monkeypatch):
     def fake_parse(url):
         return FakeFeed([recent, old])
 
+    monkeypatch.setattr("backend.rss_parser.fetch_feed", lambda url: url)
     monkeypatch.setattr("backend.rss_parser.feedparser.parse", lambda url: fake_parse(url))
 
     parser = RSSParser()
@@ -42,6 +44,7 @@ def test_parse_feed_includes_recent_entries_and_skips_old(monkeypatch):
     assert articles[0]["title"] == "Recent"
     assert articles[0]["link"] == "L"
     assert isinstance(articles[0]["published_date"], datetime)
+    assert articles[0]["clean_text"] == "Recent S"
 
 
 def test_parse_feed_uses_updated_when_no_published(monkeypatch):
@@ -53,6 +56,7 @@ def test_parse_feed_uses_updated_when_no_published(monkeypatch):
     def fake_parse(url):
         return FakeFeed([updated_only])
 
+    monkeypatch.setattr("backend.rss_parser.fetch_feed", lambda url: url)
     monkeypatch.setattr("backend.rss_parser.feedparser.parse", lambda url: fake_parse(url))
 
     parser = RSSParser()
@@ -68,6 +72,7 @@ def test_parse_feed_gracefully_handles_missing_title(monkeypatch):
     def fake_parse(url):
         return FakeFeed([e])
 
+    monkeypatch.setattr("backend.rss_parser.fetch_feed", lambda url: url)
     monkeypatch.setattr("backend.rss_parser.feedparser.parse", lambda url: fake_parse(url))
 
     parser = RSSParser()
@@ -84,6 +89,7 @@ def test_parse_all_feeds_aggregates_and_sleeps_is_noop(monkeypatch):
     def fake_parse(url):
         return FakeFeed([make_entry(title=url)])
 
+    monkeypatch.setattr("backend.rss_parser.fetch_feed", lambda url: url)
     monkeypatch.setattr("backend.rss_parser.feedparser.parse", lambda url: fake_parse(url))
     monkeypatch.setattr("backend.rss_parser.time.sleep", lambda s: None)
 
@@ -91,3 +97,57 @@ def test_parse_all_feeds_aggregates_and_sleeps_is_noop(monkeypatch):
 
     assert len(articles) == 2
     assert set(a["title"] for a in articles) == {"a", "b"}
+
+
+class FakeResponse:
+    def __init__(self, chunks, delay=0.0, status=200):
+        self.chunks = chunks
+        self.delay = delay
+        self.status = status
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    def iter_content(self, size):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield chunk
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(kwargs)
+        return self.response
+
+
+def test_fetch_feed_passes_timeouts_and_bounds_total_time():
+    session = FakeSession(FakeResponse([b"<rss>", b"</rss>"]))
+    assert fetch_feed("http://example.com/rss", session, connect_timeout=2, read_timeout=3) == b"<rss></rss>"
+    assert session.calls[0]["timeout"] == (2, 3)
+
+    # Each chunk arrives within the read timeout, but the whole body is too slow
+    slow = FakeSession(FakeResponse([b"x"] * 10, delay=0.02))
+    with pytest.raises(TimeoutError):
+        fetch_feed("http://example.com/rss", slow, max_seconds=0.05)
+
+    with pytest.raises(ValueError):
+        fetch_feed("http://example.com/rss", FakeSession(FakeResponse([b"x" * 10] * 3)), max_bytes=25)
+
+
+def test_parse_feed_returns_nothing_when_download_fails(monkeypatch):
+    def hanging(url):
+        raise TimeoutError("read timed out")
+
+    monkeypatch.setattr("backend.rss_parser.fetch_feed", hanging)
+    assert RSSParser().parse_feed("http://example.com/rss") == []
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+import pytest
+
+from backend.benchmarks.source_fanout import run_fanout
+from backend.rss_parser import RSSParser
+from backend.source_registry import read_registry
+from backend.sources import (
+    FixtureTransport, RecordingTransport, RSSSource, RedditSource, SourceLimit,
+    SourceScheduler, TrendsSource, load_sources,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "sources")
+REGISTRY = os.path.join(FIXTURES, "registry.csv")
+
+
+def test_registry_skips_disabled_rows_and_reads_legacy_feed_list(tmp_path):
+    rows = read_registry(REGISTRY)
+    assert [r["kind"] for r in rows] == ["rss", "rss", "reddit", "trends"]
+
+    legacy = tmp_path / "feeds.csv"
+    legacy.write_text("feed_url\nhttps://a.example/rss\nhttps://b.example/rss\n")
+    assert read_registry(str(legacy)) == [{"kind": "rss", "url": "https://a.example/rss"}, {"kind": "rss", "url": "https://b.example/rss"}]
+
+
+def test_rss_parser_feeds_come_from_registry():
+    feeds = RSSParser().feeds
+    assert "https://www.coindesk.com/arc/outboundfeeds/rss/" in feeds
+    assert "https://cointelegraph.com/rss" in feeds
+    assert not any("reddit.com" in url for url in feeds)
+
+
+def test_recorded_sources_parse_to_normalized_articles():
+    sources = load_sources(REGISTRY, max_age=None)
+    assert [type(s) for s in sources] == [RSSSource, RSSSource, RedditSource, TrendsSource]
+
+    transport = FixtureTransport(FIXTURES)
+    coindesk, _, reddit, trends = (s.fetch(transport) for s in sources)
+
+    assert coindesk[0]["title"] == "Bitcoin Climbs Past $115K as ETF Inflows Accelerate"
+    assert "<p>" not in coindesk[0]["clean_text"]
+    # The stickied daily thread is not an article
+    assert len(reddit) == 3
+    assert reddit[0]["link"].startswith("https://www.reddit.com/r/CryptoCurrency/comments/")
+    assert reddit[0]["published_date"].tzinfo is not None
+    assert trends[0]["title"] == "bitcoin price"
+    assert trends[0]["link"] == "https://example-news.com/markets/bitcoin-price-tops-115000"
+    assert trends[0]["summary"].startswith("Bitcoin price tops")
+
+    # Recorded payloads are old; the default age window drops them
+    assert load_sources(REGISTRY)[0].fetch(transport) == []
+
+
+@pytest.mark.asyncio
+async def test_scheduler_fans_out_and_isolates_failures():
+    sources = load_sources(REGISTRY, max_age=None) + [RSSSource("https://missing.example/rss", max_age=None)]
+    scheduler = SourceScheduler(FixtureTransport(FIXTURES), limits={"reddit": SourceLimit(1), "trends": SourceLimit(1)})
+    try:
+        articles = await scheduler.fetch_all(sources)
+    finally:
+        scheduler.close()
+
+    assert len(articles) == 10
+    # Source order is kept regardless of completion order
+    assert articles[0]["link"].startswith("https://www.coindesk.com/")
+    assert articles[-1]["title"] == "ethereum"
+
+
+class SlowTransport:
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.starts = []
+
+    def get(self, url):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.starts.append(time.monotonic())
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return b'{"data": {"children": []}}'
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_scheduler_applies_per_kind_concurrency_and_spacing():
+    capped = SlowTransport(0.05)
+    scheduler = SourceScheduler(capped, limits={"reddit": SourceLimit(concurrency=2)})
+    await scheduler.fetch_all([RedditSource(f"https://r.example/{i}") for i in range(6)])
+    scheduler.close()
+    assert capped.peak == 2
+
+    spaced = SlowTransport(0.0)
+    scheduler = SourceScheduler(spaced, limits={"reddit": SourceLimit(concurrency=4, min_interval=0.05)})
+    await scheduler.fetch_all([RedditSource(f"https://r.example/{i}") for i in range(4)])
+    scheduler.close()
+    gaps = [b - a for a, b in zip(spaced.starts, spaced.starts[1:])]
+    assert min(gaps) >= 0.04
+
+
+def test_recording_transport_writes_replayable_fixtures(tmp_path):
+    url = "https://www.reddit.com/r/CryptoCurrency/new.json?limit=100"
+    recorder = RecordingTransport(FixtureTransport(FIXTURES), str(tmp_path))
+    body = recorder.get(url)
+    assert FixtureTransport(str(tmp_path)).get(url) == body
+
+
+def test_fanout_benchmark_matches_sequential_pass():
+    result = run_fanout(FIXTURES, copies=2, latency=0.01)
+    assert result["sources"] == 8
+    assert result["articles"] == result["sequential_articles"] == 20
+    assert result["speedup"] > 1
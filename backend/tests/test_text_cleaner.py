@@ -0,0 +1,46 @@
+from datetime import date
+
+from backend.sentiment_analyzer import SentimentAnalyzer
+from backend.text_cleaner import article_text, clean_html
+
+
+def test_clean_html_strips_tags_scripts_and_decodes_entities():
+    raw = (
+        "<p>Bitcoin&nbsp;jumps &amp; <b>ETH</b>\n follows</p>"
+        "<script>var x = '<p>bitcoin</p>';</script><!-- tracking -->"
+        "<p>Use &lt;b&gt; for bold</p>"
+    )
+    assert clean_html(raw) == "Bitcoin jumps & ETH follows Use <b> for bold"
+    assert clean_html(None) == ""
+
+
+def test_clean_html_truncates_on_a_word_boundary():
+    assert clean_html("alpha beta gamma", max_length=12) == "alpha beta"
+    assert clean_html("abcdefghij", max_length=4) == "abcd"
+    assert clean_html("alpha beta", max_length=0) == "alpha beta"
+
+
+def test_article_text_is_cached_on_the_article():
+    article = {"title": "Bitcoin", "summary": "<div>rallies</div>"}
+    assert article_text(article) == "Bitcoin rallies"
+    assert article["clean_text"] == "Bitcoin rallies"
+
+    article["summary"] = "changed"
+    assert article_text(article) == "Bitcoin rallies"
+
+
+def test_markup_does_not_change_mentions_or_scores():
+    coins = [{"id": 1, "coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin"}]
+    plain = [{"title": "Bitcoin rallies", "summary": "A great day for BTC holders"}]
+    marked_up = [{
+        "title": "Bitcoin rallies",
+        "summary": '<p>A <a href="https://example.com/btc">great</a> day for <strong>BTC</strong> holders</p>'
+                   '<img src="https://example.com/bitcoin-chart.png" alt="bitcoin chart">',
+    }]
+
+    analyzer = SentimentAnalyzer()
+    expected = analyzer.analyze_articles_for_coins(plain, coins, date(2024, 1, 1))[1]
+    cleaned = analyzer.analyze_articles_for_coins(marked_up, coins, date(2024, 1, 1))[1]
+
+    assert cleaned["total_mentions"] == expected["total_mentions"] == 2
+    assert cleaned["sentiment_score"] == expected["sentiment_score"]
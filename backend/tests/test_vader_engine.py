@@ -0,0 +1,65 @@
+from datetime import date
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from backend.benchmarks.sentiment_engine import build_corpus, run_benchmark
+from backend.sentiment_analyzer import SentimentAnalyzer
+from backend.vader_engine import VaderEngine
+
+# The reference's own examples, covering each of its rules
+RULE_EXAMPLES = [
+    "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "At least it isn't a horrible book.",
+    "The book was only kind of good.",
+    "The plot was good, but the characters are uncompelling and the dialog is not great.",
+    "Today only kinda sux! But I'll get by, lol",
+    "Make sure you :) or :D today!",
+    "Catch utf-8 emoji such as 💘 and 💋 and 😁",
+    "Sentiment analysis has never been this good!",
+    "With VADER, sentiment analysis is the shit!",
+    "On the other hand, VADER is quite bad ass",
+    "Without a doubt, excellent idea.",
+    "Roger Dodger is one of the least compelling variations on this theme.",
+    "no good no bad no",
+    "Is it good?? Is it great???",
+    "",
+]
+
+
+def test_compound_scores_match_the_reference():
+    reference = SentimentIntensityAnalyzer()
+    engine = VaderEngine()
+    for text in RULE_EXAMPLES + build_corpus(3000, seed=11):
+        assert engine.compound(text) == reference.polarity_scores(text)["compound"], text
+
+
+def test_caches_are_bounded_and_keep_scores_stable():
+    engine = VaderEngine(cache_size=2)
+    first = engine.compound_many(["Bitcoin rally is great", "ETF outflows are bad", "Bitcoin rally is great"])
+    assert first[0] == first[2] > 0 > first[1]
+
+    engine.compound("Whales sell")
+    assert len(engine._scores) == 2
+    # The repeated text was used more recently, so the other one is evicted
+    assert set(engine._scores) == {"Bitcoin rally is great", "Whales sell"}
+    assert len(engine._tokens) <= 2
+    assert engine.compound("Bitcoin rally is great") == first[0]
+
+
+def test_analyzer_engines_agree_on_article_aggregates():
+    coins = [{"id": 1, "coingecko_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin"},
+             {"id": 2, "coingecko_id": "ethereum", "symbol": "ETH", "name": "Ethereum"}]
+    articles = [{"title": text, "summary": ""} for text in build_corpus(200, seed=3) if text]
+    articles += [{"title": "Bitcoin and ETH rally as ETF demand is great", "summary": "BTC whales are happy"}]
+
+    fast = SentimentAnalyzer(engine="fast").analyze_articles_for_coins(articles, coins, date(2025, 9, 24))
+    reference = SentimentAnalyzer(engine="vader").analyze_articles_for_coins(articles, coins, date(2025, 9, 24))
+    assert fast == reference
+    assert fast[1]["total_mentions"] > 0
+
+
+def test_benchmark_reports_no_mismatches():
+    result = run_benchmark(build_corpus(300))
+    assert result["texts"] == 300
+    assert result["mismatches"] == 0
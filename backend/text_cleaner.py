@@ -0,0 +1,45 @@
+import html
+import os
+import re
+from typing import Dict, Any, Optional
+
+# Full-article summaries (bitcoinmagazine's .rss/full/) run to tens of KB; the
+# lead paragraphs carry the sentiment, the rest only costs regex and VADER time
+DEFAULT_MAX_TEXT_LENGTH = int(os.getenv("RSS_MAX_TEXT_LENGTH", 2000))
+
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+
+def clean_html(text: Optional[str], max_length: Optional[int] = None) -> str:
+    """Strip markup, decode entities and collapse whitespace.
+
+    Tags are removed before entities are decoded so an escaped "&lt;b&gt;" in
+    the copy stays text. The result is cut to max_length characters on a word
+    boundary (0 or None disables the limit).
+    """
+    if not text:
+        return ""
+    if "<" in text:
+        text = _SCRIPT_STYLE_RE.sub(" ", text)
+        text = _COMMENT_RE.sub(" ", text)
+        text = _TAG_RE.sub(" ", text)
+    if "&" in text:
+        text = html.unescape(text)
+    text = _WS_RE.sub(" ", text).strip()
+
+    if max_length and len(text) > max_length:
+        cut = text.rfind(" ", 0, max_length + 1)
+        text = text[:cut if cut > 0 else max_length]
+    return text
+
+
+def article_text(article: Dict[str, Any], max_length: Optional[int] = DEFAULT_MAX_TEXT_LENGTH) -> str:
+    """Cleaned "title summary" text of an article, cached on the article as clean_text"""
+    text = article.get("clean_text")
+    if text is None:
+        text = clean_html(f"{article.get('title', '')} {article.get('summary', '') or ''}", max_length)
+        article["clean_text"] = text
+    return text
@@ -0,0 +1,231 @@
+import math
+import os
+import string
+from typing import List, Dict, Optional, Tuple
+
+from vaderSentiment import vaderSentiment as reference
+
+LEXICON_DIR = os.path.dirname(os.path.abspath(reference.__file__))
+
+NEGATE = frozenset(reference.NEGATE)
+BOOSTER_DICT = reference.BOOSTER_DICT
+SPECIAL_CASES = reference.SPECIAL_CASES
+N_SCALAR = reference.N_SCALAR
+C_INCR = reference.C_INCR
+
+# Words that can take part in a special-case idiom or a multi-word booster;
+# a text containing none of them skips the n-gram checks entirely
+IDIOM_WORDS = frozenset(
+    word
+    for phrase in list(SPECIAL_CASES) + [p for p in BOOSTER_DICT if " " in p]
+    for word in phrase.split()
+)
+
+DEFAULT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", 50000))
+
+# (token, lower, isupper, lexicon valence or None, booster scalar or None, negation word)
+Token = Tuple[str, str, bool, Optional[float], Optional[float], bool]
+
+
+def _read_table(filename: str) -> List[Tuple[str, str]]:
+    with open(os.path.join(LEXICON_DIR, filename), encoding="utf-8") as f:
+        lines = f.read().rstrip("\n").split("\n")
+    return [tuple(line.strip().split("\t")[0:2]) for line in lines if line]
+
+
+class VaderEngine:
+    """Compound-score-only reimplementation of vaderSentiment's polarity_scores.
+
+    Uses the reference lexicon, booster, negation and idiom tables, applies
+    the same rules in the same order (so scores match the reference), but
+    looks every whitespace token up once: its stripped form, lowercase,
+    valence, booster scalar and negation flag are cached per distinct
+    token. Whole texts are cached too, so an article carried by several
+    feeds is scored once. Both caches are bounded by cache_size entries.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.lexicon: Dict[str, float] = {word: float(measure) for word, measure in _read_table("vader_lexicon.txt")}
+        self.emojis: Dict[str, str] = dict(_read_table("emoji_utf8_lexicon.txt"))
+        self._emoji_chars = frozenset(self.emojis)
+        self.cache_size = cache_size
+        self._tokens: Dict[str, Token] = {}
+        self._scores: Dict[str, float] = {}
+
+    def _token(self, raw: str) -> Token:
+        token = self._tokens.get(raw)
+        if token is None:
+            stripped = raw.strip(string.punctuation)
+            # Two characters or fewer once stripped: probably an emoticon, keep it whole
+            word = raw if len(stripped) <= 2 else stripped
+            lower = word.lower()
+            token = (word, lower, word.isupper(), self.lexicon.get(lower), BOOSTER_DICT.get(lower),
+                     lower in NEGATE or "n't" in lower)
+            if len(self._tokens) >= self.cache_size:
+                self._tokens.clear()
+            self._tokens[raw] = token
+        return token
+
+    def _replace_emojis(self, text: str) -> str:
+        out = []
+        prev_space = True
+        for ch in text:
+            description = self.emojis.get(ch)
+            if description is not None:
+                if not prev_space:
+                    out.append(" ")
+                out.append(description)
+                prev_space = False
+            else:
+                out.append(ch)
+                prev_space = ch == " "
+        return "".join(out)
+
+    def compound(self, text: str) -> float:
+        """The reference's compound score for text, in [-1, 1]"""
+        if not text:
+            return 0.0
+        score = self._scores.pop(text, None)
+        if score is None:
+            score = self._compound(text)
+            if len(self._scores) >= self.cache_size:
+                del self._scores[next(iter(self._scores))]
+        # Reinserted so the dict's order is least recently used first
+        self._scores[text] = score
+        return score
+
+    def compound_many(self, texts: List[str]) -> List[float]:
+        return [self.compound(text) for text in texts]
+
+    def _compound(self, text: str) -> float:
+        if not text.isascii() and not self._emoji_chars.isdisjoint(text):
+            text = self._replace_emojis(text)
+        text = text.strip()
+        tokens = [self._token(raw) for raw in text.split()]
+        if not tokens:
+            return 0.0
+
+        n = len(tokens)
+        uppers = sum(1 for token in tokens if token[2])
+        is_cap_diff = 0 < n - uppers < n
+        lowers = [token[1] for token in tokens]
+        idioms = not IDIOM_WORDS.isdisjoint(lowers)
+
+        sentiments: List[float] = []
+        for i, (_word, lower, upper, lex, boost, _neg) in enumerate(tokens):
+            if lex is None or boost is not None or (lower == "kind" and i < n - 1 and lowers[i + 1] == "of"):
+                sentiments.append(0)
+                continue
+
+            valence = lex
+            # "no" before another lexicon word negates it instead of scoring itself
+            if lower == "no" and i != n - 1 and tokens[i + 1][3] is not None:
+                valence = 0.0
+            if (i > 0 and lowers[i - 1] == "no") or (i > 1 and lowers[i - 2] == "no") \
+                    or (i > 2 and lowers[i - 3] == "no" and lowers[i - 1] in ("or", "nor")):
+                valence = lex * N_SCALAR
+            if upper and is_cap_diff:
+                valence = valence + C_INCR if valence > 0 else valence - C_INCR
+
+            for start_i in range(3):
+                if i <= start_i:
+                    break
+                previous = tokens[i - (start_i + 1)]
+                if previous[3] is not None:
+                    continue
+                if previous[4] is not None:
+                    scalar = -previous[4] if valence < 0 else previous[4]
+                    if previous[2] and is_cap_diff:
+                        scalar = scalar + C_INCR if valence > 0 else scalar - C_INCR
+                    if start_i == 1:
+                        scalar = scalar * 0.95
+                    elif start_i == 2:
+                        scalar = scalar * 0.9
+                    valence = valence + scalar
+                valence = self._negation_check(valence, tokens, lowers, start_i, i)
+                if start_i == 2 and idioms:
+                    valence = self._special_idioms_check(valence, lowers, i)
+
+            if i > 1 and tokens[i - 1][3] is None and lowers[i - 1] == "least":
+                if lowers[i - 2] != "at" and lowers[i - 2] != "very":
+                    valence = valence * N_SCALAR
+            elif i > 0 and tokens[i - 1][3] is None and lowers[i - 1] == "least":
+                valence = valence * N_SCALAR
+            sentiments.append(valence)
+
+        if "but" in lowers:
+            self._but_check(sentiments, lowers.index("but"))
+
+        sum_s = float(sum(sentiments))
+        if sum_s:
+            emphasis = self._punctuation_emphasis(text)
+            sum_s = sum_s + emphasis if sum_s > 0 else sum_s - emphasis
+        compound = sum_s / math.sqrt(sum_s * sum_s + 15)
+        return round(max(-1.0, min(1.0, compound)), 4)
+
+    @staticmethod
+    def _negation_check(valence: float, tokens: List[Token], lowers: List[str], start_i: int, i: int) -> float:
+        if start_i == 0:
+            if tokens[i - 1][5]:
+                valence = valence * N_SCALAR
+        elif start_i == 1:
+            if lowers[i - 2] == "never" and (lowers[i - 1] == "so" or lowers[i - 1] == "this"):
+                valence = valence * 1.25
+            elif lowers[i - 2] == "without" and lowers[i - 1] == "doubt":
+                pass
+            elif tokens[i - 2][5]:
+                valence = valence * N_SCALAR
+        else:
+            if (lowers[i - 3] == "never" and (lowers[i - 2] == "so" or lowers[i - 2] == "this")) \
+                    or (lowers[i - 1] == "so" or lowers[i - 1] == "this"):
+                valence = valence * 1.25
+            elif lowers[i - 3] == "without" and (lowers[i - 2] == "doubt" or lowers[i - 1] == "doubt"):
+                pass
+            elif tokens[i - 3][5]:
+                valence = valence * N_SCALAR
+        return valence
+
+    @staticmethod
+    def _special_idioms_check(valence: float, lowers: List[str], i: int) -> float:
+        onezero = f"{lowers[i - 1]} {lowers[i]}"
+        twoonezero = f"{lowers[i - 2]} {lowers[i - 1]} {lowers[i]}"
+        twoone = f"{lowers[i - 2]} {lowers[i - 1]}"
+        threetwoone = f"{lowers[i - 3]} {lowers[i - 2]} {lowers[i - 1]}"
+        threetwo = f"{lowers[i - 3]} {lowers[i - 2]}"
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASES:
+                valence = SPECIAL_CASES[seq]
+                break
+        if len(lowers) - 1 > i:
+            zeroone = f"{lowers[i]} {lowers[i + 1]}"
+            if zeroone in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroone]
+        if len(lowers) - 1 > i + 1:
+            zeroonetwo = f"{lowers[i]} {lowers[i + 1]} {lowers[i + 2]}"
+            if zeroonetwo in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroonetwo]
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in BOOSTER_DICT:
+                valence = valence + BOOSTER_DICT[n_gram]
+        return valence
+
+    @staticmethod
+    def _but_check(sentiments: List[float], but_index: int):
+        # The reference rescales the first entry equal to each value, not the
+        # entry itself; kept as-is so repeated valences score identically
+        for position in range(len(sentiments)):
+            sentiment = sentiments[position]
+            si = sentiments.index(sentiment)
+            if si < but_index:
+                sentiments[si] = sentiment * 0.5
+            elif si > but_index:
+                sentiments[si] = sentiment * 1.5
+
+    @staticmethod
+    def _punctuation_emphasis(text: str) -> float:
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        return ep_count * 0.292 + qm_amplifier
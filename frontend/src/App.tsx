@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 import CoinTable from './components/CoinTable';
-import { fetchCoins } from './lib/api';
+import { applyCoinUpdate, fetchCoins, subscribeCoinUpdates } from './lib/api';
 import { Coin } from './types/coin';
 
 function App() {
@@ -27,6 +27,22 @@ function App() {
     loadCoins();
   }, []);
 
+  useEffect(() => {
+    // Live diffs replace polling: the server pushes only coins that changed
+    if (typeof EventSource === 'undefined') return;
+
+    return subscribeCoinUpdates(
+      (snapshot) => {
+        setCoins(snapshot);
+        setLastUpdated(new Date().toLocaleString());
+      },
+      (update) => {
+        setCoins((current) => applyCoinUpdate(current, update));
+        setLastUpdated(new Date().toLocaleString());
+      },
+    );
+  }, []);
+
 
   return (
     <div className="min-h-screen bg-gray-100">
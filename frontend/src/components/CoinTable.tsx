@@ -1,7 +1,11 @@
 import { useEffect, useRef, useState } from 'react';
-import { fetchCoinArticles, type ArticleSummary } from '../lib/api';
+import { fetchCoinArticles, fetchRecentArticles, type ArticleSummary } from '../lib/api';
 import { Coin, SortColumn, SortState } from '../types/coin';
 
+// Rows at the top of the table whose articles are prefetched in one request
+const PREFETCH_ROWS = 25;
+const ARTICLES_PER_COIN = 10;
+
 interface CoinTableProps {
   coins: Coin[];
   loading?: boolean;
@@ -16,6 +20,7 @@ export default function CoinTable({ coins, loading = false }: CoinTableProps) {
   const [openCoinId, setOpenCoinId] = useState<number | null>(null);
   const [articlesByCoin, setArticlesByCoin] = useState<Record<number, { loading: boolean; error?: string; items: ArticleSummary[] }>>({});
   const containerRef = useRef<HTMLDivElement | null>(null);
+  const prefetchedRef = useRef<Set<number>>(new Set());
 
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
@@ -162,7 +167,7 @@ export default function CoinTable({ coins, loading = false }: CoinTableProps) {
     if (!articlesByCoin[coinId]) {
       setArticlesByCoin(prev => ({ ...prev, [coinId]: { loading: true, items: [] } }));
       try {
-        const items = await fetchCoinArticles(coinId, 10);
+        const items = await fetchCoinArticles(coinId, ARTICLES_PER_COIN);
         setArticlesByCoin(prev => ({ ...prev, [coinId]: { loading: false, items } }));
       } catch (e) {
         setArticlesByCoin(prev => ({ ...prev, [coinId]: { loading: false, items: [], error: 'Failed to load articles' } }));
@@ -170,6 +175,37 @@ export default function CoinTable({ coins, loading = false }: CoinTableProps) {
     }
   };
 
+  // Prefetch the articles of the visible rows with mentions, so expanding one needs no request
+  const visibleCoinIds = sortedCoins
+    .slice(0, PREFETCH_ROWS)
+    .filter((coin) => coin.mentions_count > 0)
+    .map((coin) => coin.coin_id);
+  const visibleKey = visibleCoinIds.join(',');
+
+  useEffect(() => {
+    const missing = visibleCoinIds.filter((coinId) => !prefetchedRef.current.has(coinId));
+    if (!missing.length) return;
+    missing.forEach((coinId) => prefetchedRef.current.add(coinId));
+    fetchRecentArticles(missing, ARTICLES_PER_COIN)
+      .then((byCoin) => {
+        setArticlesByCoin(prev => {
+          const next = { ...prev };
+          for (const coinId of missing) {
+            // Keep anything toggleArticles already loaded
+            if (!next[coinId] || next[coinId].error) {
+              next[coinId] = { loading: false, items: byCoin[coinId] ?? [] };
+            }
+          }
+          return next;
+        });
+      })
+      .catch(() => {
+        // Expanding a row falls back to fetching that coin alone
+        missing.forEach((coinId) => prefetchedRef.current.delete(coinId));
+      });
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [visibleKey]);
+
   if (loading) {
     return (
       <div className="flex justify-center items-center py-12">
@@ -3,7 +3,7 @@ jest.mock('./env', () => ({
   API_BASE_URL: 'http://localhost:8000',
 }));
 
-import { fetchCoins, fetchCoinDetails, fetchCoinArticles } from './api';
+import { fetchCoins, fetchCoinDetails, fetchCoinArticles, fetchRecentArticles, applyCoinUpdate, subscribeCoinUpdates } from './api';
 import type { Coin } from '../types/coin';
 
 describe('API lib', () => {
@@ -103,4 +103,82 @@ describe('API lib', () => {
       await expect(fetchCoinArticles(1)).rejects.toThrow('Failed to fetch coin articles');
     });
   });
+
+  describe('fetchRecentArticles', () => {
+    it('returns articles keyed by numeric coin id', async () => {
+      const article = { id: 1, title: 'A', summary: 's', link: 'http://a', published_date: '2024-01-01T00:00:00Z' };
+
+      (global.fetch as jest.Mock).mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        json: jest.fn().mockResolvedValueOnce({ limit: 5, articles: { '1': [article], '2': [] } }),
+      } as any);
+
+      const result = await fetchRecentArticles([1, 2], 5);
+      expect(result).toEqual({ 1: [article], 2: [] });
+      expect(global.fetch).toHaveBeenCalledWith(
+        expect.stringMatching(/\/api\/articles\/recent\?coin_ids=1%2C2&limit=5$/),
+        expect.objectContaining({ method: 'GET' })
+      );
+    });
+
+    it('throws a friendly error on non-OK response', async () => {
+      (global.fetch as jest.Mock).mockResolvedValueOnce({ ok: false, status: 400 } as any);
+      await expect(fetchRecentArticles([1])).rejects.toThrow('Failed to fetch recent articles');
+    });
+  });
+
+  describe('applyCoinUpdate', () => {
+    const coin = (coin_id: number, sentiment_score: number | null): Coin => ({
+      coin_id,
+      coingecko_id: `coin-${coin_id}`,
+      symbol: `C${coin_id}`,
+      name: `Coin ${coin_id}`,
+      price_usd: 1,
+      market_cap: 1,
+      sentiment_score,
+      mentions_count: 0,
+      no_mentions: sentiment_score === null,
+    });
+
+    it('replaces changed coins, appends new ones and drops removed ones', () => {
+      const current = [coin(1, 0.1), coin(2, 0.2), coin(3, 0.3)];
+
+      const result = applyCoinUpdate(current, {
+        version: 2,
+        changed: [coin(2, -0.5), coin(4, 0.4)],
+        removed: [3],
+      });
+
+      expect(result).toEqual([coin(1, 0.1), coin(2, -0.5), coin(4, 0.4)]);
+      expect(current).toHaveLength(3);
+    });
+  });
+
+  describe('subscribeCoinUpdates', () => {
+    it('dispatches snapshot and update events and closes the stream', () => {
+      const listeners: Record<string, (event: { data: string }) => void> = {};
+      const close = jest.fn();
+      const FakeEventSource = jest.fn().mockImplementation(() => ({
+        addEventListener: (name: string, handler: (event: { data: string }) => void) => {
+          listeners[name] = handler;
+        },
+        close,
+      }));
+      (global as any).EventSource = FakeEventSource;
+
+      const onSnapshot = jest.fn();
+      const onUpdate = jest.fn();
+      const unsubscribe = subscribeCoinUpdates(onSnapshot, onUpdate);
+
+      expect(FakeEventSource).toHaveBeenCalledWith('http://localhost:8000/api/coins/stream');
+      listeners.snapshot({ data: JSON.stringify({ version: 1, coins: [{ coin_id: 1 }] }) });
+      listeners.update({ data: JSON.stringify({ version: 2, changed: [], removed: [1] }) });
+      unsubscribe();
+
+      expect(onSnapshot).toHaveBeenCalledWith([{ coin_id: 1 }]);
+      expect(onUpdate).toHaveBeenCalledWith({ version: 2, changed: [], removed: [1] });
+      expect(close).toHaveBeenCalled();
+    });
+  });
 });
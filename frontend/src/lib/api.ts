@@ -74,3 +74,85 @@ export async function fetchCoinArticles(coinId: number, limit = 10): Promise<Art
     throw new Error('Failed to fetch coin articles');
   }
 }
+
+export interface RecentArticles {
+  limit: number;
+  articles: Record<string, ArticleSummary[]>;
+}
+
+// Latest articles for several coins in one request, keyed by coin id
+export async function fetchRecentArticles(coinIds: number[], limit = 10): Promise<Record<number, ArticleSummary[]>> {
+  try {
+    const params = new URLSearchParams({ coin_ids: coinIds.join(','), limit: String(limit) });
+    const response = await fetch(`${API_BASE_URL}/api/articles/recent?${params}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      cache: 'no-store',
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data: RecentArticles = await response.json();
+    const byCoin: Record<number, ArticleSummary[]> = {};
+    for (const [coinId, items] of Object.entries(data.articles)) {
+      byCoin[Number(coinId)] = items;
+    }
+    return byCoin;
+  } catch (error) {
+    console.error('Error fetching recent articles:', error);
+    throw new Error('Failed to fetch recent articles');
+  }
+}
+
+export interface CoinUpdate {
+  version: number;
+  changed: Coin[];
+  removed: number[];
+}
+
+// Merge a streamed diff into the current coin list, keyed by coin_id
+export function applyCoinUpdate(coins: Coin[], update: CoinUpdate): Coin[] {
+  const changedById = new Map(update.changed.map((coin) => [coin.coin_id, coin]));
+  const removed = new Set(update.removed);
+
+  const merged = coins
+    .filter((coin) => !removed.has(coin.coin_id))
+    .map((coin) => {
+      const changed = changedById.get(coin.coin_id);
+      if (changed) {
+        changedById.delete(coin.coin_id);
+        return changed;
+      }
+      return coin;
+    });
+
+  return [...merged, ...changedById.values()];
+}
+
+// Subscribe to /api/coins/stream; returns a function that closes the stream
+export function subscribeCoinUpdates(
+  onSnapshot: (coins: Coin[]) => void,
+  onUpdate: (update: CoinUpdate) => void,
+): () => void {
+  const source = new EventSource(`${API_BASE_URL}/api/coins/stream`);
+
+  source.addEventListener('snapshot', (event) => {
+    const data = JSON.parse((event as MessageEvent).data);
+    onSnapshot(data.coins);
+  });
+
+  source.addEventListener('update', (event) => {
+    onUpdate(JSON.parse((event as MessageEvent).data));
+  });
+
+  source.onerror = (error) => {
+    // EventSource reconnects on its own and the server replays a snapshot
+    console.error('Coin update stream error:', error);
+  };
+
+  return () => source.close();
+}